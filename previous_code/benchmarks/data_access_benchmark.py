@@ -0,0 +1,101 @@
+import os
+import csv
+import sys
+import json
+import random
+import argparse
+import tempfile
+import subprocess
+
+# Each case loads the file in a fresh interpreter so peak memory is not shared between cases
+PROBE = r"""
+import sys, time, json, tracemalloc
+sys.path.insert(0, {python_dir!r})
+import pandas as pd
+from data_access import read_table, iter_table
+
+path = {path!r}
+tracemalloc.start()
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+peak = tracemalloc.get_traced_memory()[1]
+print(json.dumps({{'seconds': elapsed, 'peak_bytes': peak, 'rows': rows}}))
+"""
+
+# (call site, code before, code after); each sets `rows`
+CASES = [
+    ('seen URLs',
+     "df = pd.read_csv(path)\nrows = len(set(df['url']))",
+     "keys = set()\nfor chunk in iter_table(path, ('url', 'canonical_url'), dtype=str):\n"
+     "    keys.update(chunk['url'])\nrows = len(keys)"),
+    ('content stats',
+     "df = pd.read_csv(path)\nrows = len(df['domain'].value_counts()) + len(df['discovered_date'].unique())",
+     "df = read_table(path, ['url', 'domain', 'discovered_date', 'cluster_id', 'content_type', "
+     "'confidence_level'], dtype=str)\nrows = len(df['domain'].value_counts()) + len(df['discovered_date'].unique())"),
+    ('keyword learning',
+     "df = pd.read_csv(path)\nrows = len(df)",
+     "df = read_table(path, ['title', 'snippet', 'query', 'url'])\nrows = len(df)"),
+]
+
+WORDS = ('leaked', 'video', 'photos', 'free', 'download', 'mega', 'pack', 'gallery', 'official', 'new',
+         'exclusive', 'full', 'set', 'premium', 'clip', 'hd', 'uncensored', 'archive', 'collection')
+
+
+def write_dataset(path, rows, seed=7):
+    """Write a synthetic master content file shaped like real scan output"""
+    rng = random.Random(seed)
+    domains = [f"site{i}.com" for i in range(300)]
+    queries = [str([f"creator name {w}"]) for w in WORDS]
+    dates = [f"2024-{m:02d}-{d:02d}" for m in range(1, 13) for d in range(1, 29)]
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['title', 'url', 'snippet', 'query', 'page', 'date', 'discovered_date', 'canonical_url',
+                         'domain', 'content_type', 'confidence', 'confidence_level', 'simhash', 'cluster_id'])
+        for i in range(rows):
+            domain = rng.choice(domains)
+            date = rng.choice(dates)
+            simhash = f"{rng.getrandbits(64):016x}"
+            writer.writerow([
+                ' '.join(rng.choices(WORDS, k=8)), f"https://{domain}/post/{i}", ' '.join(rng.choices(WORDS, k=25)),
+                rng.choice(queries), rng.randint(1, 10), date, date, f"{domain}/post/{i}", domain,
+                rng.choice(('video', 'image', 'text')), round(rng.random(), 3), rng.choice(('high', 'medium', 'low')),
+                simhash, simhash
+            ])
+
+
+def run_case(python_dir, path, body):
+    """Run one load in a fresh interpreter and return its timing and peak memory"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(python_dir=python_dir, path=path, body=body)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare peak memory and time of full vs projected CSV loads')
+    parser.add_argument('--rows', type=str, default='100000,500000', help='Comma-separated dataset sizes')
+    parser.add_argument('--dir', type=str, help='Directory for the generated datasets (default: a temp dir)')
+    args = parser.parse_args()
+
+    python_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python'))
+    data_dir = args.dir or tempfile.mkdtemp(prefix='data_access_benchmark_')
+    os.makedirs(data_dir, exist_ok=True)
+
+    for rows in (int(r) for r in args.rows.split(',')):
+        path = os.path.join(data_dir, f"master_{rows}.csv")
+        if not os.path.exists(path):
+            write_dataset(path, rows)
+
+        print(f"📊 {rows} rows ({os.path.getsize(path) / 1e6:.0f} MB):")
+        for name, before, after in CASES:
+            old = run_case(python_dir, path, before)
+            new = run_case(python_dir, path, after)
+            print(f"  {name}: peak {old['peak_bytes'] / 1e6:.0f} MB -> {new['peak_bytes'] / 1e6:.0f} MB, "
+                  f"{old['seconds'] * 1000:.0f} ms -> {new['seconds'] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
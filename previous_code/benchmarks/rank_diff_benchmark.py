@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python')))
+
+import pandas as pd
+from rank_diff import diff_snapshots, load_snapshot
+
+
+def write_snapshot(path, rows, queries, churn, seed):
+    """Write a snapshot CSV shaped like LeakScraper.save_rank_snapshot's; churn is the share of replaced URLs"""
+    rng = random.Random(seed)
+    urls = [f"https://site{i % 2000}.com/post/{i if rng.random() >= churn else i + 10 ** 7}" for i in range(rows)]
+    pd.DataFrame({
+        'query': [f"creator name query {i % queries}" for i in range(rows)],
+        'region': [rng.choice(('', 'US', 'UK')) for _ in range(rows)],
+        'url': urls,
+        'rank': [rng.randint(1, 100) for _ in range(rows)],
+        'canonical_url': [url.split('://', 1)[1] for url in urls],
+        'scanned_at': '2024-06-01T10:00:00'
+    }).to_csv(path, index=False)
+
+
+def timings(func, repeat):
+    """Seconds of each of several runs, after one warm-up run"""
+    func()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time rank snapshot diffs')
+    parser.add_argument('--rows', type=str, default='10000,100000', help='Comma-separated snapshot sizes')
+    parser.add_argument('--queries', type=int, default=20, help='Distinct queries per snapshot')
+    parser.add_argument('--repeat', type=int, default=10, help='Timed runs per case')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in (int(r) for r in args.rows.split(',')):
+            previous_file = os.path.join(tmp_dir, 'previous.csv')
+            current_file = os.path.join(tmp_dir, 'current.csv')
+            write_snapshot(previous_file, rows, args.queries, churn=0.05, seed=1)
+            write_snapshot(current_file, rows, args.queries, churn=0.05, seed=2)
+            previous, current = load_snapshot(previous_file), load_snapshot(current_file)
+
+            for by in (('query',), ()):
+                runs = timings(lambda: diff_snapshots(previous, current, by), args.repeat)
+                print(f"📊 {rows} rows, by={list(by)}: best {min(runs) * 1000:.1f} ms, "
+                      f"median {statistics.median(runs) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
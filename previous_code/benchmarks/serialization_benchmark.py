@@ -0,0 +1,92 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python')))
+
+import serialization
+from serialization import dumps, SerializedCache
+
+WORDS = ('leaked', 'video', 'photos', 'free', 'download', 'mega', 'pack', 'gallery', 'official', 'new',
+         'exclusive', 'full', 'set', 'premium', 'clip', 'hd', 'uncensored', 'archive', 'collection')
+
+
+def make_scan(matches, seed=7):
+    """Build a completed scan record shaped like the one the API publishes"""
+    rng = random.Random(seed)
+    domains = [f"site{i}.com" for i in range(300)]
+    rows = []
+    for i in range(matches):
+        domain = rng.choice(domains)
+        rows.append({
+            'title': ' '.join(rng.choices(WORDS, k=8)), 'url': f"https://{domain}/post/{i}",
+            'canonical_url': f"{domain}/post/{i}", 'snippet': ' '.join(rng.choices(WORDS, k=25)),
+            'query': str([f"creator name {rng.choice(WORDS)}"]), 'page': rng.randint(1, 10),
+            'rank': rng.randint(1, 100), 'date': '2024-06-01', 'content_type': rng.choice(('video', 'image', 'text')),
+            'confidence': round(rng.random(), 3), 'confidence_level': rng.choice(('high', 'medium', 'low'))
+        })
+    used = sorted({row['canonical_url'].split('/')[0] for row in rows})
+    return {
+        'id': 'benchmark', 'creatorName': 'Creator Name', 'status': 'completed', 'learningStatus': 'completed',
+        'startTime': '2024-06-01T10:00:00', 'endTime': '2024-06-01T10:05:00',
+        'results': {'totalMatches': matches, 'domains': used, 'matches': rows},
+        'stats': {'domainDistribution': [{'id': d, 'label': d, 'value': 1} for d in used]}
+    }
+
+
+def make_keyword_db(keywords, seed=7):
+    """Build a keyword database like the keyword learner persists"""
+    rng = random.Random(seed)
+    return {
+        f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}": {
+            'occurrence': rng.randint(1, 50), 'first_seen': '2024-01-01', 'last_seen': '2024-06-01',
+            'aliases': [f"{rng.choice(WORDS)} {i}"]
+        }
+        for i in range(keywords)
+    }
+
+
+def best_of(func, repeat):
+    """Fastest of several runs in seconds, and the last result"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare stdlib and fast JSON encoding of scan records and keyword DBs')
+    parser.add_argument('--matches', type=str, default='100,1000,10000,50000', help='Comma-separated scan sizes')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per case; the fastest is reported')
+    args = parser.parse_args()
+
+    print(f"⚙️ Encoder: {serialization.ENCODER}")
+
+    for matches in (int(m) for m in args.matches.split(',')):
+        scan = make_scan(matches)
+        cache = SerializedCache()
+
+        # What jsonify did before: the stdlib encoder with sorted keys
+        old_time, old = best_of(lambda: json.dumps(scan, sort_keys=True).encode('utf-8'), args.repeat)
+        new_time, new = best_of(lambda: dumps(scan), args.repeat)
+        cache.get('benchmark', scan)
+        cached_time, _ = best_of(lambda: cache.get('benchmark', scan), args.repeat)
+
+        print(f"📊 Scan with {matches} matches: {len(old) / 1e6:.2f} MB -> {len(new) / 1e6:.2f} MB, "
+              f"{old_time * 1000:.2f} ms -> {new_time * 1000:.2f} ms ({cached_time * 1e6:.1f} µs cached)")
+
+    keyword_db = make_keyword_db(5000)
+    old_time, old = best_of(lambda: json.dumps(keyword_db, indent=2).encode('utf-8'), args.repeat)
+    new_time, new = best_of(lambda: dumps(keyword_db), args.repeat)
+    print(f"📊 Keyword DB with {len(keyword_db)} keywords: {len(old) / 1e6:.2f} MB -> {len(new) / 1e6:.2f} MB, "
+          f"{old_time * 1000:.2f} ms -> {new_time * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
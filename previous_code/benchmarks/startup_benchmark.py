@@ -0,0 +1,62 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Runs inside a fresh interpreter so every sample is a real cold start
+PROBE = r"""
+import sys, time, json
+sys.path.insert(0, {app_dir!r})
+start = time.perf_counter()
+import app
+import_time = time.perf_counter() - start
+
+client = app.app.test_client()
+start = time.perf_counter()
+response = client.get('/api/health')
+health_time = time.perf_counter() - start
+pandas_after_health = 'pandas' in sys.modules
+
+start = time.perf_counter()
+client.get('/api/suggested-keywords?creator=benchmark')
+first_request_time = time.perf_counter() - start
+
+print(json.dumps({{
+    'import_s': import_time,
+    'health_s': health_time,
+    'health_status': response.status_code,
+    'pandas_after_health': pandas_after_health,
+    'first_keywords_request_s': first_request_time,
+}}))
+"""
+
+
+def run_sample(app_dir, workdir):
+    """Run one cold-start sample and return its timings"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(app_dir=app_dir)],
+        cwd=workdir, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold-start import and first-request latency of app.py')
+    parser.add_argument('--app', choices=['backend', 'functions'], default='backend', help='Which app.py to measure')
+    parser.add_argument('--runs', type=int, default=5, help='Number of cold starts to sample')
+    parser.add_argument('--workdir', type=str, default=os.getcwd(), help='Working directory for data folders')
+    args = parser.parse_args()
+
+    app_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', args.app))
+    samples = [run_sample(app_dir, args.workdir) for _ in range(args.runs)]
+
+    print(f"📊 Cold start of {args.app}/app.py over {args.runs} runs (median):")
+    for key in ('import_s', 'health_s', 'first_keywords_request_s'):
+        print(f"  {key}: {statistics.median(s[key] for s in samples) * 1000:.1f} ms")
+    print(f"  pandas imported by /api/health: {any(s['pandas_after_health'] for s in samples)}")
+
+
+if __name__ == "__main__":
+    main()
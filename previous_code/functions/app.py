@@ -1,40 +1,89 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 import os
 import sys
 import json
-import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 import threading
 import uuid
+import tracemalloc
+from collections import Counter
 
-# Add the python directory to the path so we can import the modules
+# Add the python directory to the path so we can import the modules.
+# The modules pull in pandas, openai and nltk, so they are imported on
+# first use rather than here to keep cold starts fast.
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'python'))
-
-# Import the Python modules
-from leak_scraper import LeakScraper
-from keyword_learner import KeywordLearner
-from knowledge_manager import KnowledgeManager
+from serialization import dumps, loads, SerializedCache
+from metrics import metrics, Gauge, tracemalloc_top
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
+class FastJSONProvider(JSONProvider):
+    """Encodes jsonify responses with the serialization layer (orjson when installed)"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        return self._app.response_class(dumps(self._prepare_response_obj(args, kwargs)), mimetype='application/json')
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # Enable CORS for all routes
 
 # Configuration
 GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY', '')
 SEARCH_ENGINE_ID = os.environ.get('SEARCH_ENGINE_ID', '')
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
+PROMPT_TOKEN_BUDGET = int(os.environ.get('PROMPT_TOKEN_BUDGET', 600))
+SAVE_TEMP_RESULTS = os.environ.get('SAVE_TEMP_RESULTS', '').lower() in ('1', 'true', 'yes')
+TRACEMALLOC_ENABLED = os.environ.get('METRICS_TRACEMALLOC', '').lower() in ('1', 'true', 'yes')
+
+# Components are created lazily by get_keyword_learner / get_knowledge_manager
+_components = {}
+_components_lock = threading.Lock()
+
+def get_keyword_learner():
+    """Get the shared keyword learner, creating it on first use"""
+    with _components_lock:
+        if 'keyword_learner' not in _components:
+            from keyword_learner import KeywordLearner
+            _components['keyword_learner'] = KeywordLearner(OPENAI_API_KEY, prompt_token_budget=PROMPT_TOKEN_BUDGET)
+        return _components['keyword_learner']
 
-# Initialize components
-keyword_learner = KeywordLearner(OPENAI_API_KEY)
-knowledge_manager = KnowledgeManager()
+def get_knowledge_manager():
+    """Get the shared knowledge manager, creating it on first use"""
+    with _components_lock:
+        if 'knowledge_manager' not in _components:
+            from knowledge_manager import KnowledgeManager
+            _components['knowledge_manager'] = KnowledgeManager()
+        return _components['knowledge_manager']
 
 # Store active scans
 active_scans = {}
 
+# Records of finished scans no longer change, so their JSON is encoded once per scan
+finished_scans = set()
+scan_payloads = SerializedCache()
+
+# Chart labels of the classifier's content types and confidence levels
+CONTENT_TYPE_LABELS = {'video': 'Video', 'image': 'Image', 'text': 'Text'}
+CONFIDENCE_LABELS = {'high': 'High', 'medium': 'Medium', 'low': 'Low'}
+
+def filter_content_type(matches, content_type):
+    """Matches labelled with a classifier content type; other requested types keep every match"""
+    from content_classifier import CONTENT_TYPES
+    if content_type not in CONTENT_TYPES:
+        return matches
+    # Rows are labelled by the scraper's classification stage
+    return [r for r in matches if r.get('content_type') == content_type]
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -45,6 +94,72 @@ def health_check():
         'timestamp': datetime.now().isoformat()
     })
 
+def scan_counts():
+    """Scans of this process per status"""
+    counts = Counter(scan.get('status') for scan in list(active_scans.values()))
+    return [({'status': status}, count) for status, count in counts.items()]
+
+def get_work_queue():
+    """The shared scan work queue, or None if no queue has been created"""
+    db_path = os.path.join(os.getcwd(), "work_queue", "scan_queue.db")
+    if not os.path.exists(db_path):
+        return None
+    from work_queue import ScanWorkQueue
+    return ScanWorkQueue(db_path)
+
+def queue_unit_counts():
+    """Work queue units per status; 'pending' is the queue depth"""
+    queue = get_work_queue()
+    if queue is None:
+        return None
+    return [({'status': status}, count) for status, count in queue.counts().items()]
+
+def queue_worker_counts():
+    """Live queue workers that are busy or idle"""
+    queue = get_work_queue()
+    if queue is None:
+        return None
+    return [({'state': state}, count) for state, count in queue.worker_counts().items()]
+
+def queue_worker_utilization():
+    """Share of live queue workers holding a unit lease"""
+    queue = get_work_queue()
+    if queue is None:
+        return None
+    counts = queue.worker_counts()
+    live = counts['busy'] + counts['idle']
+    return counts['busy'] / live if live else None
+
+metrics.gauge('scans', 'Scans started by this process per status').set_function(scan_counts)
+metrics.gauge('scan_queue_units', 'Work queue units per status').set_function(queue_unit_counts)
+metrics.gauge('scan_queue_workers', 'Queue workers seen in the last 5 minutes, busy or idle').set_function(
+    queue_worker_counts)
+metrics.gauge('scan_queue_worker_utilization', 'Share of live queue workers working on a unit').set_function(
+    queue_worker_utilization)
+
+# Tracing allocations slows the whole process, so top allocators are only available when enabled
+if TRACEMALLOC_ENABLED:
+    tracemalloc.start()
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Metrics in the Prometheus text format; ?tracemalloc=N adds the N largest allocation sites"""
+    body = metrics.render()
+
+    top = request.args.get('tracemalloc')
+    if top is not None:
+        if not TRACEMALLOC_ENABLED:
+            return jsonify({'error': 'tracemalloc is disabled; set METRICS_TRACEMALLOC=1 to enable it'}), 400
+        if not top.isdigit() or not 1 <= int(top) <= 100:
+            return jsonify({'error': 'tracemalloc must be an integer between 1 and 100'}), 400
+
+        allocations = Gauge('python_tracemalloc_top_bytes', 'Memory held per allocation site since tracing started')
+        for location, size in tracemalloc_top(int(top)):
+            allocations.set(size, location=location)
+        body += "\n".join(allocations.render()) + "\n"
+
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/suggested-keywords', methods=['GET'])
 def get_suggested_keywords():
     """Get suggested keywords for a creator"""
@@ -55,7 +170,7 @@ def get_suggested_keywords():
     max_count = int(request.args.get('count', 10))
     
     try:
-        keywords = keyword_learner.get_suggested_keywords(creator_name, max_count)
+        keywords = get_keyword_learner().get_suggested_keywords(creator_name, max_count)
         return jsonify({
             'creator': creator_name,
             'keywords': keywords
@@ -77,6 +192,16 @@ def start_scan():
     keywords = data.get('keywords', [])
     timeframe = data.get('timeframe', 'today')
     max_searches = int(data.get('maxSearches', 50))
+    regions = data.get('regions') or None
+    
+    if regions is not None:
+        from leak_scraper import REGION_COUNTRY_CODES
+        if not isinstance(regions, list) or not all(isinstance(r, str) for r in regions):
+            return jsonify({'error': 'regions must be a list of region codes'}), 400
+        regions = [r.strip().upper() for r in regions]
+        unknown = [r for r in regions if r not in REGION_COUNTRY_CODES]
+        if unknown:
+            return jsonify({'error': f"Unknown regions: {', '.join(unknown)}"}), 400
     
     # Generate scan ID
     scan_id = str(uuid.uuid4())
@@ -95,15 +220,7 @@ def start_scan():
         else:
             full_keywords.append(kw)
     
-    # Start scan in background thread
-    thread = threading.Thread(
-        target=run_scan_thread,
-        args=(scan_id, creator_name, full_keywords, timeframe_str, max_searches, content_type)
-    )
-    thread.daemon = True
-    thread.start()
-    
-    # Store scan info
+    # Store scan info before the thread starts so it can always find its entry
     active_scans[scan_id] = {
         'id': scan_id,
         'creatorName': creator_name,
@@ -113,86 +230,104 @@ def start_scan():
         'contentType': content_type
     }
     
+    # Start scan in background thread
+    thread = threading.Thread(
+        target=run_scan_thread,
+        args=(scan_id, creator_name, full_keywords, timeframe_str, max_searches, content_type, regions)
+    )
+    thread.daemon = True
+    thread.start()
+    
     return jsonify({
         'scanId': scan_id,
         'status': 'running',
         'message': f'Scan started for {creator_name}'
     })
 
-def run_scan_thread(scan_id, creator_name, keywords, timeframe, max_searches, content_type):
-    """Run a scan in a background thread"""
+def run_scan_thread(scan_id, creator_name, keywords, timeframe, max_searches, content_type, regions=None):
+    """Run a scan in a background thread and store its per-stage timing breakdown in the scan record"""
+    from profiling import profiler
+    
+    with profiler.collect() as collector:
+        with profiler.span('scan'):
+            execute_scan(scan_id, creator_name, keywords, timeframe, max_searches, content_type, regions)
+    
+    active_scans[scan_id]['profile'] = collector.report()
+    finished_scans.add(scan_id)
+
+def execute_scan(scan_id, creator_name, keywords, timeframe, max_searches, content_type, regions=None):
+    """Run a scan and publish its results in active_scans"""
     try:
         # Update scan status
         active_scans[scan_id]['status'] = 'running'
         
-        # Create and run the scraper
+        from leak_scraper import LeakScraper
+        from scan_pipeline import ScanPipeline
+        keyword_learner = get_keyword_learner()
+        knowledge_manager = get_knowledge_manager()
+        
+        # Create and run the scraper, merging each page into master content as it arrives
         scraper = LeakScraper(
             creator_name=creator_name,
             api_key=GOOGLE_API_KEY,
             search_engine_id=SEARCH_ENGINE_ID,
-            max_searches=max_searches
+            max_searches=max_searches,
+            result_sink=knowledge_manager.open_sink(creator_name)
         )
         
         # Run the scan
         results = scraper.run_scan(
             keywords=keywords,
-            timeframe=timeframe
+            timeframe=timeframe,
+            regions=regions
         )
         
         if results:
-            # Save temporary results for learning
-            temp_dir = os.path.join(os.getcwd(), "temp_results")
-            os.makedirs(temp_dir, exist_ok=True)
-            temp_file = os.path.join(
-                temp_dir,
-                f"{creator_name.replace(' ', '_')}_temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            )
-            temp_df = pd.DataFrame(results)
-            temp_df.to_csv(temp_file, index=False)
-            
-            # Learn from results
-            updated_keywords = keyword_learner.learn_from_results(temp_file, creator_name)
-            
-            # Update master content repository
-            new_count = knowledge_manager.update_master_content(temp_file, creator_name)
-            
-            # Get content stats
-            stats = knowledge_manager.get_content_stats(creator_name)
-            
             # Filter results by content type if specified
-            if content_type != 'all':
-                # This is a simplified content type filter - in a real implementation,
-                # you would need more sophisticated content type detection
-                if content_type == 'video':
-                    video_domains = ['youtube.com', 'vimeo.com', 'tiktok.com', 'twitch.tv']
-                    results = [r for r in results if any(d in r['url'] for d in video_domains)]
-                elif content_type == 'image':
-                    image_domains = ['instagram.com', 'imgur.com', 'flickr.com', 'pinterest.com']
-                    results = [r for r in results if any(d in r['url'] for d in image_domains)]
+            matches = filter_content_type(results.to_records(), content_type)
             
-            # Update scan status
-            active_scans[scan_id] = {
-                'id': scan_id,
-                'creatorName': creator_name,
-                'status': 'completed',
-                'startTime': active_scans[scan_id]['startTime'],
-                'endTime': datetime.now().isoformat(),
-                'results': {
-                    'totalMatches': len(results),
-                    'domains': list(stats['domains'].keys()),
-                    'matches': results
-                },
-                'stats': {
-                    'domainDistribution': [
-                        {'id': domain, 'label': domain, 'value': count}
-                        for domain, count in stats['domains'].items()
-                    ],
-                    'contentTypeDistribution': generate_mock_content_type_distribution(results),
-                    'confidenceDistribution': generate_mock_confidence_distribution(results),
-                    'discoveryTimeline': generate_mock_discovery_timeline(results),
-                    'contentAgeDistribution': generate_mock_content_age_distribution()
+            def publish_results(stats):
+                """Make results visible as soon as the merge commits, while learning continues"""
+                active_scans[scan_id] = {
+                    'id': scan_id,
+                    'creatorName': creator_name,
+                    'status': 'completed',
+                    'learningStatus': 'running',
+                    'startTime': active_scans[scan_id]['startTime'],
+                    'endTime': datetime.now().isoformat(),
+                    'results': {
+                        'totalMatches': len(matches),
+                        'domains': list(stats['domains'].keys()),
+                        'matches': matches
+                    },
+                    'stats': {
+                        'domainDistribution': [
+                            {'id': domain, 'label': domain, 'value': count}
+                            for domain, count in stats['domains'].items()
+                        ],
+                        'contentTypeDistribution': format_label_distribution(
+                            Counter(r.get('content_type') for r in matches), CONTENT_TYPE_LABELS),
+                        'confidenceDistribution': format_label_distribution(
+                            Counter(r.get('confidence_level') for r in matches), CONFIDENCE_LABELS),
+                        'discoveryTimeline': generate_mock_discovery_timeline(matches),
+                        'contentAgeDistribution': generate_mock_content_age_distribution()
+                    }
                 }
-            }
+            
+            # Learn from and merge the results in memory
+            pipeline = ScanPipeline(keyword_learner, knowledge_manager, save_temp_results=SAVE_TEMP_RESULTS)
+            try:
+                outcome = pipeline.process(results, creator_name, on_results_ready=publish_results)
+            except Exception as e:
+                if active_scans[scan_id].get('learningStatus') != 'running':
+                    raise
+                # Merge and stats finished and the results are published; only learning failed
+                print(f"❌ Keyword learning failed for {creator_name}: {e}")
+                active_scans[scan_id]['learningStatus'] = 'error'
+                active_scans[scan_id]['learningError'] = str(e)
+            else:
+                active_scans[scan_id]['learningStatus'] = 'completed'
+                active_scans[scan_id]['stageTimings'] = outcome['timings']
         else:
             # Update scan status for empty results
             active_scans[scan_id] = {
@@ -231,7 +366,7 @@ def get_scan_status(scan_id):
     if scan_id not in active_scans:
         return jsonify({'error': 'Scan not found'}), 404
     
-    return jsonify(active_scans[scan_id])
+    return scan_response(scan_id)
 
 @app.route('/api/scan-results/<scan_id>', methods=['GET'])
 def get_scan_results(scan_id):
@@ -243,42 +378,165 @@ def get_scan_results(scan_id):
     if scan['status'] != 'completed':
         return jsonify({'error': 'Scan not completed yet', 'status': scan['status']}), 400
     
-    return jsonify(scan)
+    return scan_response(scan_id)
+
+def scan_response(scan_id):
+    """JSON response of a scan record, reusing the cached encoding once the scan has finished"""
+    scan = active_scans[scan_id]
+    body = scan_payloads.get(scan_id, scan) if scan_id in finished_scans else dumps(scan)
+    return app.response_class(body, mimetype='application/json')
 
 @app.route('/api/scan-stats/<creator_name>', methods=['GET'])
 def get_scan_stats(creator_name):
     """Get statistics for a creator's scans"""
     try:
-        stats = knowledge_manager.get_content_stats(creator_name)
-        
-        # Format stats for frontend
-        formatted_stats = {
-            'totalUrls': stats['total_urls'],
-            'dateRange': {
-                'oldest': stats['oldest_content'],
-                'newest': stats['newest_content']
-            },
-            'domainDistribution': [
-                {'id': domain, 'label': domain, 'value': count}
-                for domain, count in stats['domains'].items()
-            ],
-            'contentTypeDistribution': generate_mock_content_type_distribution([]),
-            'confidenceDistribution': generate_mock_confidence_distribution([]),
-            'discoveryTimeline': generate_mock_discovery_timeline([]),
-            'contentAgeDistribution': generate_mock_content_age_distribution()
-        }
-        
-        return jsonify(formatted_stats)
+        stats = get_knowledge_manager().get_content_stats(creator_name)
+        return jsonify(format_content_stats(stats))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/scan-stats', methods=['GET'])
+def get_scan_stats_batch():
+    """Get statistics for many creators at once (comma-separated ?creators=)"""
+    creator_names = [c.strip() for c in request.args.get('creators', '').split(',') if c.strip()]
+    if not creator_names:
+        return jsonify({'error': 'At least one creator name is required'}), 400
+    
+    try:
+        stats_by_creator = get_knowledge_manager().get_content_stats_many(creator_names)
+        return jsonify({
+            creator_name: format_content_stats(stats)
+            for creator_name, stats in stats_by_creator.items()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/rank-changes/<creator_name>', methods=['GET'])
+def get_rank_changes(creator_name):
+    """Compare a creator's two most recent rank snapshots"""
+    limit = int(request.args.get('limit', 50))
+
+    try:
+        from rank_diff import latest_snapshots, load_snapshot, diff_snapshots, summarize_diff
+        snapshot_files = latest_snapshots(creator_name)
+        if len(snapshot_files) < 2:
+            return jsonify({'error': 'At least two scans are needed to compare ranks'}), 404
+
+        diff = diff_snapshots(load_snapshot(snapshot_files[0]), load_snapshot(snapshot_files[1]))
+        return jsonify({
+            'creator': creator_name,
+            'previousSnapshot': os.path.basename(snapshot_files[0]),
+            'currentSnapshot': os.path.basename(snapshot_files[1]),
+            'changes': summarize_diff(diff, limit)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/link-status/<creator_name>', methods=['GET'])
+def get_link_status(creator_name):
+    """Get liveness counts of a creator's stored links and the links with one status (?status=removed)"""
+    status = request.args.get('status')
+    limit = int(request.args.get('limit', 100))
+    
+    try:
+        from link_status import LinkStatusStore
+        store = LinkStatusStore()
+        return jsonify({
+            'creator': creator_name,
+            'summary': store.summary(creator_name),
+            'links': store.links(creator_name, status, limit) if status else []
+        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/domains', methods=['GET'])
+def get_domain_intelligence():
+    """Get the domains hosting the most URLs, across all creators or for one (?creator=)"""
+    creator_name = request.args.get('creator')
+    limit = int(request.args.get('limit', 20))
+    
+    try:
+        domains = get_knowledge_manager().get_domain_intelligence(limit, creator_name)
+        return jsonify({
+            'creator': creator_name,
+            'domains': [
+                {
+                    'domain': d['domain'],
+                    'firstSeen': d['first_seen'],
+                    'lastSeen': d['last_seen'],
+                    'urlCount': d['url_count'],
+                    'creators': d['creators']
+                }
+                for d in domains
+            ]
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/search', methods=['GET'])
+def search_content():
+    """Full-text search over every creator's master content (?q=&creator=&domain=&limit=&cursor=)"""
+    query = request.args.get('q', '').strip()
+    creator_name = request.args.get('creator')
+    domain = request.args.get('domain')
+    limit = int(request.args.get('limit', 20))
+
+    if not query and not domain:
+        return jsonify({'error': 'A query (q) or a domain is required'}), 400
+
+    try:
+        page = get_knowledge_manager().search_index.search(query or None, creator_name, domain, limit,
+                                                           request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({
+        'query': query,
+        'results': [
+            {
+                'creator': r['creator'],
+                'url': r['url'],
+                'domain': r['domain'],
+                'title': r['title'],
+                'snippet': r['snippet'],
+                'contentType': r['content_type'],
+                'confidence': r['confidence'],
+                'discoveredDate': r['discovered_date'],
+                'score': r['score']
+            }
+            for r in page['results']
+        ],
+        'nextCursor': page['next_cursor']
+    })
+
+def format_content_stats(stats):
+    """Format content stats for the frontend"""
+    return {
+        'totalUrls': stats['total_urls'],
+        'totalClusters': stats.get('total_clusters', stats['total_urls']),
+        'dateRange': {
+            'oldest': stats['oldest_content'],
+            'newest': stats['newest_content']
+        },
+        'domainDistribution': [
+            {'id': domain, 'label': domain, 'value': count}
+            for domain, count in stats['domains'].items()
+        ],
+        'contentTypeDistribution': format_label_distribution(stats.get('content_types', {}), CONTENT_TYPE_LABELS),
+        'confidenceDistribution': format_label_distribution(stats.get('confidence_levels', {}), CONFIDENCE_LABELS),
+        'discoveryTimeline': generate_mock_discovery_timeline([]),
+        'contentAgeDistribution': generate_mock_content_age_distribution()
+    }
+
 @app.route('/api/export-results/<creator_name>', methods=['GET'])
 def export_results(creator_name):
     """Export results for a creator"""
     format_type = request.args.get('format', 'json')
     
     try:
-        export_path = knowledge_manager.export_master_data(creator_name, format_type)
+        export_path = get_knowledge_manager().export_master_data(creator_name, format_type)
         if not export_path:
             return jsonify({'error': 'No data to export'}), 404
         
@@ -292,23 +550,14 @@ def export_results(creator_name):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# Helper functions for generating mock data for visualization
-def generate_mock_content_type_distribution(results):
-    """Generate mock content type distribution"""
+def format_label_distribution(counts, labels):
+    """Format stored label counts as a chart distribution, in the given label order"""
     return [
-        {'id': 'video', 'label': 'Video', 'value': max(5, len(results) // 3)},
-        {'id': 'image', 'label': 'Image', 'value': max(8, len(results) // 2)},
-        {'id': 'text', 'label': 'Text', 'value': max(3, len(results) // 6)}
-    ]
-
-def generate_mock_confidence_distribution(results):
-    """Generate mock confidence distribution"""
-    return [
-        {'id': 'high', 'label': 'High', 'value': max(3, len(results) // 4)},
-        {'id': 'medium', 'label': 'Medium', 'value': max(5, len(results) // 3)},
-        {'id': 'low', 'label': 'Low', 'value': max(2, len(results) // 6)}
+        {'id': label_id, 'label': label, 'value': int(counts.get(label_id, 0))}
+        for label_id, label in labels.items()
     ]
 
+# Helper functions for generating mock data for visualization
 def generate_mock_discovery_timeline(results):
     """Generate mock discovery timeline"""
     # Generate last 30 days of data
@@ -316,8 +565,7 @@ def generate_mock_discovery_timeline(results):
     data_points = []
     
     for i in range(days):
-        date = datetime.now()
-        date = date.replace(day=date.day - (days - i - 1))
+        date = datetime.now() - timedelta(days=days - i - 1)
         data_points.append({
             'x': date.strftime('%Y-%m-%d'),
             'y': min(5, max(0, (len(results) // 10) * (i % 3)))
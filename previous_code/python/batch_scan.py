@@ -0,0 +1,270 @@
+import os
+import json
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from leak_scraper import LeakScraper, REGION_COUNTRY_CODES
+from result_records import ResultBatch
+from profiling import profiler
+from knowledge_manager import KnowledgeManager
+
+
+def load_manifest(manifest_path):
+    """
+    Load a batch manifest
+
+    The manifest is a JSON list (or an object with a "creators" list) of entries like
+    {"creator": "Name", "keywords": ["onlyfans leaks"], "timeframe": "last 7 days", "max_searches": 50,
+    "regions": ["US", "UK"]}.
+    Only "creator" is required.
+    """
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    entries = manifest.get('creators', []) if isinstance(manifest, dict) else manifest
+
+    jobs = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'creator': entry}
+        if not entry.get('creator'):
+            print(f"⚠️ Skipping manifest entry without a creator: {entry}")
+            continue
+        if entry.get('regions'):
+            entry['regions'] = [str(r).strip().upper() for r in entry['regions']]
+            unknown = [r for r in entry['regions'] if r not in REGION_COUNTRY_CODES]
+            if unknown:
+                print(f"⚠️ Skipping manifest entry for {entry['creator']} with unknown regions: {', '.join(unknown)}")
+                continue
+        jobs.append(entry)
+
+    return jobs
+
+
+def _skipped_summary(creator_name, reason):
+    """Summary of a creator that was not scanned"""
+    return {'creator': creator_name, 'status': 'skipped', 'error': reason, 'budget': 0,
+            'api_calls': 0, 'new_urls': 0, 'duration_s': 0}
+
+
+def run_creator_job(job, budget, google_api_key, search_engine_id):
+    """Scan one creator in a worker process and return its summary and results"""
+    creator_name = job['creator']
+    started = time.time()
+    scraper = None
+
+    # Worker processes are reused across jobs, so each job gets its own collector
+    with profiler.collect() as collector:
+        try:
+            knowledge_manager = KnowledgeManager()
+            scraper = LeakScraper(
+                creator_name=creator_name,
+                api_key=google_api_key,
+                search_engine_id=search_engine_id,
+                max_searches=budget,
+                result_sink=knowledge_manager.open_sink(creator_name)
+            )
+            with profiler.span('scan'):
+                results = scraper.run_scan(keywords=job['full_keywords'], timeframe=job['timeframe'],
+                                           regions=job.get('regions'))
+            status, error = 'completed', None
+        except Exception as e:
+            results, status, error = ResultBatch(), 'error', str(e)
+
+    api_calls = scraper.api_calls if scraper is not None else 0
+
+    return {
+        'creator': creator_name,
+        'status': status,
+        'error': error,
+        'budget': budget,
+        'api_calls': api_calls,
+        'new_urls': len(results),
+        'duration_s': round(time.time() - started, 2),
+        'profile': collector.report()
+    }, results
+
+
+class BatchScanner:
+    def __init__(self, google_api_key, search_engine_id, keyword_learner, workers=4, global_quota=None,
+                 default_timeframe="last 1 days", default_max_searches=50):
+        """
+        Non-interactive scanner for many creators across a process pool
+
+        Args:
+            google_api_key: Google Custom Search API key
+            search_engine_id: Google Custom Search Engine ID
+            keyword_learner: KeywordLearner used for suggested keywords and post-scan learning
+            workers: Number of worker processes
+            global_quota: Maximum API calls across all creators (None for no cap)
+            default_timeframe: Timeframe for manifest entries without one
+            default_max_searches: Per-creator budget for manifest entries without one
+        """
+        self.google_api_key = google_api_key
+        self.search_engine_id = search_engine_id
+        self.keyword_learner = keyword_learner
+        self.workers = workers
+        self.global_quota = global_quota
+        self.default_timeframe = default_timeframe
+        self.default_max_searches = default_max_searches
+
+    def prepare_jobs(self, entries):
+        """
+        Fill in keywords, timeframe and budget for manifest entries
+
+        A creator listed more than once is scanned for its first entry only. Two processes
+        would otherwise append to the same master file at once, and one run's results would
+        never be learned from.
+
+        Returns:
+            Tuple of (jobs, summaries of the skipped duplicate entries)
+        """
+        jobs = []
+        skipped = []
+        seen = set()
+        for entry in entries:
+            creator_name = entry['creator']
+            key = ' '.join(creator_name.split()).lower()
+            if key in seen:
+                print(f"⚠️ Skipping duplicate manifest entry for {creator_name}")
+                skipped.append(_skipped_summary(creator_name, 'Duplicate manifest entry for this creator'))
+                continue
+            seen.add(key)
+
+            keywords = entry.get('keywords') or self.keyword_learner.get_suggested_keywords(creator_name)
+            keywords = [k.strip() for k in keywords if k and k.strip()][:10]
+
+            jobs.append({
+                'creator': creator_name,
+                'full_keywords': [kw if creator_name.lower() in kw.lower() else f"{creator_name} {kw}"
+                                  for kw in keywords],
+                'timeframe': entry.get('timeframe') or self.default_timeframe,
+                'max_searches': int(entry.get('max_searches') or self.default_max_searches),
+                'regions': entry.get('regions')
+            })
+        return jobs, skipped
+
+    def run(self, entries):
+        """
+        Scan every creator in the manifest
+
+        Creators are started as workers free up. Each one is granted the smaller of its own budget
+        and an equal share of the remaining global quota, and quota a creator leaves unused flows
+        back to the pool for those still waiting.
+
+        Returns:
+            Summary dict with per-creator outcomes and aggregate throughput
+        """
+        jobs, summaries = self.prepare_jobs(entries)
+        total = len(jobs) + len(summaries)
+        waiting = list(jobs)
+        remaining_quota = self.global_quota
+        results_by_creator = {}
+        started = time.time()
+
+        print(f"\n🚀 Batch scan of {len(jobs)} creators with {self.workers} workers"
+              + (f", global quota {self.global_quota} API calls" if self.global_quota is not None else ""))
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            running = {}
+
+            while waiting or running:
+                # Start creators while workers and quota are available
+                while waiting and len(running) < self.workers:
+                    job = waiting[0]
+                    budget = job['max_searches']
+
+                    if remaining_quota is not None:
+                        # Equal share of what is left among creators not yet started
+                        fair_share = remaining_quota // len(waiting)
+                        budget = min(budget, max(fair_share, min(remaining_quota, 1)))
+
+                        if budget <= 0:
+                            if running:
+                                break  # Wait for running creators to hand back unused quota
+                            waiting.pop(0)
+                            summaries.append(_skipped_summary(job['creator'], 'Global quota exhausted'))
+                            continue
+                        remaining_quota -= budget
+
+                    waiting.pop(0)
+                    future = executor.submit(run_creator_job, job, budget,
+                                             self.google_api_key, self.search_engine_id)
+                    running[future] = job
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    summary, results = future.result()
+
+                    # Return unused quota to the pool
+                    if remaining_quota is not None:
+                        remaining_quota += summary['budget'] - summary['api_calls']
+
+                    summaries.append(summary)
+                    if results:
+                        results_by_creator[job['creator']] = results
+
+                    self._print_progress(summaries, total, started)
+
+        # Learn from every creator's results with concurrent LLM calls. The scans are already
+        # merged, so a learning failure is recorded rather than losing the batch summary.
+        learning = {'status': 'skipped', 'error': None}
+        if results_by_creator:
+            try:
+                self.keyword_learner.learn_from_results_batch(
+                    [(results.to_frame(), creator_name) for creator_name, results in results_by_creator.items()])
+                learning['status'] = 'completed'
+            except Exception as e:
+                print(f"❌ Keyword learning failed: {e}")
+                learning = {'status': 'error', 'error': str(e)}
+
+        summary = self._build_summary(summaries, started)
+        summary['learning'] = learning
+        return summary
+
+    def _print_progress(self, summaries, total, started):
+        """Print progress and aggregate throughput"""
+        elapsed = max(time.time() - started, 1e-9)
+        api_calls = sum(s['api_calls'] for s in summaries)
+        print(f"📊 {len(summaries)}/{total} creators done | "
+              f"{len(summaries) / elapsed * 3600:.1f} creators/hour | "
+              f"{api_calls / elapsed * 60:.1f} API calls/minute")
+
+    def _build_summary(self, summaries, started):
+        """Build the machine-readable batch summary"""
+        elapsed = max(time.time() - started, 1e-9)
+        api_calls = sum(s['api_calls'] for s in summaries)
+        completed = [s for s in summaries if s['status'] == 'completed']
+
+        return {
+            'started': datetime.fromtimestamp(started).isoformat(),
+            'finished': datetime.now().isoformat(),
+            'duration_s': round(elapsed, 2),
+            'workers': self.workers,
+            'global_quota': self.global_quota,
+            'totals': {
+                'creators': len(summaries),
+                'completed': len(completed),
+                'failed': sum(1 for s in summaries if s['status'] == 'error'),
+                'skipped': sum(1 for s in summaries if s['status'] == 'skipped'),
+                'api_calls': api_calls,
+                'new_urls': sum(s['new_urls'] for s in summaries),
+                'creators_per_hour': round(len(completed) / elapsed * 3600, 2),
+                'api_calls_per_minute': round(api_calls / elapsed * 60, 2)
+            },
+            'creators': summaries
+        }
+
+
+def write_summary(summary, summary_path):
+    """Write the batch summary as JSON"""
+    directory = os.path.dirname(summary_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"✅ Wrote batch summary to {summary_path}")
@@ -0,0 +1,174 @@
+import re
+import pandas as pd
+from domain_extractor import domains_for
+
+try:
+    import ahocorasick
+except ImportError:  # Falls back to a single compiled regex alternation
+    ahocorasick = None
+
+CONTENT_TYPES = ('video', 'image', 'text')
+CONFIDENCE_LEVELS = ('high', 'medium', 'low')
+
+# Registrable domains that mostly host one kind of content
+VIDEO_DOMAINS = {
+    'youtube.com', 'youtu.be', 'vimeo.com', 'tiktok.com', 'twitch.tv', 'dailymotion.com', 'rumble.com',
+    'streamable.com', 'bitchute.com', 'pornhub.com', 'xvideos.com', 'xhamster.com', 'redtube.com',
+    'spankbang.com', 'eporner.com', 'thisvid.com', 'motherless.com'
+}
+IMAGE_DOMAINS = {
+    'instagram.com', 'imgur.com', 'flickr.com', 'pinterest.com', 'imagebam.com', 'imagetwist.com',
+    'pixhost.to', 'postimg.cc', 'ibb.co', 'imgbox.com', 'erome.com', 'fapello.com', 'deviantart.com'
+}
+
+# Domains where a matching result is very likely a leak (file lockers and leak forums) ...
+LEAK_HOST_DOMAINS = {
+    'mega.nz', 'mediafire.com', 'gofile.io', 'pixeldrain.com', 'anonfiles.com', 'bunkr.si', 'bunkr.la',
+    'cyberdrop.me', 'sendvid.com', 'dropmefiles.com', 'krakenfiles.com', 'simpcity.su', 'coomer.su',
+    'kemono.su', 'thothub.to', 'leakedzone.com', 'nudostar.com', 'fapello.com', 'erome.com', 't.me'
+}
+# ... and where it is usually legitimate (official profiles and reference sites)
+OFFICIAL_DOMAINS = {
+    'onlyfans.com', 'fansly.com', 'patreon.com', 'linktr.ee', 'wikipedia.org', 'imdb.com', 'twitter.com',
+    'x.com', 'facebook.com', 'linkedin.com'
+}
+
+# (term, category, weight) matched on whole words of the URL path, title and snippet
+TERMS = [
+    ('video', 'video', 1.0), ('videos', 'video', 1.0), ('clip', 'video', 1.0), ('clips', 'video', 1.0),
+    ('watch', 'video', 0.5), ('stream', 'video', 0.5), ('full video', 'video', 1.5), ('sex tape', 'video', 1.5),
+    ('mp4', 'video', 2.0), ('webm', 'video', 2.0), ('m3u8', 'video', 2.0), ('mov', 'video', 1.0),
+    ('photo', 'image', 1.0), ('photos', 'image', 1.0), ('pics', 'image', 1.0), ('pictures', 'image', 1.0),
+    ('images', 'image', 1.0), ('gallery', 'image', 1.0), ('album', 'image', 1.0), ('selfies', 'image', 1.0),
+    ('jpg', 'image', 2.0), ('jpeg', 'image', 2.0), ('png', 'image', 2.0), ('gif', 'image', 1.5),
+    ('webp', 'image', 2.0),
+    ('leak', 'leak', 1.5), ('leaks', 'leak', 1.5), ('leaked', 'leak', 2.0), ('download', 'leak', 1.0),
+    ('free', 'leak', 0.5), ('mega', 'leak', 1.5), ('torrent', 'leak', 2.0), ('siterip', 'leak', 2.5),
+    ('pack', 'leak', 1.0), ('nude', 'leak', 1.0), ('nudes', 'leak', 1.0), ('uncensored', 'leak', 1.0),
+    ('ppv', 'leak', 1.5), ('premium', 'leak', 0.5), ('exclusive', 'leak', 0.5), ('telegram', 'leak', 1.0),
+    ('discord', 'leak', 0.5), ('full set', 'leak', 1.5), ('reupload', 'leak', 1.5),
+    ('official', 'official', 1.0), ('interview', 'official', 1.0), ('biography', 'official', 1.5),
+    ('wiki', 'official', 1.0), ('net worth', 'official', 1.5), ('news', 'official', 0.5)
+]
+
+# Leak evidence at which a row scores 0.5 confidence, and the level cut-offs
+LEAK_EVIDENCE_MIDPOINT = 2.5
+HIGH_CONFIDENCE = 0.7
+MEDIUM_CONFIDENCE = 0.4
+
+
+class ContentClassifier:
+    def __init__(self, terms=TERMS):
+        """
+        Assign a content type and a leak-confidence score to scan results
+
+        Every term is matched in a single pass over each row's text with a precompiled
+        Aho-Corasick automaton (pyahocorasick) or, without it, one compiled regex alternation.
+        Domain signals are set lookups on the registrable domain.
+
+        Args:
+            terms: (term, category, weight) tuples; categories are content types, 'leak' or 'official'
+        """
+        self._weights = {}
+        for term, category, weight in terms:
+            self._weights.setdefault(term.lower(), []).append((category, weight))
+
+        self._automaton = None
+        self._pattern = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for term in self._weights:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+        else:
+            alternation = '|'.join(re.escape(t) for t in sorted(self._weights, key=len, reverse=True))
+            self._pattern = re.compile(rf"(?<![a-z0-9])(?:{alternation})(?![a-z0-9])")
+
+    def match_terms(self, text):
+        """Whole-word terms found in lowercase text"""
+        if self._automaton is not None:
+            found = []
+            for end, term in self._automaton.iter(text):
+                start = end - len(term) + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end + 1 == len(text) or not text[end + 1].isalnum()):
+                    found.append(term)
+            return found
+        return self._pattern.findall(text)
+
+    def classify_frame(self, df, creator_name=None):
+        """
+        Classify a batch of result rows
+
+        Args:
+            df: DataFrame with url and optionally domain, title and snippet columns
+            creator_name: Creator searched for; rows mentioning them score higher
+
+        Returns:
+            DataFrame aligned with df holding content_type, confidence and confidence_level
+        """
+        if df.empty:
+            return pd.DataFrame({'content_type': [], 'confidence': [], 'confidence_level': []}, index=df.index)
+
+        columns = df.reindex(columns=['url', 'title', 'snippet']).fillna('').astype(str)
+        domains = df['domain'].fillna('').to_numpy() if 'domain' in df.columns else domains_for(columns['url'])
+
+        # One lowercase text per row: URL path words, title and snippet
+        paths = columns['url'].str.split('://', n=1).str[-1].str.partition('/')[2]
+        texts = (paths.str.replace(r'[/_\-.?=&+]', ' ', regex=True) + ' ' + columns['title'] + ' '
+                 + columns['snippet']).str.lower().tolist()
+        creator = creator_name.lower() if creator_name else None
+
+        content_types, confidences = [], []
+        for text, domain in zip(texts, domains):
+            scores = {'video': 0.0, 'image': 0.0, 'leak': 0.0, 'official': 0.0}
+            for term in self.match_terms(text):
+                for category, weight in self._weights[term]:
+                    if category in scores:
+                        scores[category] += weight
+
+            if domain in VIDEO_DOMAINS:
+                scores['video'] += 3.0
+            if domain in IMAGE_DOMAINS:
+                scores['image'] += 3.0
+            if domain in LEAK_HOST_DOMAINS:
+                scores['leak'] += 3.0
+            if domain in OFFICIAL_DOMAINS:
+                scores['official'] += 3.0
+            if creator and creator in text:
+                scores['leak'] += 1.0
+
+            if max(scores['video'], scores['image']) < 1.0:
+                content_types.append('text')
+            else:
+                content_types.append('video' if scores['video'] >= scores['image'] else 'image')
+
+            evidence = max(scores['leak'] - scores['official'], 0.0)
+            confidences.append(round(evidence / (evidence + LEAK_EVIDENCE_MIDPOINT), 3))
+
+        confidence = pd.Series(confidences, index=df.index)
+        return pd.DataFrame({
+            'content_type': pd.Series(content_types, index=df.index),
+            'confidence': confidence,
+            'confidence_level': confidence_levels(confidence)
+        })
+
+    def classify_rows(self, rows, creator_name=None):
+        """Classify result dicts in place and return them"""
+        if not rows:
+            return rows
+        # Result batches convert only the columns classification reads
+        df = rows.to_frame(['url', 'title', 'snippet']) if hasattr(rows, 'to_frame') else pd.DataFrame(rows)
+        labels = self.classify_frame(df, creator_name)
+        for row, content_type, confidence, level in zip(rows, labels['content_type'], labels['confidence'],
+                                                        labels['confidence_level']):
+            row['content_type'] = content_type
+            row['confidence'] = confidence
+            row['confidence_level'] = level
+        return rows
+
+
+def confidence_levels(confidence):
+    """Bucket confidence scores into high, medium and low"""
+    levels = pd.cut(confidence, [-0.001, MEDIUM_CONFIDENCE, HIGH_CONFIDENCE, 1.001], right=False,
+                    labels=['low', 'medium', 'high'])
+    return levels.astype(object)
@@ -0,0 +1,148 @@
+import re
+import hashlib
+import numpy as np
+from keyword_canonicalizer import STOPWORDS
+
+FINGERPRINT_BITS = 64
+
+# Trailing " - Site Name" / " | Site Name" that mirrors append to the same title
+TITLE_SITE_SUFFIX = re.compile(r'\s+[-|\u2013\u2014:]\s+[^-|\u2013\u2014:]{1,40}$')
+
+
+def _feature_digest(feature):
+    """Stable 8-byte hash of a text feature (Python's hash() is salted per process)"""
+    return hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+
+
+def text_features(text):
+    """Word unigrams and bigrams of a text, without stopwords"""
+    tokens = [t for t in re.findall(r"[a-z0-9]+", str(text).lower()) if t not in STOPWORDS]
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def simhash_many(texts):
+    """
+    64-bit SimHash fingerprints of many texts
+
+    Texts sharing most of their features get fingerprints a few bits apart. The bit votes of
+    every text are computed in one pass over a single array of feature hashes.
+
+    Returns:
+        List of fingerprints as ints, with None for texts without features
+    """
+    features = [text_features(text) for text in texts]
+    counts = np.array([len(f) for f in features], dtype=np.int64)
+    if not counts.sum():
+        return [None] * len(features)
+
+    digests = b''.join([_feature_digest(f) for row in features for f in row])
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+
+    # Per-text sums of each bit column; reduceat needs the offsets of non-empty rows only
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    non_empty = counts > 0
+    votes = np.add.reduceat(bits, offsets[non_empty], axis=0, dtype=np.int32) * 2 - counts[non_empty, None]
+    packed = np.packbits(votes > 0, axis=1)
+
+    fingerprints = iter(int.from_bytes(row.tobytes(), 'big') for row in packed)
+    return [next(fingerprints) if has_features else None for has_features in non_empty]
+
+
+def simhash(text):
+    """64-bit SimHash fingerprint of a text, or None for text without features"""
+    return simhash_many([text])[0]
+
+
+def content_text(title, snippet):
+    """Text fingerprinted for a result: its title without a trailing site name, plus the snippet"""
+    title = TITLE_SITE_SUFFIX.sub('', str(title or ''))
+    return f"{title} {snippet or ''}"
+
+
+def content_fingerprint(title, snippet):
+    """SimHash of a result's title and snippet"""
+    return simhash(content_text(title, snippet))
+
+
+def hamming_distance(first, second):
+    """Number of differing bits between two fingerprints"""
+    return bin(first ^ second).count('1')
+
+
+class SimHashIndex:
+    def __init__(self, max_distance=4):
+        """
+        Banded index assigning fingerprints to near-duplicate clusters
+
+        Fingerprints are split into max_distance + 1 bands. Two fingerprints at most max_distance
+        bits apart must agree on at least one whole band, so only items sharing a band bucket are
+        compared and lookups stay sub-linear in the number of indexed items.
+
+        Args:
+            max_distance: Largest Hamming distance at which two texts count as the same content
+        """
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = -(-FINGERPRINT_BITS // self.bands)
+        self._band_mask = (1 << self.band_bits) - 1
+        self._buckets = [{} for _ in range(self.bands)]
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def __sizeof__(self):
+        # Rough per-item cost of the item tuple, its cluster id and one bucket entry per band
+        return object.__sizeof__(self) + len(self._items) * (160 + 40 * self.bands)
+
+    def find(self, fingerprint):
+        """Cluster of the nearest indexed fingerprint within max_distance, or None"""
+        if fingerprint is None:
+            return None
+
+        best_cluster, best_distance = None, self.max_distance + 1
+        seen = set()
+        for band, bucket in zip(self._band_values(fingerprint), self._buckets):
+            for position in bucket.get(band, ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+
+                candidate, cluster_id = self._items[position]
+                distance = hamming_distance(fingerprint, candidate)
+                if distance < best_distance:
+                    best_cluster, best_distance = cluster_id, distance
+                    if distance == 0:
+                        return best_cluster
+        return best_cluster
+
+    def add(self, fingerprint, cluster_id):
+        """Index a fingerprint under a known cluster"""
+        if fingerprint is None:
+            return
+        position = len(self._items)
+        self._items.append((fingerprint, cluster_id))
+        for band, bucket in zip(self._band_values(fingerprint), self._buckets):
+            bucket.setdefault(band, []).append(position)
+
+    def assign(self, fingerprint, new_cluster_id=None):
+        """
+        Add a fingerprint to the cluster of its nearest neighbour, or start a new cluster
+
+        Args:
+            fingerprint: SimHash of the item (None never joins a cluster)
+            new_cluster_id: Cluster id to use when the item starts a new cluster;
+                defaults to the fingerprint in hex
+
+        Returns:
+            The item's cluster id
+        """
+        cluster_id = self.find(fingerprint)
+        if cluster_id is None:
+            cluster_id = new_cluster_id or (f"{fingerprint:016x}" if fingerprint is not None else None)
+        self.add(fingerprint, cluster_id)
+        return cluster_id
+
+    def _band_values(self, fingerprint):
+        """Value of each band of a fingerprint"""
+        return [(fingerprint >> (band * self.band_bits)) & self._band_mask for band in range(self.bands)]
@@ -0,0 +1,138 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from metrics import CACHE_LOOKUPS, CACHE_HIT_RATIO, CACHE_BYTES
+
+
+def file_version(path):
+    """Version of a file as (mtime_ns, size), or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def estimate_size(obj, _seen=None):
+    """Approximate memory footprint of a cached value in bytes"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen) for item in obj)
+    return size
+
+
+class CreatorStateCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+        Thread-safe LRU cache of per-creator state derived from files on disk
+
+        Entries are keyed by (kind, creator) and remember the version of the file they were
+        loaded from, so a changed file is reloaded on the next lookup even without a write hook.
+
+        Args:
+            max_bytes: Approximate upper bound on the memory held by cached values
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind, creator_name, path, loader):
+        """
+        Get cached state for a creator, loading it when missing or stale
+
+        Args:
+            kind: Name of the cached state, e.g. 'content_stats'
+            creator_name: Creator the state belongs to
+            path: File the state is derived from
+            loader: Callable taking the path and returning the state
+
+        Returns:
+            The cached value; callers must treat it as read-only
+        """
+        key = (kind, creator_name)
+        version = (path, file_version(path))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Load outside the lock so slow parses do not block other creators
+        value = loader(path)
+        self._store(key, version, value)
+        return value
+
+    def put(self, kind, creator_name, path, value):
+        """Store state that is already known to match the current version of its file"""
+        self._store((kind, creator_name), (path, file_version(path)), value)
+
+    def get_many(self, kind, creator_names, path_for, loader):
+        """Get cached state for many creators, returning a dict keyed by creator"""
+        return {name: self.get(kind, name, path_for(name), loader) for name in creator_names}
+
+    def invalidate(self, creator_name, kind=None):
+        """Drop cached state of a creator, optionally only one kind"""
+        with self._lock:
+            for key in list(self._entries):
+                if key[1] == creator_name and (kind is None or key[0] == kind):
+                    self._remove(key)
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _store(self, key, version, value):
+        """Insert an entry and evict down to the memory bound"""
+        size = estimate_size(value)
+
+        with self._lock:
+            self._remove(key)
+            if size <= self.max_bytes:
+                self._entries[key] = (version, value, size)
+                self.current_bytes += size
+                self._evict()
+
+    def _remove(self, key):
+        """Remove an entry; caller holds the lock"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def _evict(self):
+        """Evict least recently used entries until under the memory bound; caller holds the lock"""
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.current_bytes -= entry[2]
+
+
+# Shared by every KnowledgeManager and KeywordLearner in the process
+creator_cache = CreatorStateCache(int(os.environ.get('CREATOR_CACHE_MAX_BYTES', 64 * 1024 * 1024)))
+
+
+def _hit_ratio():
+    """Share of lookups served from memory, or None before the first lookup"""
+    lookups = creator_cache.hits + creator_cache.misses
+    return creator_cache.hits / lookups if lookups else None
+
+
+CACHE_LOOKUPS.set_function(
+    lambda: [({'result': 'hit'}, creator_cache.hits), ({'result': 'miss'}, creator_cache.misses)])
+CACHE_HIT_RATIO.set_function(_hit_ratio)
+CACHE_BYTES.set_function(lambda: creator_cache.current_bytes)
@@ -0,0 +1,85 @@
+import os
+import csv
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  Enables pandas' multithreaded pyarrow CSV engine
+except ImportError:  # Falls back to pandas' C parser
+    pyarrow = None
+
+# Columns with few distinct values; loaded as categoricals so each value is stored once
+CATEGORICAL_COLUMNS = ('query', 'date', 'page', 'discovered_date', 'domain', 'content_type',
+                       'confidence_level', 'region', 'regions')
+
+# Columns the near-duplicate clustering keeps as hex strings
+STRING_COLUMNS = ('simhash', 'cluster_id')
+
+# Files larger than this are read in chunks by iter_table
+CHUNK_THRESHOLD_BYTES = 64 * 1024 * 1024
+DEFAULT_CHUNKSIZE = 100000
+
+
+def read_header(path):
+    """Column names of a CSV file, without parsing any rows"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
+
+
+def _read_options(path, columns, categorical, dtype, keep_default_na):
+    """read_csv keyword arguments for a projected, dictionary-encoded read"""
+    header = read_header(path)
+    usecols = header if columns is None else [c for c in header if c in columns]
+
+    dtypes = {c: str for c in usecols if c in STRING_COLUMNS}
+    if dtype is not None:
+        dtypes.update({c: dtype for c in usecols})
+    if categorical:
+        dtypes.update({c: 'category' for c in usecols if c in CATEGORICAL_COLUMNS})
+
+    return {'usecols': usecols, 'dtype': dtypes, 'keep_default_na': keep_default_na}
+
+
+def read_table(path, columns=None, categorical=True, dtype=None, keep_default_na=True):
+    """
+    Load the columns of a results or master content CSV that a call site needs
+
+    Args:
+        path: CSV file
+        columns: Columns to load; columns missing from the file are skipped (default: all)
+        categorical: Load low-cardinality columns (CATEGORICAL_COLUMNS) as categoricals;
+            callers that write new values into those columns should pass False
+        dtype: dtype for every other loaded column, e.g. str (default: inferred)
+        keep_default_na: Parse empty fields as NaN (False keeps them as '')
+
+    Returns:
+        DataFrame with the requested columns in file order
+    """
+    options = _read_options(path, columns, categorical, dtype, keep_default_na)
+    if pyarrow is not None:
+        return pd.read_csv(path, engine='pyarrow', **options)
+    return pd.read_csv(path, **options)
+
+
+def iter_table(path, columns=None, categorical=True, dtype=None, keep_default_na=True, chunksize=None):
+    """
+    Iterate over a CSV in DataFrame chunks, so oversized files never load at once
+
+    Files under CHUNK_THRESHOLD_BYTES are yielded as a single frame (using the fastest engine);
+    larger ones in chunks of chunksize rows. Arguments are as for read_table.
+    """
+    if chunksize is None and os.path.getsize(path) <= CHUNK_THRESHOLD_BYTES:
+        yield read_table(path, columns, categorical, dtype, keep_default_na)
+        return
+
+    options = _read_options(path, columns, categorical, dtype, keep_default_na)
+    with pd.read_csv(path, chunksize=chunksize or DEFAULT_CHUNKSIZE, **options) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def uncategorize(df, columns):
+    """Turn categorical columns back into object columns before new values are written into them"""
+    for column in columns:
+        if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(object)
+    return df
@@ -0,0 +1,106 @@
+import re
+import logging
+from functools import lru_cache
+import pandas as pd
+
+try:
+    import tldextract
+except ImportError:  # Degrades to the built-in suffix subset below, with a warning
+    tldextract = None
+
+logger = logging.getLogger(__name__)
+
+# Multi-label public suffixes (ICANN and common private registries) used only if tldextract is missing
+FALLBACK_SUFFIXES = {
+    'co.uk', 'org.uk', 'me.uk', 'ltd.uk', 'plc.uk', 'net.uk', 'ac.uk', 'gov.uk',
+    'com.au', 'net.au', 'org.au', 'edu.au', 'gov.au', 'co.nz', 'net.nz', 'org.nz',
+    'co.jp', 'ne.jp', 'or.jp', 'ac.jp', 'go.jp', 'co.kr', 'or.kr', 'com.cn', 'net.cn', 'org.cn',
+    'com.hk', 'com.tw', 'com.sg', 'com.my', 'co.id', 'co.th', 'com.ph', 'com.vn', 'co.in', 'net.in',
+    'org.in', 'com.br', 'net.br', 'org.br', 'com.mx', 'com.ar', 'com.co', 'com.pe', 'com.tr',
+    'co.za', 'com.ng', 'co.ke', 'com.eg', 'com.sa', 'com.ua', 'co.il', 'com.pl', 'com.ru',
+    'blogspot.com', 'github.io', 'gitlab.io', 'herokuapp.com', 'appspot.com', 'web.app',
+    'firebaseapp.com', 'netlify.app', 'vercel.app', 'pages.dev', 'workers.dev', 'wordpress.com',
+    'tumblr.com', 'neocities.org', 'glitch.me', 'fly.dev', 'onrender.com', 'azurewebsites.net',
+    'cloudfront.net', 's3.amazonaws.com', 'r2.dev'
+}
+
+IP_ADDRESS = re.compile(r'^(\d{1,3}(\.\d{1,3}){3}|\[?[0-9a-f:]+\]?)$')
+
+
+@lru_cache(maxsize=None)
+def _extractor():
+    """
+    Create the tldextract parser on first use, from its bundled suffix list snapshot
+
+    No suffix list is fetched and nothing is cached on disk. Returns None, logging a warning
+    once, when tldextract is not installed.
+    """
+    if tldextract is None:
+        logger.warning("⚠️ tldextract is not installed; registrable domains use a built-in subset "
+                       "of the public suffix list and may be wrong for less common suffixes")
+        return None
+    return tldextract.TLDExtract(cache_dir=None, suffix_list_urls=(), include_psl_private_domains=True)
+
+
+def url_host(url):
+    """Lowercase host of a URL without userinfo, port or trailing dot"""
+    if not isinstance(url, str):
+        return ''
+
+    # Plain string splitting is several times faster than urlsplit or a regex here
+    rest = url.strip()
+    rest = rest.split('://', 1)[1] if '://' in rest else rest.lstrip('/')
+    authority = rest.split('/', 1)[0].split('?', 1)[0].split('#', 1)[0]
+    host = authority.rpartition('@')[2]
+    if host.startswith('['):
+        host = host[1:host.find(']')]
+    else:
+        host = host.split(':', 1)[0]
+    return host.rstrip('.').lower()
+
+
+@lru_cache(maxsize=131072)
+def registrable_domain(host):
+    """
+    Registrable domain (eTLD+1) of a host, e.g. "cdn.example.co.uk" -> "example.co.uk"
+
+    IP addresses, single-label hosts and bare public suffixes are returned unchanged.
+    """
+    host = host.lower().rstrip('.')
+    if not host or '.' not in host or IP_ADDRESS.match(host):
+        return host
+
+    extractor = _extractor()
+    if extractor is not None:
+        parts = extractor(host)
+        return f"{parts.domain}.{parts.suffix}" if parts.domain and parts.suffix else host
+
+    labels = host.split('.')
+    for size in (3, 2):
+        if len(labels) > size and '.'.join(labels[-size:]) in FALLBACK_SUFFIXES:
+            return '.'.join(labels[-size - 1:])
+    return '.'.join(labels[-2:])
+
+
+def domain_of(url):
+    """Registrable domain of a URL"""
+    return registrable_domain(url_host(url))
+
+
+def domains_for(urls):
+    """
+    Registrable domains of many URLs
+
+    Each distinct URL is parsed once and hosts resolve through the memoized parser, so
+    repeated URLs and domains cost a lookup rather than a parse.
+
+    Args:
+        urls: Sequence or Series of URLs
+
+    Returns:
+        numpy object array of domains aligned with urls ('' for missing URLs)
+    """
+    codes, uniques = pd.factorize(pd.Series(urls, dtype=object))
+    domains = pd.Series([domain_of(url) for url in uniques] + [''], dtype=object).to_numpy()
+    # factorize marks missing values with -1, which indexes the trailing ''
+    return domains[codes]
@@ -0,0 +1,164 @@
+import os
+import sqlite3
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class DomainIntelligence:
+    def __init__(self, db_path=None):
+        """
+        Persistent per-domain table across every creator's master content
+
+        Tracks when each registrable domain was first and last seen, how many URLs it hosts
+        and which creators it affects. Rows are added as master content grows, so domain
+        analytics read these aggregates instead of rescanning URL columns.
+
+        Args:
+            db_path: SQLite database file (default: master_data/domain_intel.db)
+        """
+        self.db_path = db_path or os.path.join(os.getcwd(), "master_data", "domain_intel.db")
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS domains (
+                    domain TEXT PRIMARY KEY,
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL,
+                    url_count INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS domain_creators (
+                    domain TEXT NOT NULL,
+                    creator TEXT NOT NULL,
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL,
+                    url_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (domain, creator)
+                );
+                CREATE INDEX IF NOT EXISTS idx_domain_creators_creator ON domain_creators (creator);
+            """)
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection for one transaction; connections are never shared across threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def record(self, creator_name, domains, seen_date=None):
+        """
+        Add newly stored URLs to the domain table
+
+        Args:
+            creator_name: Creator the URLs belong to
+            domains: Registrable domain of each new URL (one entry per URL)
+            seen_date: Date the URLs were found (default: today)
+
+        Returns:
+            Number of distinct domains updated
+        """
+        counts = Counter(d for d in domains if d)
+        if not counts:
+            return 0
+
+        seen_date = seen_date or datetime.now().strftime('%Y-%m-%d')
+        rows = [(domain, seen_date, seen_date, count) for domain, count in counts.items()]
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("""
+                    INSERT INTO domains (domain, first_seen, last_seen, url_count) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (domain) DO UPDATE SET
+                        first_seen = MIN(first_seen, excluded.first_seen),
+                        last_seen = MAX(last_seen, excluded.last_seen),
+                        url_count = url_count + excluded.url_count
+                """, rows)
+                conn.executemany("""
+                    INSERT INTO domain_creators (domain, creator, first_seen, last_seen, url_count)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (domain, creator) DO UPDATE SET
+                        first_seen = MIN(first_seen, excluded.first_seen),
+                        last_seen = MAX(last_seen, excluded.last_seen),
+                        url_count = url_count + excluded.url_count
+                """, [(domain, creator_name, first, last, count) for domain, first, last, count in rows])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        return len(counts)
+
+    def has_creator(self, creator_name):
+        """Whether any domain has been recorded for a creator"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM domain_creators WHERE creator = ? LIMIT 1", (creator_name,)).fetchone()
+        return row is not None
+
+    def creator_domains(self, creator_name):
+        """URL count per domain for one creator, most URLs first"""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT domain, url_count FROM domain_creators WHERE creator = ?
+                ORDER BY url_count DESC, domain
+            """, (creator_name,)).fetchall()
+        return {r['domain']: r['url_count'] for r in rows}
+
+    def top_domains(self, limit=20, creator_name=None):
+        """
+        Domains hosting the most URLs
+
+        Args:
+            limit: Maximum number of domains returned
+            creator_name: Only count URLs of this creator
+
+        Returns:
+            List of dicts with domain, first_seen, last_seen, url_count and creators
+        """
+        where = "WHERE dc.creator = ?" if creator_name else ""
+        params = (creator_name, limit) if creator_name else (limit,)
+
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                SELECT dc.domain, MIN(dc.first_seen) AS first_seen, MAX(dc.last_seen) AS last_seen,
+                       SUM(dc.url_count) AS url_count, GROUP_CONCAT(dc.creator, '\x1f') AS creators
+                FROM domain_creators dc
+                {where}
+                GROUP BY dc.domain
+                ORDER BY url_count DESC, dc.domain
+                LIMIT ?
+            """, params).fetchall()
+
+        return [{
+            'domain': r['domain'],
+            'first_seen': r['first_seen'],
+            'last_seen': r['last_seen'],
+            'url_count': r['url_count'],
+            'creators': sorted(r['creators'].split('\x1f')) if r['creators'] else []
+        } for r in rows]
+
+    def get(self, domain):
+        """Aggregates for one domain, or None if it was never seen"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM domains WHERE domain = ?", (domain,)).fetchone()
+            if row is None:
+                return None
+            creators = conn.execute("""
+                SELECT creator, url_count FROM domain_creators WHERE domain = ? ORDER BY url_count DESC
+            """, (domain,)).fetchall()
+
+        return {
+            'domain': row['domain'],
+            'first_seen': row['first_seen'],
+            'last_seen': row['last_seen'],
+            'url_count': row['url_count'],
+            'creators': {r['creator']: r['url_count'] for r in creators}
+        }
@@ -0,0 +1,105 @@
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import h2  # noqa: F401  Enables HTTP/2 in httpx (pip install httpx[http2])
+except ImportError:  # Async clients fall back to HTTP/1.1 keep-alive
+    h2 = None
+
+# Seconds to establish a connection and to wait between bytes of a response
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 30.0
+
+# Google APIs only compress responses for user agents containing "gzip"
+USER_AGENT = "LeakScraper/1.0 (gzip)"
+
+
+class HttpTransport:
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, pool_connections=10,
+                 pool_maxsize=32):
+        """
+        Shared HTTP connections for the sync and async clients
+
+        The sync session keeps a keep-alive pool per host, so repeated API calls reuse one
+        TCP and TLS connection instead of opening a new one per request. Every request has
+        explicit connect and read timeouts, so a stalled socket fails instead of hanging a
+        scan thread, and asks for gzip-compressed responses.
+
+        Args:
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for the server between bytes of a response
+            pool_connections: Number of hosts to keep connection pools for
+            pool_maxsize: Connections kept alive per host (threads beyond it wait for a free one)
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The pooled requests session, created on first use"""
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                # Retries are left to callers, which know which failures are worth repeating
+                adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize,
+                                      pool_block=True, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate'})
+                self._session = session
+            return self._session
+
+    def get(self, url, params=None, fields=None, headers=None, timeout=None):
+        """
+        GET a URL over the pooled session
+
+        Args:
+            url: URL, optionally with a query string
+            params: Extra query parameters
+            fields: Partial response projection (Google APIs' fields parameter), e.g.
+                "items(title,link)", so only the needed fields are sent and parsed
+            headers: Extra request headers
+            timeout: (connect, read) seconds overriding the defaults
+
+        Returns:
+            requests.Response
+        """
+        params = dict(params or {})
+        if fields:
+            params['fields'] = fields
+        return self.session.get(url, params=params or None, headers=headers,
+                                timeout=timeout or (self.connect_timeout, self.read_timeout))
+
+    def async_client(self, **kwargs):
+        """
+        httpx.AsyncClient with the same timeouts and compression, using HTTP/2 when h2 is installed
+
+        The client holds its own pool and belongs to one event loop, so callers open it
+        with "async with" for the duration of a run. Keyword arguments override the defaults.
+        """
+        options = {
+            'timeout': httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            'limits': httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize),
+            'http2': h2 is not None,
+        }
+        options.update(kwargs)
+        options['headers'] = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate',
+                              **(kwargs.get('headers') or {})}
+        return httpx.AsyncClient(**options)
+
+    def close(self):
+        """Close pooled connections; the session is recreated on next use"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+# Shared by every component in the process
+http_transport = HttpTransport()
@@ -0,0 +1,111 @@
+import re
+from functools import lru_cache
+
+# Words that never change the intent of a search keyword
+STOPWORDS = {'a', 'an', 'and', 'the', 'of', 'or', 'in', 'on', 'for', 'with', 'to', 'from', 'by'}
+
+
+@lru_cache(maxsize=None)
+def _stemmer():
+    """Create the shared Porter stemmer on first use"""
+    from nltk.stem import PorterStemmer
+    return PorterStemmer()
+
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """Stem a single lowercase word"""
+    return _stemmer().stem(word)
+
+
+class KeywordCanonicalizer:
+    def __init__(self, similarity_threshold=0.75):
+        """
+        Merge keyword variants that express the same search intent
+
+        Args:
+            similarity_threshold: Jaccard similarity of stemmed token sets at which two keywords are merged
+        """
+        self.similarity_threshold = similarity_threshold
+
+    def signature(self, keyword, ignore_terms=None):
+        """Order-independent set of stemmed tokens for a keyword"""
+        tokens = re.findall(r"[a-z0-9]+", keyword.lower())
+        ignored = self._ignored_tokens(ignore_terms)
+        return frozenset(stem(t) for t in tokens if t not in STOPWORDS and t not in ignored)
+
+    def similarity(self, first, second):
+        """Jaccard similarity of two keyword signatures"""
+        if not first or not second:
+            return 1.0 if first == second else 0.0
+        return len(first & second) / len(first | second)
+
+    def dedupe(self, keywords, ignore_terms=None):
+        """Keep the first keyword of every distinct intent, preserving order"""
+        unique_keywords = []
+        signatures = []
+
+        for keyword in keywords:
+            signature = self.signature(keyword, ignore_terms)
+            if self._find_match(signature, signatures) is not None:
+                continue
+            unique_keywords.append(keyword)
+            signatures.append(signature)
+
+        return unique_keywords
+
+    def canonicalize_database(self, keyword_data):
+        """
+        Merge near-duplicate entries of a keyword database
+
+        Each group of variants collapses into its most frequent keyword. Occurrence counts are
+        summed, the first/last seen dates widened, and the other variants kept as aliases.
+
+        Args:
+            keyword_data: Dict mapping keyword to its stats
+
+        Returns:
+            New dict with one entry per canonical keyword
+        """
+        # Most frequent, then shortest variant becomes the canonical form
+        ordered = sorted(keyword_data.items(), key=lambda x: (-x[1].get('occurrence', 0), len(x[0]), x[0]))
+
+        canonical_keys = []
+        signatures = []
+        merged = {}
+
+        for keyword, stats in ordered:
+            signature = self.signature(keyword)
+            match = self._find_match(signature, signatures)
+
+            if match is None:
+                canonical_keys.append(keyword)
+                signatures.append(signature)
+                merged[keyword] = dict(stats, aliases=sorted(set(stats.get('aliases', []))))
+                continue
+
+            entry = merged[canonical_keys[match]]
+            entry['occurrence'] = entry.get('occurrence', 0) + stats.get('occurrence', 0)
+            entry['first_seen'] = min((d for d in (entry.get('first_seen'), stats.get('first_seen')) if d), default=None)
+            entry['last_seen'] = max((d for d in (entry.get('last_seen'), stats.get('last_seen')) if d), default=None)
+            aliases = set(entry['aliases']) | set(stats.get('aliases', [])) | {keyword}
+            aliases.discard(canonical_keys[match])
+            entry['aliases'] = sorted(aliases)
+
+        return merged
+
+    def _find_match(self, signature, signatures):
+        """Index of the first signature similar enough to merge with, if any"""
+        for i, other in enumerate(signatures):
+            if self.similarity(signature, other) >= self.similarity_threshold:
+                return i
+        return None
+
+    @staticmethod
+    def _ignored_tokens(ignore_terms):
+        """Lowercase tokens of terms left out of signatures, e.g. the creator name"""
+        if not ignore_terms:
+            return set()
+        if isinstance(ignore_terms, str):
+            ignore_terms = [ignore_terms]
+        return {t for term in ignore_terms for t in re.findall(r"[a-z0-9]+", term.lower())}
@@ -1,62 +1,180 @@
 import pandas as pd
-import openai
-import nltk
-from nltk.tokenize import word_tokenize
 from collections import Counter
 import os
-import json
+import re
 from datetime import datetime
 import ast
+import asyncio
+from prompt_builder import PromptSampleBuilder
+from keyword_canonicalizer import KeywordCanonicalizer
+from data_access import read_table
+from profiling import profiler
+from metrics import LLM_SECONDS
+from creator_cache import creator_cache
+from rate_limiter import AsyncTokenRateLimiter, retry_delay
+from serialization import load_file, dump_file
 
 
 class KeywordLearner:
-    def __init__(self, openai_api_key):
+    def __init__(self, openai_api_key, prompt_token_budget=600, model="gpt-3.5-turbo", max_completion_tokens=400):
         """Initialize the keyword learner"""
-        self.openai_client = openai.OpenAI(api_key=openai_api_key)
+        self.openai_api_key = openai_api_key
+        self._openai_client = None
+        self._word_tokenize = None
+        self.model = model
+        self.max_completion_tokens = max_completion_tokens
         self.keyword_db_path = os.path.join(os.getcwd(), "knowledge_base")
         os.makedirs(self.keyword_db_path, exist_ok=True)
 
-        # Download NLTK resources
-        nltk.download("punkt", quiet=True)
+        # Builds the sample content section of the keyword prompt
+        self.prompt_builder = PromptSampleBuilder(token_budget=prompt_token_budget, model=model)
 
-    def learn_from_results(self, temp_csv_path, creator_name):
-        """Learn keywords from scraped results"""
-        if not os.path.exists(temp_csv_path):
-            print("❌ Temp CSV file not found")
+        # Merges keyword variants such as "onlyfans leaks" / "leaked onlyfans"
+        self.canonicalizer = KeywordCanonicalizer()
+
+    @property
+    def openai_client(self):
+        """OpenAI client, created on first use to keep startup fast"""
+        if self._openai_client is None:
+            import openai
+            self._openai_client = openai.OpenAI(api_key=self.openai_api_key)
+        return self._openai_client
+
+    def _get_tokenizer(self):
+        """Load the NLTK word tokenizer, downloading punkt only when it is missing locally"""
+        if self._word_tokenize is not None:
+            return self._word_tokenize
+
+        try:
+            import nltk
+            try:
+                nltk.data.find("tokenizers/punkt")
+            except LookupError:
+                if os.environ.get('NLTK_AUTO_DOWNLOAD', '1') != '1' or not nltk.download("punkt", quiet=True):
+                    raise LookupError("NLTK punkt data is not available")
+            from nltk.tokenize import word_tokenize
+            self._word_tokenize = word_tokenize
+        except (ImportError, LookupError) as e:
+            print(f"ℹ️ Using simple tokenizer: {e}")
+            self._word_tokenize = lambda text: re.findall(r"[a-z]+", text)
+
+        return self._word_tokenize
+
+    def learn_from_results(self, results, creator_name):
+        """
+        Learn keywords from scraped results
+
+        Args:
+            results: DataFrame of scan results, or the path of a temp CSV holding them
+            creator_name: Creator the results belong to
+        """
+        df = self._load_results(results)
+        if df is None:
             return []
+        extracted_keywords = self._extract_candidates(df)
+
+        # Generate optimized keywords with AI
+        ai_keywords = self._generate_ai_keywords(df, extracted_keywords, creator_name)
+        print(f"🧠 Generated {len(ai_keywords)} AI-optimized keywords")
+
+        # Update keywords database
+        updated_keywords = self._update_keyword_database(ai_keywords, creator_name)
+
+        return updated_keywords
+
+    def learn_from_results_batch(self, jobs, max_concurrency=8, tokens_per_minute=90000, max_retries=5):
+        """
+        Learn keywords for many creators with concurrent OpenAI calls
 
-        print(f"📊 Analyzing results from {temp_csv_path}")
+        Runs its own event loop, so it must be called from synchronous code.
 
-        # Load the temp CSV with scraped results
-        df = pd.read_csv(temp_csv_path)
+        Args:
+            jobs: Iterable of (results, creator_name) pairs, results being a DataFrame or temp CSV path;
+                several results of one creator are merged into one prompt
+            max_concurrency: Maximum number of in-flight OpenAI requests
+            tokens_per_minute: Token throughput allowed across all requests
+            max_retries: Retries per request when rate limited (HTTP 429)
 
+        Returns:
+            Dict mapping creator name to its updated keyword list
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass  # No loop running in this thread, so asyncio.run below can start one
+        else:
+            raise RuntimeError("learn_from_results_batch cannot be called from a running event loop; "
+                               "call it from a worker thread (e.g. asyncio.to_thread)")
+
+        # Results of the same creator are learned from together instead of overwriting each other
+        frames = {}
+        for results, creator_name in jobs:
+            df = self._load_results(results)
+            if df is not None:
+                frames.setdefault(creator_name, []).append(df)
+
+        prompts = {}
+        for creator_name, creator_frames in frames.items():
+            merged = creator_frames[0] if len(creator_frames) == 1 else pd.concat(creator_frames, ignore_index=True)
+            prompts[creator_name] = self._build_prompt(merged, self._extract_candidates(merged), creator_name)
+
+        if not prompts:
+            return {}
+
+        print(f"🧠 Generating keywords for {len(prompts)} creators "
+              f"(concurrency {max_concurrency}, {tokens_per_minute} tokens/min)")
+
+        with profiler.span('llm_batch'):
+            responses = asyncio.run(
+                self._generate_ai_keywords_batch(prompts, max_concurrency, tokens_per_minute, max_retries))
+
+        ai_keywords_by_creator = {}
+        for creator_name, generated_text in responses.items():
+            if generated_text is None:
+                continue
+            ai_keywords_by_creator[creator_name] = self._parse_ai_keywords(generated_text)
+
+        # Commit all keyword updates together once every LLM call has finished
+        return self._update_keyword_databases(ai_keywords_by_creator)
+
+    def _load_results(self, results):
+        """Scraped results as a DataFrame, or None if the temp CSV does not exist"""
+        if isinstance(results, pd.DataFrame):
+            print(f"📊 Analyzing {len(results)} results")
+            return results
+
+        if not os.path.exists(results):
+            print("❌ Temp CSV file not found")
+            return None
+
+        print(f"📊 Analyzing results from {results}")
+
+        # Load only the columns keyword extraction and the prompt sample read
+        return read_table(results, ['title', 'snippet', 'query', 'url'])
+
+    def _extract_candidates(self, df):
+        """Candidate keywords from the titles and snippets of loaded results"""
         # Extract text for analysis
         text_corpus = []
-        for _, row in df.iterrows():
-            text_corpus.append(row.get('title', ''))
-            text_corpus.append(row.get('snippet', ''))
+        for column in ('title', 'snippet'):
+            if column in df.columns:
+                text_corpus.extend(df[column].tolist())
 
         full_text = " ".join([t for t in text_corpus if isinstance(t, str)])
 
         print(f"📝 Extracted {len(text_corpus)} text elements for analysis")
 
         # Extract potential keywords with NLTK
-        extracted_keywords = self._extract_keywords(full_text)
+        with profiler.span('nltk'):
+            extracted_keywords = self._extract_keywords(full_text)
         print(f"🔍 Extracted {len(extracted_keywords)} candidate keywords")
 
-        # Generate optimized keywords with AI
-        ai_keywords = self._generate_ai_keywords(df, extracted_keywords, creator_name)
-        print(f"🧠 Generated {len(ai_keywords)} AI-optimized keywords")
-
-        # Update keywords database
-        updated_keywords = self._update_keyword_database(ai_keywords, creator_name)
-
-        return updated_keywords
+        return extracted_keywords
 
     def _extract_keywords(self, text):
         """Extract potential keywords from text"""
         # Tokenize and count word frequencies
-        words = word_tokenize(text.lower())
+        words = self._get_tokenizer()(text.lower())
 
         # Filter non-alphabetic words and short words
         filtered_words = [word for word in words if word.isalpha() and len(word) > 3]
@@ -69,15 +187,81 @@ class KeywordLearner:
 
     def _generate_ai_keywords(self, df, extracted_keywords, creator_name):
         """Generate keywords using AI"""
-        # Prepare data for OpenAI
-        csv_text = df.to_string(index=False, max_rows=30)
+        prompt = self._build_prompt(df, extracted_keywords, creator_name)
+
+        try:
+            with profiler.span('llm'), LLM_SECONDS.time(mode='single'):
+                response = self.openai_client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.7,
+                    max_tokens=self.max_completion_tokens
+                )
+
+            generated_text = response.choices[0].message.content.strip()
+            print("📋 AI response received")
+
+            return self._parse_ai_keywords(generated_text)
+
+        except Exception as e:
+            print(f"❌ Error generating AI keywords: {e}")
+            return []
+
+    async def _generate_ai_keywords_batch(self, prompts, max_concurrency, tokens_per_minute, max_retries):
+        """Run keyword generation prompts concurrently under concurrency and token limits"""
+        import openai
+
+        client = openai.AsyncOpenAI(api_key=self.openai_api_key, max_retries=0)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        limiter = AsyncTokenRateLimiter(tokens_per_minute)
+
+        async def generate(creator_name, prompt):
+            estimated_tokens = self.prompt_builder.count_tokens(prompt) + self.max_completion_tokens
+
+            async with semaphore:
+                for attempt in range(max_retries + 1):
+                    await limiter.acquire(estimated_tokens)
+                    try:
+                        with LLM_SECONDS.time(mode='batch'):
+                            response = await client.chat.completions.create(
+                                model=self.model,
+                                messages=[{"role": "user", "content": prompt}],
+                                temperature=0.7,
+                                max_tokens=self.max_completion_tokens
+                            )
+                        print(f"📋 AI response received for {creator_name}")
+                        return creator_name, response.choices[0].message.content.strip()
+
+                    except openai.RateLimitError as e:
+                        if attempt == max_retries:
+                            print(f"❌ Rate limited generating keywords for {creator_name}: {e}")
+                            return creator_name, None
+                        delay = retry_delay(attempt, e.response.headers.get('retry-after'))
+                        print(f"⚠️ Rate limited for {creator_name}, retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+
+                    except Exception as e:
+                        print(f"❌ Error generating AI keywords for {creator_name}: {e}")
+                        return creator_name, None
+
+        try:
+            results = await asyncio.gather(*(generate(c, p) for c, p in prompts.items()))
+        finally:
+            await client.close()
+
+        return dict(results)
+
+    def _build_prompt(self, df, extracted_keywords, creator_name):
+        """Build the keyword generation prompt for a creator"""
+        # Prepare a diverse, token-budgeted sample for OpenAI
+        sample_text = self.prompt_builder.build(df)
 
         # Load existing keywords from database if available
         existing_keywords = self._get_existing_keywords(creator_name)
         existing_keywords_text = ", ".join(
             existing_keywords[:15]) if existing_keywords else "No previous keywords available"
 
-        prompt = f"""
+        return f"""
         **Role: You are a Search Intelligence Analyst specializing in finding leaked content.**
 
         We need to generate optimal search keywords for finding leaked content of creator "{creator_name}".
@@ -89,7 +273,7 @@ class KeywordLearner:
         {extracted_keywords[:30]}
 
         **SAMPLE CONTENT:**
-        {csv_text[:2000]}
+        {sample_text}
 
         **YOUR TASK:**
         - Analyze the content to identify keywords that would find more leaked content
@@ -104,43 +288,29 @@ class KeywordLearner:
         Example: ["leaked onlyfans", "nude photos", "explicit content", "private video"]
         """
 
+    def _parse_ai_keywords(self, generated_text):
+        """Extract the keyword list from an AI response"""
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=400
-            )
-
-            generated_text = response.choices[0].message.content.strip()
-            print("📋 AI response received")
-
-            # Process the response to extract keywords
-            try:
-                # Clean up the list format
-                clean_text = generated_text.replace('\n', ' ')
-
-                # Find the list part
-                start_idx = clean_text.find('[')
-                end_idx = clean_text.rfind(']')
-
-                if start_idx != -1 and end_idx != -1:
-                    list_text = clean_text[start_idx:end_idx + 1]
-                    # Convert string representation to actual list
-                    keywords = ast.literal_eval(list_text)
-                    return keywords
-                else:
-                    # Fallback if list format not found
-                    return self._extract_fallback_keywords(generated_text)
-
-            except Exception as e:
-                print(f"❌ Error parsing AI keywords: {e}")
-                print("🔄 Using fallback keyword extraction")
+            # Clean up the list format
+            clean_text = generated_text.replace('\n', ' ')
+
+            # Find the list part
+            start_idx = clean_text.find('[')
+            end_idx = clean_text.rfind(']')
+
+            if start_idx != -1 and end_idx != -1:
+                list_text = clean_text[start_idx:end_idx + 1]
+                # Convert string representation to actual list
+                keywords = ast.literal_eval(list_text)
+                return keywords
+            else:
+                # Fallback if list format not found
                 return self._extract_fallback_keywords(generated_text)
 
         except Exception as e:
-            print(f"❌ Error generating AI keywords: {e}")
-            return []
+            print(f"❌ Error parsing AI keywords: {e}")
+            print("🔄 Using fallback keyword extraction")
+            return self._extract_fallback_keywords(generated_text)
 
     def _extract_fallback_keywords(self, text):
         """Extract keywords from text as fallback"""
@@ -164,14 +334,16 @@ class KeywordLearner:
 
     def _get_existing_keywords(self, creator_name):
         """Get existing keywords from database"""
-        db_file = os.path.join(self.keyword_db_path, f"{creator_name.replace(' ', '_')}_keywords.json")
+        return creator_cache.get('keywords', creator_name, self._keyword_db_file(creator_name),
+                                 self._load_sorted_keywords)
 
+    def _load_sorted_keywords(self, db_file):
+        """Load a keyword database as a list sorted by occurrence"""
         if not os.path.exists(db_file):
             return []
 
         try:
-            with open(db_file, 'r') as f:
-                keyword_data = json.load(f)
+            keyword_data = self.canonicalizer.canonicalize_database(load_file(db_file))
 
             # Sort by familiarity index (occurrence count)
             sorted_keywords = sorted(keyword_data.items(), key=lambda x: x[1]['occurrence'], reverse=True)
@@ -182,45 +354,67 @@ class KeywordLearner:
 
     def _update_keyword_database(self, ai_keywords, creator_name):
         """Update keyword database with new keywords"""
-        db_file = os.path.join(self.keyword_db_path, f"{creator_name.replace(' ', '_')}_keywords.json")
-
-        # Load existing database or create new one
-        if os.path.exists(db_file):
-            try:
-                with open(db_file, 'r') as f:
-                    keyword_data = json.load(f)
-            except Exception as e:
-                print(f"❌ Error reading keyword database: {e}")
-                keyword_data = {}
-        else:
-            keyword_data = {}
+        return self._update_keyword_databases({creator_name: ai_keywords})[creator_name]
 
-        # Update occurrence counts for keywords
+    def _update_keyword_databases(self, ai_keywords_by_creator):
+        """Update the keyword databases of several creators in one commit"""
         current_date = datetime.now().strftime('%Y-%m-%d')
+        staged = {}
+
+        # Merge every creator's keywords before writing anything
+        for creator_name, ai_keywords in ai_keywords_by_creator.items():
+            db_file = self._keyword_db_file(creator_name)
+            keyword_data = self._load_keyword_data(db_file)
+
+            # Update occurrence counts for keywords
+            for keyword in ai_keywords:
+                keyword = keyword.lower().strip()
+                if keyword in keyword_data:
+                    # Update existing keyword
+                    keyword_data[keyword]['occurrence'] += 1
+                    keyword_data[keyword]['last_seen'] = current_date
+                else:
+                    # Add new keyword
+                    keyword_data[keyword] = {
+                        'occurrence': 1,
+                        'first_seen': current_date,
+                        'last_seen': current_date
+                    }
 
-        for keyword in ai_keywords:
-            keyword = keyword.lower().strip()
-            if keyword in keyword_data:
-                # Update existing keyword
-                keyword_data[keyword]['occurrence'] += 1
-                keyword_data[keyword]['last_seen'] = current_date
-            else:
-                # Add new keyword
-                keyword_data[keyword] = {
-                    'occurrence': 1,
-                    'first_seen': current_date,
-                    'last_seen': current_date
-                }
-
-        # Save updated database
-        with open(db_file, 'w') as f:
-            json.dump(keyword_data, f, indent=2)
-
-        print(f"✅ Updated keyword database with {len(ai_keywords)} keywords")
-
-        # Return all keywords sorted by occurrence
-        sorted_keywords = sorted(keyword_data.items(), key=lambda x: x[1]['occurrence'], reverse=True)
-        return [k for k, v in sorted_keywords]
+            # Fold near-duplicate variants into one canonical entry with aliases
+            keyword_data = self.canonicalizer.canonicalize_database(keyword_data)
+
+            staged[creator_name] = (db_file, keyword_data)
+
+        # Save updated databases, replacing each file atomically
+        updated = {}
+        for creator_name, (db_file, keyword_data) in staged.items():
+            with profiler.span('keyword_db_write') as span:
+                span.add_bytes(written=dump_file(keyword_data, db_file))
+            creator_cache.invalidate(creator_name, 'keywords')
+
+            print(f"✅ Updated keyword database with {len(ai_keywords_by_creator[creator_name])} keywords")
+
+            # Return all keywords sorted by occurrence
+            sorted_keywords = sorted(keyword_data.items(), key=lambda x: x[1]['occurrence'], reverse=True)
+            updated[creator_name] = [k for k, v in sorted_keywords]
+
+        return updated
+
+    def _keyword_db_file(self, creator_name):
+        """Path of a creator's keyword database"""
+        return os.path.join(self.keyword_db_path, f"{creator_name.replace(' ', '_')}_keywords.json")
+
+    def _load_keyword_data(self, db_file):
+        """Load a keyword database or start a new one"""
+        if not os.path.exists(db_file):
+            return {}
+
+        try:
+            return load_file(db_file)
+        except Exception as e:
+            print(f"❌ Error reading keyword database: {e}")
+            return {}
 
     def get_suggested_keywords(self, creator_name, max_count=10):
         """Get suggested keywords for next search"""
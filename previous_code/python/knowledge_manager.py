@@ -1,6 +1,30 @@
 import pandas as pd
 import os
+import threading
 from datetime import datetime
+from creator_cache import creator_cache
+from url_canonicalizer import canonical_url
+from content_clusters import SimHashIndex, simhash_many, content_text
+from domain_extractor import domains_for
+from domain_intelligence import DomainIntelligence
+from content_classifier import ContentClassifier
+from search_index import ContentSearchIndex
+from link_status import LinkStatusStore
+from data_access import read_header, read_table, iter_table, uncategorize
+from profiling import profiler, file_size
+from metrics import MERGE_SECONDS, ROWS_WRITTEN
+
+
+MASTER_COLUMNS = ['title', 'url', 'snippet', 'query', 'page', 'date', 'discovered_date',
+                  'canonical_url', 'domain', 'content_type', 'confidence', 'confidence_level',
+                  'simhash', 'cluster_id']
+LABEL_COLUMNS = ['content_type', 'confidence', 'confidence_level']
+
+
+def canonical_keys(df):
+    """Canonical URL of every row, computed for rows stored before canonicalization"""
+    stored = df['canonical_url'] if 'canonical_url' in df.columns else [None] * len(df)
+    return [key if isinstance(key, str) and key else canonical_url(url) for url, key in zip(df['url'], stored)]
 
 
 class KnowledgeManager:
@@ -9,74 +33,299 @@ class KnowledgeManager:
         self.master_dir = os.path.join(os.getcwd(), "master_data")
         os.makedirs(self.master_dir, exist_ok=True)
 
-    def update_master_content(self, temp_csv_path, creator_name):
-        """Update master content repository with new results"""
-        if not os.path.exists(temp_csv_path):
-            print("❌ Temp CSV file not found")
-            return 0
+        # One write lock per creator master file
+        self._locks = {}
+        self._locks_guard = threading.Lock()
 
-        # Load the temp CSV with new results
-        new_df = pd.read_csv(temp_csv_path)
+        # Per-domain aggregates across every creator, updated as rows are stored
+        self.domain_intel = DomainIntelligence(os.path.join(self.master_dir, "domain_intel.db"))
 
-        # Get master file path
-        master_file = os.path.join(self.master_dir, f"{creator_name.replace(' ', '_')}_master.csv")
+        # Labels rows that arrive without a content type (temp CSVs, work queue exports)
+        self.classifier = ContentClassifier()
 
-        # Load existing master file or create new one
-        if os.path.exists(master_file):
-            master_df = pd.read_csv(master_file)
-        else:
-            master_df = pd.DataFrame(columns=['title', 'url', 'snippet', 'query', 'page', 'date', 'discovered_date'])
+        # Full-text and per-domain index over every creator's master content
+        self.search_index = ContentSearchIndex(os.path.join(self.master_dir, "search_index.db"))
 
-        # Add discovered_date to new records
-        new_df['discovered_date'] = datetime.now().strftime('%Y-%m-%d')
+        # Stored URLs are registered for liveness re-verification by link_verifier
+        self.link_status = LinkStatusStore(os.path.join(self.master_dir, "link_status.db"))
 
-        # Check for duplicates based on URL
-        new_urls = set(new_df['url'].tolist())
-        existing_urls = set(master_df['url'].tolist()) if not master_df.empty else set()
-        unique_urls = new_urls - existing_urls
+    def update_master_content(self, results, creator_name):
+        """
+        Update master content repository with new results
 
-        # Filter to only new records
-        unique_df = new_df[new_df['url'].isin(unique_urls)]
+        Args:
+            results: DataFrame of scan results, or the path of a temp CSV holding them
+            creator_name: Creator the results belong to
+        """
+        if isinstance(results, pd.DataFrame):
+            new_df = results
+        else:
+            if not os.path.exists(results):
+                print("❌ Temp CSV file not found")
+                return 0
+
+            # Load the temp CSV with new results; rows are labelled in place, so no categoricals
+            new_df = read_table(results, categorical=False)
 
-        # Append to master file
-        if not unique_df.empty:
-            combined_df = pd.concat([master_df, unique_df], ignore_index=True)
-            combined_df.to_csv(master_file, index=False)
-            print(f"✅ Added {len(unique_df)} new records to master content")
-            return len(unique_df)
+        added = self.upsert_rows(new_df, creator_name)
+
+        if added:
+            print(f"✅ Added {added} new records to master content")
         else:
             print("ℹ️ No new content to add to master repository")
+        return added
+
+    @profiler.timed('upsert')
+    def upsert_rows(self, rows, creator_name):
+        """
+        Idempotently add result rows to a creator's master content, keyed by canonical URL
+
+        Rows whose canonical URL is already stored are ignored, so the same rows (or their
+        tracking-parameter and mirror variants) can be written any number of times. New rows
+        are assigned to near-duplicate clusters and appended without rewriting the file.
+
+        Args:
+            rows: DataFrame or list of result dicts
+            creator_name: Creator the rows belong to
+
+        Returns:
+            Number of rows actually added
+        """
+        with MERGE_SECONDS.time():
+            added = self._upsert_rows(rows, creator_name)
+        ROWS_WRITTEN.inc(added)
+        return added
+
+    def _upsert_rows(self, rows, creator_name):
+        """Merge rows into master content; see upsert_rows"""
+        new_df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+        if new_df.empty:
             return 0
 
+        new_df = new_df.assign(canonical_url=canonical_keys(new_df))
+
+        with self._creator_lock(creator_name):
+            # Check for duplicates based on canonical URL, within the batch and against the master file
+            existing_urls = self.get_seen_urls(creator_name)
+            unique_df = new_df.drop_duplicates(subset='canonical_url')
+            unique_df = unique_df[~unique_df['canonical_url'].isin(existing_urls)].copy()
+
+            if unique_df.empty:
+                return 0
+
+            # Add discovered_date and the registrable domain to new records
+            unique_df['discovered_date'] = datetime.now().strftime('%Y-%m-%d')
+            unique_df['domain'] = domains_for(unique_df['url'])
+            self._classify_missing(unique_df, creator_name)
+
+            master_file = self._master_file(creator_name)
+            cluster_index = self.get_cluster_index(creator_name)
+            try:
+                with profiler.span('csv_write') as span:
+                    size_before = file_size(master_file)
+                    self._write_new_rows(unique_df, master_file, cluster_index, creator_name)
+                    span.add_bytes(written=max(file_size(master_file) - size_before, 0))
+            except Exception:
+                # The index may already hold the rows that failed to write
+                creator_cache.invalidate(creator_name, 'cluster_index')
+                raise
+
+            with profiler.span('domain_table'):
+                self.domain_intel.record(creator_name, unique_df['domain'].tolist(),
+                                         unique_df['discovered_date'].iat[0])
+            with profiler.span('search_index'):
+                self.search_index.add_rows(creator_name, unique_df)
+            with profiler.span('link_register'):
+                self.link_status.register(creator_name, zip(unique_df['url'], unique_df['canonical_url']))
+
+            # Extend the cached URL and cluster indexes in place instead of re-reading the file
+            creator_cache.invalidate(creator_name)
+            creator_cache.put('seen_urls', creator_name, master_file,
+                              existing_urls | frozenset(unique_df['canonical_url'].tolist()))
+            creator_cache.put('cluster_index', creator_name, master_file, cluster_index)
+
+        return len(unique_df)
+
+    def _write_new_rows(self, unique_df, master_file, cluster_index, creator_name):
+        """Cluster rows that are new to a master file and append them; caller holds the creator lock"""
+        text = unique_df.reindex(columns=['title', 'snippet']).fillna('')
+        fingerprints = simhash_many([content_text(title, snippet) for title, snippet in zip(text['title'], text['snippet'])])
+        unique_df['simhash'] = [f"{fp:016x}" if fp is not None else None for fp in fingerprints]
+        unique_df['cluster_id'] = [cluster_index.assign(fp) or key
+                                   for fp, key in zip(fingerprints, unique_df['canonical_url'])]
+
+        if os.path.exists(master_file):
+            master_columns = read_header(master_file)
+            extra_columns = [c for c in unique_df.columns if c not in master_columns]
+
+            if extra_columns:
+                # New columns require rewriting the file with the widened header
+                master_df = read_table(master_file, categorical=False)
+                self._backfill_domains(master_df, creator_name)
+                self._classify_missing(master_df, creator_name)
+                pd.concat([master_df, unique_df], ignore_index=True).to_csv(master_file, index=False)
+            else:
+                unique_df.reindex(columns=master_columns).to_csv(
+                    master_file, mode='a', header=False, index=False)
+        else:
+            columns = MASTER_COLUMNS + [c for c in unique_df.columns if c not in MASTER_COLUMNS]
+            unique_df.reindex(columns=columns).to_csv(master_file, index=False)
+
+    def _backfill_domains(self, master_df, creator_name):
+        """Add domains to rows stored before domains were recorded, and count them in the domain table"""
+        if 'domain' not in master_df.columns:
+            master_df['domain'] = None
+        missing = master_df['domain'].isna()
+        if not missing.any():
+            return
+
+        master_df.loc[missing, 'domain'] = domains_for(master_df.loc[missing, 'url'])
+        backfilled = master_df.loc[missing]
+        if 'discovered_date' not in backfilled.columns:
+            self.domain_intel.record(creator_name, backfilled['domain'].tolist())
+            return
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        for seen_date, group in backfilled.groupby(backfilled['discovered_date'].fillna(today)):
+            self.domain_intel.record(creator_name, group['domain'].tolist(), seen_date)
+
+    def _classify_missing(self, df, creator_name):
+        """Add content type and confidence labels to rows that have none, in place"""
+        for column in LABEL_COLUMNS:
+            if column not in df.columns:
+                df[column] = None
+        missing = df['content_type'].isna()
+        if missing.any():
+            uncategorize(df, LABEL_COLUMNS)
+            labels = self.classifier.classify_frame(df.loc[missing], creator_name)
+            df.loc[missing, LABEL_COLUMNS] = labels[LABEL_COLUMNS]
+
+    def open_sink(self, creator_name):
+        """Create a sink that merges scan batches into a creator's master content as they arrive"""
+        return MasterContentSink(self, creator_name)
+
+    def _creator_lock(self, creator_name):
+        """Lock serializing writes to one creator's master file"""
+        with self._locks_guard:
+            return self._locks.setdefault(creator_name, threading.Lock())
+
     def get_content_stats(self, creator_name):
         """Get statistics about collected content"""
-        master_file = os.path.join(self.master_dir, f"{creator_name.replace(' ', '_')}_master.csv")
+        return creator_cache.get('content_stats', creator_name, self._master_file(creator_name),
+                                 self._load_content_stats)
+
+    def get_content_stats_many(self, creator_names):
+        """Get content statistics for many creators at once"""
+        return creator_cache.get_many('content_stats', creator_names, self._master_file, self._load_content_stats)
+
+    def get_seen_urls(self, creator_name):
+        """Get the set of canonical URLs already stored in a creator's master content"""
+        return creator_cache.get('seen_urls', creator_name, self._master_file(creator_name), self._load_seen_urls)
+
+    def get_cluster_index(self, creator_name):
+        """Get the near-duplicate cluster index of a creator's master content"""
+        return creator_cache.get('cluster_index', creator_name, self._master_file(creator_name),
+                                 self._load_cluster_index)
+
+    def get_domain_intelligence(self, limit=20, creator_name=None):
+        """Domains hosting the most stored URLs, across all creators or for one"""
+        return self.domain_intel.top_domains(limit, creator_name)
+
+    def _master_file(self, creator_name):
+        """Path of a creator's master content file"""
+        return os.path.join(self.master_dir, f"{creator_name.replace(' ', '_')}_master.csv")
+
+    def _load_seen_urls(self, master_file):
+        """Read the canonical URLs of a master content file"""
+        if not os.path.exists(master_file):
+            return frozenset()
+        with profiler.span('load_seen_urls') as span:
+            span.add_bytes(read=file_size(master_file))
+            keys = set()
+            for chunk in iter_table(master_file, ('url', 'canonical_url'), dtype=str):
+                keys.update(canonical_keys(chunk))
+        return frozenset(keys)
 
+    def _load_cluster_index(self, master_file):
+        """Rebuild the cluster index from the fingerprints stored in a master content file"""
+        index = SimHashIndex()
+        if not os.path.exists(master_file):
+            return index
+
+        with profiler.span('load_cluster_index') as span:
+            span.add_bytes(read=file_size(master_file))
+            df = read_table(master_file, ('title', 'snippet', 'simhash', 'cluster_id'), dtype=str,
+                            keep_default_na=False)
+        for column in ('title', 'snippet', 'simhash', 'cluster_id'):
+            if column not in df.columns:
+                df[column] = ''
+
+        # Fingerprint rows written before clustering in one batch
+        missing = [i for i, (simhash, cluster_id) in enumerate(zip(df['simhash'], df['cluster_id']))
+                   if not (simhash and cluster_id)]
+        computed = dict(zip(missing, simhash_many([content_text(df['title'].iat[i], df['snippet'].iat[i])
+                                                   for i in missing])))
+
+        for i, (simhash, cluster_id) in enumerate(zip(df['simhash'], df['cluster_id'])):
+            if i in computed:
+                index.assign(computed[i])
+            else:
+                index.add(int(simhash, 16), cluster_id)
+        return index
+
+    def _load_content_stats(self, master_file):
+        """Compute statistics from a master content file"""
         if not os.path.exists(master_file):
             return {
                 'total_urls': 0,
                 'domains': {},
+                'content_types': {},
+                'confidence_levels': {},
                 'newest_content': None,
                 'oldest_content': None
             }
 
-        df = pd.read_csv(master_file)
+        stats_columns = ['url', 'domain', 'discovered_date', 'cluster_id', 'content_type', 'confidence_level']
+        if 'content_type' not in read_header(master_file):
+            # Files written before classification need the text to label their rows
+            stats_columns += ['title', 'snippet']
+        with profiler.span('load_content_stats') as span:
+            span.add_bytes(read=file_size(master_file))
+            df = read_table(master_file, stats_columns, dtype=str)
 
-        # Extract domains
-        df['domain'] = df['url'].apply(lambda url: url.split('//')[1].split('/')[0] if '//' in url else url)
+        # Count stored domains; rows written before domains were stored are resolved here
+        if 'domain' not in df.columns:
+            df['domain'] = None
+        missing = df['domain'].isna()
+        if missing.any():
+            uncategorize(df, ['domain'])
+            df.loc[missing, 'domain'] = domains_for(df.loc[missing, 'url'])
+        domain_counts = df.loc[df['domain'] != '', 'domain'].value_counts().to_dict()
 
-        # Count domains
-        domain_counts = df['domain'].value_counts().to_dict()
+        # Count stored labels; rows written before classification are labelled here
+        # (without the creator-mention signal, as only the file name is known)
+        self._classify_missing(df, None)
+        content_type_counts = df['content_type'].value_counts().to_dict()
+        confidence_counts = df['confidence_level'].value_counts().to_dict()
 
-        # Get date ranges
+        # Get date ranges; ISO dates order correctly as strings
+        dates = df['discovered_date'].dropna().astype(str) if 'discovered_date' in df.columns else None
         date_stats = {
-            'newest_content': df['discovered_date'].max() if 'discovered_date' in df.columns else None,
-            'oldest_content': df['discovered_date'].min() if 'discovered_date' in df.columns else None
+            'newest_content': dates.max() if dates is not None and len(dates) else None,
+            'oldest_content': dates.min() if dates is not None and len(dates) else None
         }
 
+        # Near-duplicate clusters; rows without one count as their own cluster
+        total_clusters = len(df)
+        if 'cluster_id' in df.columns:
+            total_clusters = df['cluster_id'].nunique() + int(df['cluster_id'].isna().sum())
+
         stats = {
             'total_urls': len(df),
+            'total_clusters': total_clusters,
             'domains': domain_counts,
+            'content_types': content_type_counts,
+            'confidence_levels': confidence_counts,
             'newest_content': date_stats['newest_content'],
             'oldest_content': date_stats['oldest_content']
         }
@@ -85,24 +334,46 @@ class KnowledgeManager:
 
     def export_master_data(self, creator_name, format='csv'):
         """Export master data in different formats"""
-        master_file = os.path.join(self.master_dir, f"{creator_name.replace(' ', '_')}_master.csv")
+        master_file = self._master_file(creator_name)
 
         if not os.path.exists(master_file):
             print("❌ No master data found for export")
             return None
 
-        df = pd.read_csv(master_file)
-
         if format.lower() == 'csv':
             return master_file
-        elif format.lower() == 'excel':
+
+        df = read_table(master_file)
+
+        if format.lower() == 'excel':
             excel_file = os.path.join(self.master_dir, f"{creator_name.replace(' ', '_')}_master.xlsx")
             df.to_excel(excel_file, index=False)
             return excel_file
         elif format.lower() == 'json':
             json_file = os.path.join(self.master_dir, f"{creator_name.replace(' ', '_')}_master.json")
-            df.to_json(json_file, orient='records', indent=2)
+            # pandas' C encoder is faster on whole frames than building per-row dicts for orjson
+            df.to_json(json_file, orient='records')
             return json_file
         else:
             print(f"❌ Unsupported export format: {format}")
             return None
+
+
+class MasterContentSink:
+    def __init__(self, knowledge_manager, creator_name):
+        """
+        Result sink that upserts each scan batch into master content as it is found
+
+        Args:
+            knowledge_manager: KnowledgeManager owning the master files
+            creator_name: Creator whose master content receives the rows
+        """
+        self.knowledge_manager = knowledge_manager
+        self.creator_name = creator_name
+        self.rows_written = 0
+
+    def write_batch(self, rows):
+        """Merge a batch of result rows, returning how many were new"""
+        added = self.knowledge_manager.upsert_rows(rows, self.creator_name)
+        self.rows_written += added
+        return added
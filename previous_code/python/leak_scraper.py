@@ -4,11 +4,45 @@ import urllib.parse
 import time
 import json
 import os
+import math
+import logging
+import threading
+from collections import Counter
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from keyword_canonicalizer import KeywordCanonicalizer
+from scan_state import ScanStateStore
+from url_canonicalizer import canonical_url
+from domain_extractor import domains_for
+from content_classifier import ContentClassifier
+from result_records import ResultRecord, ResultBatch, intern_value
+from data_access import iter_table
+from profiling import profiler, submit, file_size
+from metrics import SEARCH_API_SECONDS, SEARCH_API_CALLS, SEARCH_API_RETRIES, NEW_URLS_PER_CALL, SEARCH_API_RATE
+from rate_limiter import search_rate_limiter, retry_delay
+from http_transport import http_transport
+
+SEARCH_API_RATE.set_function(lambda: search_rate_limiter.rate)
+
+# Response fields the scraper reads (errors are always returned); the rest of the payload is not sent
+SEARCH_RESULT_FIELDS = "items(title,link,snippet)"
+
+# Attempts per page before a throttled or failing page is given up on
+MAX_PAGE_ATTEMPTS = 4
+
+# Per-result lines are logged at DEBUG and stay silent unless logging is configured (--verbose)
+logger = logging.getLogger(__name__)
+
+# Region codes used by the dashboard mapped to Google country codes (same as googleSearchService.js)
+REGION_COUNTRY_CODES = {
+    'US': 'us', 'UK': 'uk', 'UAE': 'ae', 'CA': 'ca', 'AU': 'au', 'DE': 'de', 'FR': 'fr', 'IT': 'it',
+    'ES': 'es', 'NL': 'nl', 'PK': 'pk', 'IN': 'in', 'CN': 'cn', 'JP': 'jp', 'BR': 'br', 'MX': 'mx'
+}
 
 
 class LeakScraper:
-    def __init__(self, creator_name, api_key, search_engine_id, max_searches=100):
+    def __init__(self, creator_name, api_key, search_engine_id, max_searches=100, result_sink=None,
+                 incremental_overlap_days=1, incremental_fallback="last 30 days"):
         """
         Initialize a leak scraper with adaptive batch sizing
 
@@ -17,22 +51,47 @@ class LeakScraper:
             api_key: Google Custom Search API key
             search_engine_id: Google Custom Search Engine ID
             max_searches: Maximum API calls to make
+            result_sink: Optional object with a write_batch(rows) method that receives
+                each page's new rows as soon as they are found (region scans: all rows once
+                the scan ends, so they carry every region that returned them)
+            incremental_overlap_days: Extra days re-scanned before the last scan in "incremental" mode
+            incremental_fallback: Timeframe used in "incremental" mode for keywords never scanned
         """
         self.creator_name = creator_name
         self.api_key = api_key
         self.search_engine_id = search_engine_id
         self.max_searches = max_searches
+        self.result_sink = result_sink
+        self.incremental_overlap_days = incremental_overlap_days
+        self.incremental_fallback = incremental_fallback
         self.api_calls = 0
+        self.last_batch_complete = False
+        self.quota_exceeded = False
 
         # Create output directory
         self.base_dir = os.path.join(os.getcwd(), "leak_detection_results")
         os.makedirs(self.base_dir, exist_ok=True)
 
+        # Last successful scan time per keyword, used by the "incremental" timeframe
+        self.scan_state = ScanStateStore(creator_name, self.base_dir)
+
         # Default output file
         self.output_file = os.path.join(self.base_dir, f"{creator_name.replace(' ', '_')}_results.csv")
 
-        # Track URLs to avoid duplicates
+        # Track canonical URLs to avoid duplicates; guarded by _lock when regions are searched concurrently
         self.unique_urls = set()
+        self._rows_by_url = {}
+        self._lock = threading.Lock()
+
+        # (query, region, url, rank) of every item seen in the current scan
+        self.rank_snapshot = []
+        self.last_snapshot_file = None
+
+        # Collapses near-identical keywords so each intent is searched once
+        self.canonicalizer = KeywordCanonicalizer()
+
+        # Labels new rows with a content type and leak confidence, one page at a time
+        self.classifier = ContentClassifier()
 
         # Load existing results if file exists
         self.load_existing_results()
@@ -41,8 +100,9 @@ class LeakScraper:
         """Load previously discovered URLs to avoid duplicates"""
         try:
             if os.path.exists(self.output_file):
-                df = pd.read_csv(self.output_file)
-                self.unique_urls = set(df['url'].tolist())
+                self.unique_urls = set()
+                for chunk in iter_table(self.output_file, ['url'], dtype=str):
+                    self.unique_urls.update(canonical_url(url) for url in chunk['url'])
                 print(f"✅ Loaded {len(self.unique_urls)} previously found URLs")
         except Exception as e:
             print(f"ℹ️ No previous results loaded: {e}")
@@ -71,7 +131,8 @@ class LeakScraper:
         query = " OR ".join(query_parts)
         return query
 
-    def get_date_restrict(self, timeframe):
+    @staticmethod
+    def get_date_restrict(timeframe):
         """Convert user timeframe to API date_restrict parameter"""
         if timeframe == "today":
             return "d1"
@@ -92,11 +153,33 @@ class LeakScraper:
             # Default to last 30 days
             return "d30"
 
-    def search_batch(self, keyword_batch, date_restrict, max_pages=10):
-        """Search for a batch of keywords with pagination"""
-        # Build combined query
+    def get_incremental_date_restrict(self, keyword_batch, now=None):
+        """Tightest date restriction covering the time since the batch's keywords were last scanned"""
+        now = now or datetime.now()
+        last_scans = [self.scan_state.last_scan(keyword) for keyword in keyword_batch]
+
+        # A keyword that was never scanned needs the full fallback window
+        if any(last is None for last in last_scans):
+            return self.get_date_restrict(self.incremental_fallback)
+
+        gap_days = (now - min(last_scans)).total_seconds() / 86400
+        return f"d{max(1, math.ceil(gap_days + self.incremental_overlap_days))}"
+
+    def _covers_last_scan(self, keyword_batch, date_restrict, now):
+        """Check whether a date restriction reaches back to the keywords' last successful scan"""
+        if not date_restrict:
+            return True  # No date restriction covers all time
+
+        window_days = int(date_restrict[1:]) if date_restrict.startswith('d') else 0
+        for keyword in keyword_batch:
+            last = self.scan_state.last_scan(keyword)
+            if last is not None and (now - last).total_seconds() / 86400 > window_days:
+                return False
+        return True
+
+    def search_batch(self, keyword_batch, date_restrict, max_pages=10, start_page=1, region=None):
+        """Search for a batch of keywords with pagination, from start_page up to max_pages"""
         query = self.build_query(keyword_batch)
-        encoded_query = urllib.parse.quote(query)
 
         print(f"\n🔍 Searching batch: {' | '.join(keyword_batch[:3])}...")
         if len(keyword_batch) > 3:
@@ -104,126 +187,360 @@ class LeakScraper:
         print(f"   Query: {query[:100]}..." if len(query) > 100 else f"   Query: {query}")
 
         # Store results
-        batch_results = []
+        batch_results = ResultBatch()
+
+        # Whether every page of the batch was searched without errors
+        self.last_batch_complete = False
+        had_error = False
 
         # Search with pagination
-        for page in range(1, max_pages + 1):
-            # Check if we've hit our search limit
-            if self.api_calls >= self.max_searches:
-                print(f"⚠️ Reached search limit ({self.api_calls}/{self.max_searches})")
+        for page in range(start_page, max_pages + 1):
+            status, page_results = self.search_page(keyword_batch, page, date_restrict, region, max_pages)
+            batch_results.extend(page_results)
+
+            if status in ('limit', 'quota'):
+                self.quota_exceeded = status == 'quota'
                 return batch_results
+            if status == 'empty':
+                break  # No need to check more pages
+            if status == 'error':
+                had_error = True
+
+        self.last_batch_complete = not had_error
+        return batch_results
 
-            # Calculate start index for pagination
-            start_index = ((page - 1) * 10) + 1
+    def search_page(self, keyword_batch, page, date_restrict, region=None, max_pages=10):
+        """
+        Fetch one page of results for a keyword batch and keep its new URLs
+
+        Safe to call from several threads at once; the API budget and seen URLs are shared.
+
+        Returns:
+            Tuple of (status, ResultBatch of new rows). Status is 'ok', 'empty' (no more results),
+            'error', 'quota' (API quota exceeded) or 'limit' (search budget used up).
+        """
+        # Check if we've hit our search limit
+        if not self._reserve_api_call():
+            print(f"⚠️ Reached search limit ({self.api_calls}/{self.max_searches})")
+            return 'limit', ResultBatch()
+
+        query = self.build_query(keyword_batch)
+        api_url = self._build_api_url(query, page, date_restrict, region)
+        region_label = f" [{region}]" if region else ""
+
+        try:
+            print(f"   📄 Page {page}/{max_pages}{region_label}...")
+            status, data = self._fetch_page(api_url)
+            if status != 'ok':
+                return status, ResultBatch()
+
+            if "items" not in data:
+                print(f"   ⚠️ No results found on this page{region_label}")
+                return 'empty', ResultBatch()
+
+            result_count = len(data["items"])
+            page_results = ResultBatch()
+            logger.debug("Page %s%s results:", page, region_label)
+
+            # Values shared by every row of the page are built once and interned across pages
+            row_query = intern_value(str(keyword_batch))
+            row_date = intern_value(datetime.now().strftime('%Y-%m-%d'))
 
-            # Build URL parameters
-            url_params = [
-                f"q={encoded_query}",
-                f"cx={self.search_engine_id}",
-                f"key={self.api_key}",
-                "num=10",  # Always 10 (API limit)
-                f"start={start_index}"
-            ]
+            for i, item in enumerate(data["items"], 1):
+                title = item.get("title", "")
+                link = item.get("link", "")
+                snippet = item.get("snippet", "")
 
-            # Add date restriction only if specified (not empty for lifetime)
-            if date_restrict:
-                url_params.append(f"dateRestrict={date_restrict}")
+                # Absolute position across pages, recorded for every item in the snapshot
+                rank = (page - 1) * 10 + i
+                self.rank_snapshot.append((query, region or "", link, rank))
 
-            # ALWAYS add exactTerms to ensure creator name is present
-            url_params.append(f"exactTerms={self.creator_name}")
+                url_key = canonical_url(link)
+                row = self._claim_url(url_key, region, title, link, snippet, row_query, page, rank, row_date)
+                logger.debug("%s %s. %.50s... - %s", "🆕" if row else "📎", i, title, link)
 
-            # Build final URL
-            api_url = f"https://www.googleapis.com/customsearch/v1?{'&'.join(url_params)}"
+                # Only add if it's a new URL
+                if row is not None:
+                    page_results.append(row)
+
+            print(f"\n   ✅ Found {result_count} results, {len(page_results)} new URLs")
+            NEW_URLS_PER_CALL.observe(len(page_results))
+
+            with profiler.span('classify'):
+                self.classifier.classify_rows(page_results, self.creator_name)
+            # Region rows can still be tagged with later regions, so run_scan writes them once the scan ends
+            if page_results and self.result_sink is not None and not region:
+                with profiler.span('sink'):
+                    self.result_sink.write_batch(page_results.to_frame())
+
+            # If we do not find new results on a new page
+            if result_count == 0:
+                print("   ℹ️ No more results available")
+                return 'empty', page_results
+
+            return 'ok', page_results
+
+        except Exception as e:
+            print(f"   ⚠️ Error: {e}")
+            return 'error', ResultBatch()
+
+    def _fetch_page(self, api_url):
+        """
+        Request one page under the shared rate limiter, retrying throttled and failed requests
+
+        429 and 5xx responses and network errors are retried up to MAX_PAGE_ATTEMPTS times with
+        exponential backoff and jitter, honouring Retry-After. Retries do not count against the
+        search budget.
+
+        Returns:
+            Tuple of (status, response data). Status is 'ok', 'error' or 'quota' (daily quota exceeded).
+        """
+        for attempt in range(MAX_PAGE_ATTEMPTS):
+            with profiler.span('rate_limit_wait'):
+                search_rate_limiter.acquire()
 
+            status_code, retry_after = None, None
             try:
-                print(f"   📄 Page {page}/{max_pages}...")
-                response = requests.get(api_url)
-                self.api_calls += 1
+                with profiler.span('http') as span:
+                    started = time.perf_counter()
+                    response = http_transport.get(api_url, fields=SEARCH_RESULT_FIELDS)
+                    SEARCH_API_SECONDS.observe(time.perf_counter() - started, status=response.status_code)
+                    span.add_bytes(read=len(response.content))
+                status_code = response.status_code
+                retry_after = response.headers.get('Retry-After')
                 data = response.json()
-
-                # Handle API errors
                 if "error" in data:
                     error_msg = data["error"].get("message", "Unknown error")
-                    print(f"   ⚠️ API error: {error_msg}")
-
-                    # Check for quota exceeded errors
-                    if "quota" in error_msg.lower():
-                        print("❌ API quota exceeded! Stopping searches.")
-                        return batch_results
-
-                    time.sleep(2)  # Wait longer if we hit an error
-                    continue
-
-                if "items" in data:
-                    result_count = len(data["items"])
-                    new_count = 0
-                    print(f"\n   📋 Page {page} Results:")
-
-                    for i, item in enumerate(data["items"], 1):
-                        title = item.get("title", "")
-                        link = item.get("link", "")
-                        snippet = item.get("snippet", "")
-
-                        # Show all links in terminal
-                        is_new = link not in self.unique_urls
-                        status = "🆕" if is_new else "📎"
-                        print(f"   {status} {i}. {title[:50]}... - {link}")
-
-                        # Only add if it's a new URL
-                        if is_new:
-                            batch_results.append({
-                                "title": title,
-                                "url": link,
-                                "snippet": snippet,
-                                "query": str(keyword_batch),
-                                "page": page,
-                                "date": datetime.now().strftime('%Y-%m-%d')
-                            })
-                            self.unique_urls.add(link)
-                            new_count += 1
-
-                    print(f"\n   ✅ Found {result_count} results, {new_count} new URLs")
-
-                    # If we do not find new results on a new page
-                    if result_count == 0:
-                        print("   ℹ️ No more results available")
-                        break
                 else:
-                    print("   ⚠️ No results found on this page")
-                    break  # No need to check more pages
+                    error_msg = f"HTTP {status_code}" if status_code >= 400 else None
+            except (requests.RequestException, ValueError) as e:
+                # No response, or a body that is not JSON (e.g. an HTML error page)
+                data, error_msg = None, f"{type(e).__name__}: {e}" if status_code is None else f"HTTP {status_code}"
+
+            # Only throttling, server errors and requests that got no response at all are transient
+            retryable = status_code is None or status_code == 429 or status_code >= 500
+
+            if error_msg is None:
+                search_rate_limiter.succeeded()
+                return 'ok', data
+
+            print(f"   ⚠️ API error: {error_msg}")
+
+            # Check for quota exceeded errors; throttled per-minute quotas are retried instead
+            daily_quota = not retryable or "per day" in error_msg.lower()
+            if "quota" in error_msg.lower() and daily_quota:
+                print("❌ API quota exceeded! Stopping searches.")
+                return 'quota', None
+
+            if not retryable or attempt == MAX_PAGE_ATTEMPTS - 1:
+                return 'error', None
 
-                # Respect API rate limits
-                time.sleep(2)
+            if status_code in (429, 503):
+                search_rate_limiter.throttled(retry_after)
 
-            except Exception as e:
-                print(f"   ⚠️ Error: {e}")
-                time.sleep(2)
+            delay = retry_delay(attempt, retry_after, base_delay=2.0)
+            SEARCH_API_RETRIES.inc()
+            print(f"   🔁 Retrying in {delay:.1f}s (attempt {attempt + 2}/{MAX_PAGE_ATTEMPTS})")
+            with profiler.span('retry_backoff'):
+                time.sleep(delay)
+
+    def search_regions(self, keyword_batch, date_restrict, regions, max_pages=10):
+        """
+        Search a keyword batch in several regions concurrently under the shared search budget
+
+        Pages are handed out in rounds. Each round splits its calls across the regions still
+        returning results in proportion to their new-URL yield so far (seeded from previous
+        scans), so productive regions get more of the budget. A URL found in several regions is
+        kept once and tagged with every region it appeared in.
+
+        Returns:
+            ResultBatch of new rows with a comma-separated "regions" column
+        """
+        print(f"\n🌍 Fanning out across regions: {', '.join(regions)}")
+
+        next_page = {region: 1 for region in regions}
+        active = list(regions)
+        yields = {region: list(self.scan_state.region_yield(region)) for region in regions}
+        round_yields = {region: [0, 0] for region in regions}
+        batch_results = ResultBatch()
+        quota_exceeded = False
+
+        while active and not quota_exceeded and self.api_calls < self.max_searches:
+            round_calls = min(self.max_searches - self.api_calls, len(active) * 2)
+            allocation = self._allocate_region_calls(active, yields, round_calls)
+
+            with ThreadPoolExecutor(max_workers=len(allocation)) as executor:
+                futures = {
+                    submit(executor, self._search_region_pages, keyword_batch, date_restrict, region,
+                           next_page[region], calls, max_pages): region
+                    for region, calls in allocation.items()
+                }
+                outcomes = {futures[f]: f.result() for f in futures}
+
+            for region, (pages_searched, rows, finished, status) in outcomes.items():
+                next_page[region] += pages_searched
+                for totals in (yields[region], round_yields[region]):
+                    totals[0] += pages_searched
+                    totals[1] += len(rows)
+                batch_results.extend(rows)
+
+                if status == 'quota':
+                    quota_exceeded = True
+                if finished or next_page[region] > max_pages:
+                    active.remove(region)
+
+        self.scan_state.record_region_yields(round_yields)
+
+        for region in regions:
+            calls, new_urls = round_yields[region]
+            print(f"   🌍 {region}: {calls} calls, {new_urls} new URLs")
 
         return batch_results
 
-    def run_scan(self, keywords, timeframe, max_searches=None):
-        """Run a scan with user-provided keywords and timeframe"""
+    def _search_region_pages(self, keyword_batch, date_restrict, region, start_page, calls, max_pages):
+        """Search consecutive pages for one region; returns (pages searched, rows, finished, last status)"""
+        rows = ResultBatch()
+        pages_searched = 0
+        status = 'ok'
+
+        for page in range(start_page, min(start_page + calls, max_pages + 1)):
+            status, page_results = self.search_page(keyword_batch, page, date_restrict, region, max_pages)
+            if status == 'limit':
+                break
+
+            pages_searched += 1
+            rows.extend(page_results)
+
+            if status in ('empty', 'quota'):
+                return pages_searched, rows, True, status
+
+        return pages_searched, rows, False, status
+
+    @staticmethod
+    def _allocate_region_calls(regions, yields, total_calls):
+        """Split calls across regions in proportion to their smoothed new-URL yield per call"""
+        weights = {region: (yields[region][1] + 1) / (yields[region][0] + 2) for region in regions}
+        weight_sum = sum(weights.values())
+        shares = {region: total_calls * weight / weight_sum for region, weight in weights.items()}
+
+        # Largest remainder rounding keeps the total exact
+        allocation = {region: int(share) for region, share in shares.items()}
+        leftover = total_calls - sum(allocation.values())
+        for region in sorted(shares, key=lambda r: shares[r] - allocation[r], reverse=True)[:leftover]:
+            allocation[region] += 1
+
+        return {region: calls for region, calls in allocation.items() if calls > 0}
+
+    def _reserve_api_call(self):
+        """Count an API call against the budget; returns False when the budget is used up"""
+        with self._lock:
+            if self.api_calls >= self.max_searches:
+                return False
+            self.api_calls += 1
+        # Keys are labelled by their last characters only
+        SEARCH_API_CALLS.inc(key=f"...{self.api_key[-4:]}")
+        return True
+
+    def _claim_url(self, url_key, region, title, link, snippet, query, page, rank, date):
+        """
+        Mark a canonical URL as seen, creating its row the first time
+
+        Claiming and registering the row happen under one lock, so a region thread that
+        finds the URL already claimed always finds its row to tag.
+
+        Returns:
+            The new ResultRecord, or None if the URL was seen before (its row's regions are
+            then extended with this region)
+        """
+        with self._lock:
+            if url_key not in self.unique_urls:
+                self.unique_urls.add(url_key)
+                row = ResultRecord(title, link, url_key, snippet, query, page, rank, date,
+                                   intern_value(region) if region else None)
+                if region:
+                    self._rows_by_url[url_key] = row
+                return row
+
+            row = self._rows_by_url.get(url_key)
+            if region and row is not None:
+                regions = row.regions.split(",")
+                if region not in regions:
+                    row.regions = ",".join(regions + [region])
+            return None
+
+    def _build_api_url(self, query, page, date_restrict, region=None):
+        """Build the Custom Search API URL for one page"""
+        # Calculate start index for pagination
+        start_index = ((page - 1) * 10) + 1
+
+        # Build URL parameters
+        url_params = [
+            f"q={urllib.parse.quote(query)}",
+            f"cx={self.search_engine_id}",
+            f"key={self.api_key}",
+            "num=10",  # Always 10 (API limit)
+            f"start={start_index}"
+        ]
+
+        # Add date restriction only if specified (not empty for lifetime)
+        if date_restrict:
+            url_params.append(f"dateRestrict={date_restrict}")
+
+        # Bias results towards and restrict them to the region's country
+        if region:
+            country_code = REGION_COUNTRY_CODES.get(region.upper(), region.lower())
+            url_params.append(f"gl={country_code}")
+            if region.upper() in REGION_COUNTRY_CODES:
+                url_params.append(f"cr=country{country_code.upper()}")
+
+        # ALWAYS add exactTerms to ensure creator name is present
+        url_params.append(f"exactTerms={urllib.parse.quote(self.creator_name)}")
+
+        # Build final URL
+        return f"https://www.googleapis.com/customsearch/v1?{'&'.join(url_params)}"
+
+    def run_scan(self, keywords, timeframe, max_searches=None, regions=None):
+        """
+        Run a scan with user-provided keywords and timeframe, optionally fanned out across regions
+
+        Returns:
+            ResultBatch of new rows; to_frame() gives the columnar view used by the post-scan pipeline
+        """
         if max_searches is not None:
             self.max_searches = max_searches
 
+        # Drop keywords that only differ in word order, inflection or stopwords
+        unique_keywords = self.canonicalizer.dedupe(keywords, ignore_terms=self.creator_name)
+        if len(unique_keywords) < len(keywords):
+            print(f"ℹ️ Skipping {len(keywords) - len(unique_keywords)} near-duplicate keywords")
+        keywords = unique_keywords
+
         print(f"\n🚀 Starting leak scan for: {self.creator_name}")
         print(f"📅 Timeframe: {timeframe}")
         print(f"🔢 Search budget: {self.max_searches} API calls")
         print(f"🔍 Using {len(keywords)} keywords: {keywords}")
+        if regions:
+            print(f"🌍 Regions: {', '.join(regions)}")
 
-        # Reset API calls counter
+        # Reset API calls counter and rank snapshot
         self.api_calls = 0
+        self.rank_snapshot = []
 
-        # Convert timeframe to date_restrict parameter
-        date_restrict = self.get_date_restrict(timeframe)
-        print(f"ℹ️ Converted timeframe to date parameter: {date_restrict or 'No date restriction (All Time)'}")
+        # Convert timeframe to date_restrict parameter; incremental scans compute it per batch
+        incremental = timeframe == "incremental"
+        if incremental:
+            print(f"ℹ️ Incremental scan: covering the time since each keyword's last scan "
+                  f"(+{self.incremental_overlap_days} day overlap)")
+        else:
+            date_restrict = self.get_date_restrict(timeframe)
+            print(f"ℹ️ Converted timeframe to date parameter: {date_restrict or 'No date restriction (All Time)'}")
 
         # Group keywords into appropriately sized batches
         batches = self.adaptive_batch_keywords(keywords)
         print(f"ℹ️ Created {len(batches)} batches of keywords")
 
         # Store all results
-        all_results = []
+        all_results = ResultBatch()
 
         # Process each batch
         for batch_num, keyword_batch in enumerate(batches, 1):
@@ -234,17 +551,38 @@ class LeakScraper:
 
             print(f"\n🔍 Processing batch {batch_num}/{len(batches)}")
 
+            batch_started = datetime.now()
+            if incremental:
+                date_restrict = self.get_incremental_date_restrict(keyword_batch, batch_started)
+                print(f"ℹ️ Date parameter for this batch: {date_restrict}")
+
             # Search this batch with pagination
-            batch_results = self.search_batch(keyword_batch, date_restrict)
+            with profiler.span('search'):
+                if regions:
+                    batch_results = self.search_regions(keyword_batch, date_restrict, regions)
+                else:
+                    batch_results = self.search_batch(keyword_batch, date_restrict)
             all_results.extend(batch_results)
 
+            # Remember fully searched keywords so the next incremental scan starts here.
+            # Region fan-outs spread pages by yield, so they never count as a complete scan.
+            if not regions and self.last_batch_complete and self._covers_last_scan(keyword_batch, date_restrict, batch_started):
+                self.scan_state.record_success(keyword_batch, batch_started)
+
             # Show progress
             print(
                 f"Progress: {self.api_calls}/{self.max_searches} API calls used ({self.api_calls / self.max_searches * 100:.1f}%)")
             print(f"Found {len(all_results)} unique URLs so far")
 
             # Save results after each batch
-            self.save_results(all_results)
+            with profiler.span('save_results') as span:
+                self.save_results(all_results)
+                span.add_bytes(written=file_size(self.output_file))
+
+        # Region rows carry every region that returned them only now that the fan-out is over
+        if regions and all_results and self.result_sink is not None:
+            with profiler.span('sink'):
+                self.result_sink.write_batch(all_results.to_frame())
 
         print(f"\n✅ Scan complete! Results saved to {self.output_file}")
         print(f"🔢 API calls used: {self.api_calls}/{self.max_searches}")
@@ -253,6 +591,11 @@ class LeakScraper:
         # Print summary of top domains
         self.print_domain_summary(all_results)
 
+        # Keep every item's position for scan-to-scan rank comparison
+        with profiler.span('rank_snapshot') as span:
+            snapshot_file = self.save_rank_snapshot()
+            span.add_bytes(written=file_size(snapshot_file) if snapshot_file else 0)
+
         return all_results
 
     def print_domain_summary(self, results):
@@ -260,27 +603,9 @@ class LeakScraper:
         if not results:
             return
 
-        # Extract domains from URLs
-        domains = []
-        for result in results:
-            url = result['url']
-            try:
-                # Extract domain from URL
-                domain = url.split('//')[1].split('/')[0]
-                domains.append(domain)
-            except:
-                pass
-
-        # Count domains
-        domain_counts = {}
-        for domain in domains:
-            if domain in domain_counts:
-                domain_counts[domain] += 1
-            else:
-                domain_counts[domain] = 1
-
-        # Sort by count
-        sorted_domains = sorted(domain_counts.items(), key=lambda x: x[1], reverse=True)
+        # Count registrable domains, so subdomains and ports of one site are grouped
+        domain_counts = Counter(d for d in domains_for([result.url for result in results]) if d)
+        sorted_domains = domain_counts.most_common()
 
         # Print top domains
         print("\n📊 Top Domains with Content:")
@@ -293,23 +618,27 @@ class LeakScraper:
             print("⚠️ No results to save")
             return
 
-        df = pd.DataFrame(results)
+        df = results.to_frame() if isinstance(results, ResultBatch) else pd.DataFrame(results)
         df.to_csv(self.output_file, index=False)
         print(f"✅ Saved {len(results)} results to {self.output_file}")
 
-    def save_temp_results(self, results, creator_name):
-        """Save results to a temporary CSV for learning"""
-        temp_dir = os.path.join(os.getcwd(), "temp_results")
-        os.makedirs(temp_dir, exist_ok=True)
+    def save_rank_snapshot(self):
+        """Save the positions of every item seen in this scan for rank diffing"""
+        if not self.rank_snapshot:
+            return None
 
-        temp_file = os.path.join(temp_dir,
-                                 f"{creator_name.replace(' ', '_')}_temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        snapshot_dir = os.path.join(self.base_dir, "rank_snapshots")
+        os.makedirs(snapshot_dir, exist_ok=True)
 
-        if not results:
-            return None
+        scanned_at = datetime.now()
+        snapshot_file = os.path.join(
+            snapshot_dir, f"{self.creator_name.replace(' ', '_')}_{scanned_at.strftime('%Y%m%d_%H%M%S')}.csv")
 
-        df = pd.DataFrame(results)
-        df.to_csv(temp_file, index=False)
-        print(f"✅ Saved temp results to {temp_file} for keyword learning")
+        df = pd.DataFrame(self.rank_snapshot, columns=['query', 'region', 'url', 'rank'])
+        df['canonical_url'] = [canonical_url(url) for url in df['url']]
+        df['scanned_at'] = scanned_at.isoformat(timespec='seconds')
+        df.to_csv(snapshot_file, index=False)
 
-        return temp_file
+        self.last_snapshot_file = snapshot_file
+        print(f"✅ Saved rank snapshot of {len(df)} items to {snapshot_file}")
+        return snapshot_file
@@ -0,0 +1,174 @@
+import os
+import time
+import sqlite3
+from contextlib import contextmanager
+
+# Status of a link after a check
+LIVE = 'live'
+REMOVED = 'removed'
+ERROR = 'error'
+UNCHECKED = 'unchecked'
+
+
+class LinkStatusStore:
+    def __init__(self, db_path=None):
+        """
+        SQLite store of stored leak URLs, their latest liveness and their check history
+
+        Args:
+            db_path: SQLite database file (default: master_data/link_status.db)
+        """
+        self.db_path = db_path or os.path.join(os.getcwd(), "master_data", "link_status.db")
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS links (
+                    creator TEXT NOT NULL,
+                    canonical_url TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'unchecked',
+                    http_status INTEGER,
+                    etag TEXT,
+                    last_modified TEXT,
+                    last_checked REAL,
+                    last_changed REAL,
+                    removed_at REAL,
+                    PRIMARY KEY (creator, canonical_url)
+                );
+                CREATE INDEX IF NOT EXISTS idx_links_checked ON links (last_checked);
+                CREATE TABLE IF NOT EXISTS link_checks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    creator TEXT NOT NULL,
+                    canonical_url TEXT NOT NULL,
+                    checked_at REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    http_status INTEGER,
+                    elapsed_ms INTEGER,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_link_checks_url ON link_checks (creator, canonical_url, checked_at);
+            """)
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection for one transaction; connections are never shared across threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def register(self, creator_name, links):
+        """
+        Add URLs to be verified; already registered URLs keep their status
+
+        Args:
+            creator_name: Creator the URLs belong to
+            links: Iterable of (url, canonical_url) pairs
+
+        Returns:
+            Number of URLs added
+        """
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany("""
+                INSERT OR IGNORE INTO links (creator, canonical_url, url) VALUES (?, ?, ?)
+            """, [(creator_name, canonical, url) for url, canonical in links])
+            return conn.total_changes - before
+
+    def due(self, creator_name=None, max_age_days=7, limit=None):
+        """
+        Links never verified or not verified within max_age_days, oldest check first
+
+        Returns:
+            List of dicts with creator, canonical_url, url, status, etag and last_modified
+        """
+        cutoff = time.time() - max_age_days * 86400
+        query = """
+            SELECT creator, canonical_url, url, status, etag, last_modified FROM links
+            WHERE (last_checked IS NULL OR last_checked < ?)
+        """
+        params = [cutoff]
+        if creator_name:
+            query += " AND creator = ?"
+            params.append(creator_name)
+        query += " ORDER BY last_checked IS NOT NULL, last_checked"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._connect() as conn:
+            return [dict(r) for r in conn.execute(query, params).fetchall()]
+
+    def record(self, results):
+        """
+        Store check results and append them to each link's history
+
+        Args:
+            results: Dicts with creator, canonical_url, status, http_status, etag, last_modified,
+                checked_at, elapsed_ms and error
+        """
+        if not results:
+            return
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("""
+                    UPDATE links SET
+                        last_changed = CASE WHEN status != :status THEN :checked_at ELSE last_changed END,
+                        removed_at = CASE WHEN :status = 'removed' AND removed_at IS NULL THEN :checked_at
+                                          WHEN :status = 'live' THEN NULL ELSE removed_at END,
+                        status = :status,
+                        http_status = :http_status,
+                        etag = COALESCE(:etag, etag),
+                        last_modified = COALESCE(:last_modified, last_modified),
+                        last_checked = :checked_at
+                    WHERE creator = :creator AND canonical_url = :canonical_url
+                """, results)
+                conn.executemany("""
+                    INSERT INTO link_checks (creator, canonical_url, checked_at, status, http_status, elapsed_ms, error)
+                    VALUES (:creator, :canonical_url, :checked_at, :status, :http_status, :elapsed_ms, :error)
+                """, results)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def history(self, creator_name, canonical_url):
+        """Check history of one link, newest first"""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT checked_at, status, http_status, elapsed_ms, error FROM link_checks
+                WHERE creator = ? AND canonical_url = ? ORDER BY checked_at DESC
+            """, (creator_name, canonical_url)).fetchall()
+        return [dict(r) for r in rows]
+
+    def summary(self, creator_name=None):
+        """Number of links per status, for one creator or all"""
+        with self._connect() as conn:
+            if creator_name:
+                rows = conn.execute("SELECT status, COUNT(*) AS n FROM links WHERE creator = ? GROUP BY status",
+                                    (creator_name,)).fetchall()
+            else:
+                rows = conn.execute("SELECT status, COUNT(*) AS n FROM links GROUP BY status").fetchall()
+        return {r['status']: r['n'] for r in rows}
+
+    def links(self, creator_name, status=None, limit=100):
+        """A creator's links, optionally only those with one status, most recently checked first"""
+        query = "SELECT url, canonical_url, status, http_status, last_checked, removed_at FROM links WHERE creator = ?"
+        params = [creator_name]
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY last_checked DESC LIMIT ?"
+        params.append(limit)
+
+        with self._connect() as conn:
+            return [dict(r) for r in conn.execute(query, params).fetchall()]
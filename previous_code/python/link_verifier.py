@@ -0,0 +1,222 @@
+import os
+import time
+import asyncio
+import argparse
+import httpx
+import pandas as pd
+from url_canonicalizer import canonical_url
+from domain_extractor import url_host
+from link_status import LinkStatusStore, LIVE, REMOVED, ERROR
+from data_access import iter_table
+from http_transport import http_transport
+
+# HTTP statuses that mean the content is gone rather than temporarily unavailable
+REMOVED_STATUSES = {404, 410, 451}
+
+# Servers that reject HEAD are retried with a GET
+HEAD_UNSUPPORTED_STATUSES = {405, 501}
+
+USER_AGENT = "Mozilla/5.0 (compatible; LeakLinkVerifier/1.0)"
+
+
+class LinkVerifier:
+    def __init__(self, store, concurrency=20, per_host_limit=2, politeness_delay=1.0, timeout=15.0,
+                 transport=None):
+        """
+        Asynchronously re-check whether stored leak URLs are still live
+
+        Requests share one pooled client. Each host gets at most per_host_limit requests in
+        flight, started at least politeness_delay seconds apart. Links carrying an ETag or
+        Last-Modified from an earlier check are revalidated with conditional requests, so
+        unchanged pages answer 304 without a body.
+
+        Args:
+            store: LinkStatusStore holding links and their status history
+            concurrency: Maximum requests in flight across all hosts
+            per_host_limit: Maximum requests in flight per host
+            politeness_delay: Minimum seconds between request starts on one host
+            timeout: Per-request timeout in seconds
+            transport: Optional httpx transport, e.g. httpx.MockTransport for a local stand-in
+        """
+        self.store = store
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+        self.politeness_delay = politeness_delay
+        self.timeout = timeout
+        self.transport = transport
+        self._host_slots = {}
+        self._host_next_start = {}
+
+    def verify_due(self, creator_name=None, max_age_days=7, limit=None):
+        """
+        Verify links not checked within max_age_days and store the results
+
+        Returns:
+            List of check results
+        """
+        links = self.store.due(creator_name, max_age_days, limit)
+        if not links:
+            print("ℹ️ No links due for verification")
+            return []
+
+        print(f"🔎 Verifying {len(links)} links...")
+        results = asyncio.run(self.verify(links))
+        self.store.record(results)
+
+        counts = {}
+        for result in results:
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+        print(f"✅ Verified {len(results)} links: " + ", ".join(f"{n} {s}" for s, n in sorted(counts.items())))
+        return results
+
+    async def verify(self, links):
+        """
+        Check links concurrently
+
+        Args:
+            links: Dicts with creator, canonical_url, url and optionally etag, last_modified and status
+
+        Returns:
+            One result dict per link
+        """
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Asyncio primitives belong to one event loop, so host limits start fresh on every run
+        self._host_slots = {}
+        self._host_next_start = {}
+        # Links sharing a canonical URL (several creators) are fetched once
+        pending = {}
+
+        timeout = httpx.Timeout(self.timeout, connect=min(self.timeout, http_transport.connect_timeout))
+        async with http_transport.async_client(limits=limits, timeout=timeout, follow_redirects=True,
+                                               headers={'User-Agent': USER_AGENT}, transport=self.transport) as client:
+            async def check(link):
+                key = link['canonical_url']
+                if key not in pending:
+                    pending[key] = asyncio.ensure_future(self._check_with_limits(client, semaphore, link))
+                outcome = await pending[key]
+                return dict(outcome, creator=link['creator'], canonical_url=key)
+
+            return await asyncio.gather(*(check(link) for link in links))
+
+    async def _check_with_limits(self, client, semaphore, link):
+        """Check a link once the global and per-host limits allow"""
+        host = url_host(link['url'])
+        host_slots = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+
+        async with host_slots:
+            # Space request starts on the same host by the politeness delay. The wait happens
+            # before taking a global slot, so a slow host never idles slots other hosts could use.
+            now = time.monotonic()
+            start = max(now, self._host_next_start.get(host, now))
+            self._host_next_start[host] = start + self.politeness_delay
+            if start > now:
+                await asyncio.sleep(start - now)
+            async with semaphore:
+                return await self.check(client, link)
+
+    async def check(self, client, link):
+        """
+        Check one link with a HEAD request (GET when HEAD is not supported)
+
+        Returns:
+            Dict with status, http_status, etag, last_modified, checked_at, elapsed_ms and error
+        """
+        # Only a page last seen live can be revalidated; a 304 then means it is unchanged
+        headers = {}
+        if link.get('status') == LIVE:
+            if link.get('etag'):
+                headers['If-None-Match'] = link['etag']
+            if link.get('last_modified'):
+                headers['If-Modified-Since'] = link['last_modified']
+
+        started = time.time()
+        try:
+            response = await client.head(link['url'], headers=headers)
+            if response.status_code in HEAD_UNSUPPORTED_STATUSES:
+                async with client.stream('GET', link['url'], headers=headers) as response:
+                    pass  # Only the status and headers are needed
+        except Exception as e:
+            # Invalid URLs (httpx.InvalidURL is not an HTTPError) fail this link only, never the whole run
+            return self._result(ERROR, None, None, None, started, f"{type(e).__name__}: {e}")
+
+        code = response.status_code
+        if code == 304:
+            # Unchanged since the last check, so it is still live
+            status = LIVE
+        elif code in REMOVED_STATUSES:
+            status = REMOVED
+        elif code < 400:
+            status = LIVE
+        else:
+            status = ERROR
+
+        # Validators of error pages must never be used to revalidate the content
+        etag = response.headers.get('etag') if status == LIVE else None
+        last_modified = response.headers.get('last-modified') if status == LIVE else None
+        return self._result(status, code, etag, last_modified, started, None)
+
+    @staticmethod
+    def _result(status, http_status, etag, last_modified, started, error):
+        """Build a check result"""
+        return {
+            'status': status,
+            'http_status': http_status,
+            'etag': etag,
+            'last_modified': last_modified,
+            'checked_at': time.time(),
+            'elapsed_ms': int((time.time() - started) * 1000),
+            'error': error
+        }
+
+
+def register_master_links(store, creator_name, master_dir=None):
+    """Register every URL of a creator's master content for verification"""
+    master_dir = master_dir or os.path.join(os.getcwd(), "master_data")
+    master_file = os.path.join(master_dir, f"{creator_name.replace(' ', '_')}_master.csv")
+    if not os.path.exists(master_file):
+        print(f"❌ No master data found for {creator_name}")
+        return 0
+
+    links = []
+    for df in iter_table(master_file, ('url', 'canonical_url'), dtype=str):
+        canonical = df['canonical_url'] if 'canonical_url' in df.columns else pd.Series(None, index=df.index)
+        links.extend((url, key if isinstance(key, str) and key else canonical_url(url))
+                     for url, key in zip(df['url'], canonical) if isinstance(url, str))
+
+    added = store.register(creator_name, links)
+    print(f"✅ Registered {added} new links for {creator_name}")
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify whether stored leak URLs are still live')
+    parser.add_argument('--db', type=str, help='Link status database (default: master_data/link_status.db)')
+    parser.add_argument('--creator', type=str, help='Only verify links of this creator')
+    parser.add_argument('--max-age-days', type=float, default=7, help='Re-check links not verified for this many days')
+    parser.add_argument('--limit', type=int, help='Verify at most this many links')
+    parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight across all hosts')
+    parser.add_argument('--per-host', type=int, default=2, help='Requests in flight per host')
+    parser.add_argument('--delay', type=float, default=1.0, help='Seconds between requests to one host')
+    parser.add_argument('--status', action='store_true', help='Only print link counts per status')
+    args = parser.parse_args()
+
+    store = LinkStatusStore(args.db)
+
+    if args.status:
+        print(f"📊 Link status{f' for {args.creator}' if args.creator else ''}: {store.summary(args.creator)}")
+        return
+
+    # Merged rows are registered as they are stored; this picks up rows stored before that
+    if args.creator:
+        register_master_links(store, args.creator)
+
+    verifier = LinkVerifier(store, concurrency=args.concurrency, per_host_limit=args.per_host,
+                            politeness_delay=args.delay)
+    verifier.verify_due(args.creator, args.max_age_days, args.limit)
+
+    print(f"📊 Link status{f' for {args.creator}' if args.creator else ''}: {store.summary(args.creator)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import os
+import math
+import time
+import bisect
+import threading
+import tracemalloc
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels):
+    """Hashable, ordered form of a label dict"""
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    """Render a label key as {name="value",...}"""
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (f'{k}="' + v.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') + '"' for k, v in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    """Render a sample value in the Prometheus text format"""
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation):
+        """Named metric with one value per label combination"""
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._function = None
+        self._lock = threading.Lock()
+
+    def set_function(self, function):
+        """
+        Compute the metric when scraped, e.g. from counters another component already keeps
+
+        Args:
+            function: Callable returning a number (None for no sample), or a list of
+                (labels dict, value) pairs
+        """
+        self._function = function
+
+    def samples(self):
+        """(suffix, label key, extra labels, value) tuples of the current values"""
+        if self._function is not None:
+            try:
+                result = self._function()
+            except Exception:
+                return []  # A failing source must not break the whole scrape
+            if result is None:
+                return []
+            if isinstance(result, (int, float)):
+                return [('', (), (), result)]
+            return [('', _label_key(labels), (), value) for labels, value in result]
+
+        with self._lock:
+            return [('', key, (), value) for key, value in sorted(self._values.items())]
+
+    def render(self):
+        """Lines of this metric in the Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(key, extra)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Add to the counter"""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        """Set the gauge"""
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        """Add to the gauge (negative amounts subtract)"""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        """Histogram with upper bucket bounds in ascending order (+Inf is implicit)"""
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """Record one observation"""
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def time(self, **labels):
+        """Context manager observing the duration of a block"""
+        return _Timer(self, labels)
+
+    def samples(self):
+        """Bucket, sum and count samples of every label combination"""
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in sorted(self._values.items())]
+
+        samples = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append(('_bucket', key, (('le', _format_value(float(bound))),), cumulative))
+            samples.append(('_sum', key, (), total))
+            samples.append(('_count', key, (), count))
+        return samples
+
+
+class _Timer:
+    """Observes the wall time of a with block in a histogram"""
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        Process-wide metrics shared by every module and exposed in the Prometheus text format
+
+        Metrics are created on first use by name, so modules can declare the same metric
+        independently and re-imports never register duplicates.
+        """
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, **kwargs):
+        """Return the metric registered under name, registering it first if needed"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name, documentation):
+        """Monotonic counter"""
+        return self._get_or_create(Counter, name, documentation)
+
+    def gauge(self, name, documentation):
+        """Value that goes up and down, optionally computed when scraped"""
+        return self._get_or_create(Gauge, name, documentation)
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS):
+        """Distribution of observations in cumulative buckets"""
+        return self._get_or_create(Histogram, name, documentation, buckets=buckets)
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def process_rss_bytes():
+    """Current resident set size of this process, or None where it cannot be read"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # Peak rather than current RSS; ru_maxrss is in KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+def tracemalloc_top(limit=10):
+    """
+    Source lines holding the most traced memory
+
+    Tracing slows every allocation, so it is never started here; the process opts in with
+    tracemalloc.start() (the app does when METRICS_TRACEMALLOC is set).
+
+    Returns:
+        List of ('file:line', bytes) pairs, largest first; empty when tracing is off
+    """
+    if not tracemalloc.is_tracing():
+        return []
+    stats = tracemalloc.take_snapshot().statistics('lineno')[:limit]
+    return [(f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno}", s.size) for s in stats]
+
+
+# Shared by every component in the process
+metrics = MetricsRegistry()
+
+metrics.gauge('process_resident_memory_bytes', 'Resident memory of this process').set_function(process_rss_bytes)
+
+# Hot-path metrics are declared here rather than in their modules, so a fresh process exports them
+# before any scan has imported the scraper, learner or knowledge manager
+
+# Search API
+SEARCH_API_SECONDS = metrics.histogram('search_api_request_seconds', 'Latency of Custom Search API calls by HTTP status')
+SEARCH_API_CALLS = metrics.counter('search_api_calls_total', 'Custom Search API calls per API key (quota used)')
+SEARCH_API_RETRIES = metrics.counter('search_api_retries_total', 'Throttled or failed Custom Search API calls retried')
+NEW_URLS_PER_CALL = metrics.histogram('search_new_urls_per_call', 'New URLs found by one Custom Search API call',
+                                      buckets=(0, 1, 2, 3, 5, 7, 10))
+SEARCH_API_RATE = metrics.gauge('search_api_rate', 'Current adaptive request rate limit per second')
+
+# Keyword learning
+LLM_SECONDS = metrics.histogram('llm_request_seconds', 'Latency of keyword generation LLM calls (single or batch)')
+
+# Master content
+MERGE_SECONDS = metrics.histogram('master_merge_seconds', 'Duration of merging a batch into master content')
+ROWS_WRITTEN = metrics.counter('master_rows_written_total', 'New rows written to master content files')
+
+# Creator state cache; values are read from the cache when it is loaded
+CACHE_LOOKUPS = metrics.counter('creator_cache_lookups_total', 'Creator state cache lookups by result')
+CACHE_HIT_RATIO = metrics.gauge('creator_cache_hit_ratio', 'Share of creator state cache lookups served from memory')
+CACHE_BYTES = metrics.gauge('creator_cache_bytes', 'Approximate memory held by the creator state cache')
@@ -1,23 +1,43 @@
 import os
+import logging
 import argparse
-import pandas as pd
-from datetime import datetime
-from leak_scraper import LeakScraper
+from leak_scraper import LeakScraper, REGION_COUNTRY_CODES
 from keyword_learner import KeywordLearner
 from knowledge_manager import KnowledgeManager
+from scan_pipeline import ScanPipeline
+from batch_scan import BatchScanner, load_manifest, write_summary
+from profiling import profiler, cprofile_to
 
 
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='ORM Leak Detection System')
     parser.add_argument('--creator', type=str, help='Creator name to search for')
-    parser.add_argument('--timeframe', type=str, help='Timeframe (today, last X days/weeks/months)')
+    parser.add_argument('--timeframe', type=str, help='Timeframe (today, last X days/weeks/months, incremental)')
     parser.add_argument('--max-searches', type=int, help='Maximum API calls')
     parser.add_argument('--suggest-only', action='store_true', help='Only suggest keywords without searching')
     parser.add_argument('--export', choices=['csv', 'excel', 'json'], help='Export master data in specified format')
+    parser.add_argument('--save-temp', action='store_true', help='Also write scan results to temp_results/ for auditing')
+    parser.add_argument('--regions', type=str, help='Comma-separated region codes to fan out across (e.g. US,UK,UAE)')
+    parser.add_argument('--manifest', type=str, help='JSON manifest of creators to scan non-interactively')
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes for batch mode')
+    parser.add_argument('--global-quota', type=int, help='Maximum API calls across all creators in batch mode')
+    parser.add_argument('--summary', type=str, help='Path of the JSON summary written in batch mode')
+    parser.add_argument('--verbose', action='store_true', help='Log every search result as it is found')
+    parser.add_argument('--profile', action='store_true', help='Print a per-stage timing report and save cProfile stats')
 
     args = parser.parse_args()
 
+    # Unknown region codes would silently run unrestricted searches, so they are rejected up front
+    regions = [r.strip().upper() for r in args.regions.split(',') if r.strip()] if args.regions else None
+    unknown = [r for r in regions or [] if r not in REGION_COUNTRY_CODES]
+    if unknown:
+        parser.error(f"unknown regions: {', '.join(unknown)} (known: {', '.join(REGION_COUNTRY_CODES)})")
+
+    if args.verbose:
+        logging.basicConfig(format='%(message)s')
+        logging.getLogger('leak_scraper').setLevel(logging.DEBUG)
+
     # Configuration
     GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY', '')
     SEARCH_ENGINE_ID = os.environ.get('SEARCH_ENGINE_ID', '')
@@ -27,6 +47,29 @@ def main():
     keyword_learner = KeywordLearner(OPENAI_API_KEY)
     knowledge_manager = KnowledgeManager()
 
+    # Batch mode scans every creator in the manifest without prompting
+    if args.manifest:
+        scanner = BatchScanner(
+            google_api_key=GOOGLE_API_KEY,
+            search_engine_id=SEARCH_ENGINE_ID,
+            keyword_learner=keyword_learner,
+            workers=args.workers,
+            global_quota=args.global_quota,
+            default_timeframe=args.timeframe or "last 1 days",
+            default_max_searches=args.max_searches or 50
+        )
+        summary = scanner.run(load_manifest(args.manifest))
+        totals = summary['totals']
+        print(f"\n✅ Batch complete: {totals['completed']}/{totals['creators']} creators, "
+              f"{totals['api_calls']} API calls, {totals['new_urls']} new URLs")
+        print(f"📊 Throughput: {totals['creators_per_hour']} creators/hour, "
+              f"{totals['api_calls_per_minute']} API calls/minute")
+        if summary['learning']['status'] == 'error':
+            print(f"⚠️ Keyword learning failed: {summary['learning']['error']}")
+        if args.summary:
+            write_summary(summary, args.summary)
+        return
+
     # Get creator name
     creator_name = args.creator
     if not creator_name:
@@ -101,40 +144,49 @@ def main():
     # Add creator name to each keyword
     FULL_KEYWORDS = [f"{creator_name} {kw}" for kw in USER_KEYWORDS]
 
-    # Create and run the scraper
+    scan_options = dict(creator_name=creator_name, keywords=FULL_KEYWORDS, timeframe=TIMEFRAME,
+                        max_searches=MAX_SEARCHES, regions=regions, api_key=GOOGLE_API_KEY,
+                        search_engine_id=SEARCH_ENGINE_ID, keyword_learner=keyword_learner,
+                        knowledge_manager=knowledge_manager, save_temp=args.save_temp)
+
+    if args.profile:
+        profile_dir = os.path.join(os.getcwd(), "profiles")
+        with profiler.collect() as collector, cprofile_to(profile_dir, creator_name) as cprofile:
+            with profiler.span('scan'):
+                run_scan(**scan_options)
+        print_profile(collector, cprofile)
+    else:
+        run_scan(**scan_options)
+
+    print("\n✅ Process complete!")
+
+
+def run_scan(creator_name, keywords, timeframe, max_searches, regions, api_key, search_engine_id, keyword_learner,
+             knowledge_manager, save_temp=False):
+    """Scan a creator, then learn from and merge the results"""
+    # Create and run the scraper, merging each page into master content as it arrives
     scraper = LeakScraper(
         creator_name=creator_name,
-        api_key=GOOGLE_API_KEY,
-        search_engine_id=SEARCH_ENGINE_ID,
-        max_searches=MAX_SEARCHES
+        api_key=api_key,
+        search_engine_id=search_engine_id,
+        max_searches=max_searches,
+        result_sink=knowledge_manager.open_sink(creator_name)
     )
 
     # Run the scan
     results = scraper.run_scan(
-        keywords=FULL_KEYWORDS,
-        timeframe=TIMEFRAME
+        keywords=keywords,
+        timeframe=timeframe,
+        regions=regions
     )
 
     if results:
-        # Save temporary results for learning
-        temp_dir = os.path.join(os.getcwd(), "temp_results")
-        os.makedirs(temp_dir, exist_ok=True)
-        temp_file = os.path.join(temp_dir,
-                                 f"{creator_name.replace(' ', '_')}_temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-        temp_df = pd.DataFrame(results)
-        temp_df.to_csv(temp_file, index=False)
-        print(f"✅ Saved temp results to {temp_file} for keyword learning")
-
-        # Learn from results
-        print("\n🧠 Learning from search results...")
-        updated_keywords = keyword_learner.learn_from_results(temp_file, creator_name)
-
-        # Update master content repository
-        print("\n📚 Updating master content repository...")
-        new_count = knowledge_manager.update_master_content(temp_file, creator_name)
+        # Learn from and merge the results in memory
+        pipeline = ScanPipeline(keyword_learner, knowledge_manager, save_temp_results=save_temp)
+        outcome = pipeline.process(results, creator_name)
 
         # Show content stats
-        stats = knowledge_manager.get_content_stats(creator_name)
+        stats = outcome['stats']
         print(f"\n📈 Content Repository Stats:")
         print(f"  Total URLs: {stats['total_urls']}")
         print(f"  Date Range: {stats['oldest_content']} to {stats['newest_content']}")
@@ -144,7 +196,15 @@ def main():
         for domain, count in domain_items[:5]:
             print(f"    - {domain}: {count} URLs")
 
-    print("\n✅ Process complete!")
+
+def print_profile(collector, cprofile):
+    """Print the per-stage report and the slowest functions of a profiled scan"""
+    print("\n⏱️ Per-stage profile:")
+    print(collector.format_report())
+    print("\n⏱️ Top functions by cumulative time (main thread):")
+    for function, seconds in cprofile['top']:
+        print(f"  {seconds:8.3f}s  {function}")
+    print(f"✅ Saved cProfile stats to {cprofile['stats_file']} (view with snakeviz, or flameprof for a flamegraph)")
 
 
 def get_user_timeframe():
@@ -154,12 +214,15 @@ def get_user_timeframe():
     print("2. Last X days")
     print("3. Last X weeks")
     print("4. Last X months")
+    print("5. Since last scan (incremental)")
 
     while True:
-        choice = input("Enter choice (1-4): ").strip()
+        choice = input("Enter choice (1-5): ").strip()
 
         if choice == "1":
             return "today"
+        elif choice == "5":
+            return "incremental"
         elif choice in ["2", "3", "4"]:
             if choice == "2":
                 unit = "days"
@@ -187,7 +250,7 @@ def get_user_timeframe():
                 print("⚠️ Please enter a valid number")
                 continue
         else:
-            print("⚠️ Please enter a number between 1 and 4")
+            print("⚠️ Please enter a number between 1 and 5")
 
 
 if __name__ == "__main__":
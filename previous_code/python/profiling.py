@@ -0,0 +1,188 @@
+import os
+import time
+import pstats
+import cProfile
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+
+# Path of the innermost open span, e.g. ('scan', 'search', 'http')
+_span_path = contextvars.ContextVar('span_path', default=())
+
+# Collectors recording the spans of the current scan
+_collectors = contextvars.ContextVar('profile_collectors', default=())
+
+
+class Span:
+    """Handle of an open span, used to attribute I/O volume to it"""
+
+    __slots__ = ('name', 'bytes_read', 'bytes_written')
+
+    def __init__(self, name):
+        self.name = name
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def add_bytes(self, read=0, written=0):
+        """Count bytes read or written inside the span"""
+        self.bytes_read += read
+        self.bytes_written += written
+
+
+class ProfileCollector:
+    def __init__(self):
+        """Thread-safe totals per span path: calls, wall time, CPU time and bytes read and written"""
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def add(self, path, wall, cpu, bytes_read, bytes_written):
+        """Add one finished span"""
+        with self._lock:
+            totals = self._totals.setdefault(path, [0, 0.0, 0.0, 0, 0])
+            totals[0] += 1
+            totals[1] += wall
+            totals[2] += cpu
+            totals[3] += bytes_read
+            totals[4] += bytes_written
+
+    def report(self):
+        """
+        Per-span breakdown, parents before their children
+
+        Returns:
+            Dict mapping the span path ('scan/search/http') to its calls, wall_s, cpu_s,
+            bytes_read and bytes_written
+        """
+        with self._lock:
+            items = sorted(self._totals.items())
+        return {
+            '/'.join(path): {
+                'calls': calls,
+                'wall_s': round(wall, 4),
+                'cpu_s': round(cpu, 4),
+                'bytes_read': bytes_read,
+                'bytes_written': bytes_written
+            }
+            for path, (calls, wall, cpu, bytes_read, bytes_written) in items
+        }
+
+    def format_report(self):
+        """Render the breakdown as an indented table"""
+        lines = [f"{'stage':<40} {'calls':>7} {'wall s':>9} {'cpu s':>9} {'read':>10} {'written':>10}"]
+        for path, totals in self.report().items():
+            depth = path.count('/')
+            name = '  ' * depth + path.rsplit('/', 1)[-1]
+            lines.append(f"{name:<40} {totals['calls']:>7} {totals['wall_s']:>9.3f} {totals['cpu_s']:>9.3f} "
+                         f"{format_bytes(totals['bytes_read']):>10} {format_bytes(totals['bytes_written']):>10}")
+        return "\n".join(lines)
+
+
+class Profiler:
+    def __init__(self):
+        """
+        Lightweight span timers for the scan pipeline
+
+        A span records wall time, the CPU time of the thread running it and the bytes it
+        reports reading or writing. Spans nest into paths and are added to every collector
+        opened by collect() in the current context, so concurrent scans keep separate
+        breakdowns. Worker threads join their parent's context via submit().
+        """
+        self.totals = ProfileCollector()
+
+    @contextmanager
+    def span(self, name):
+        """Time a block as a child of the current span; yields a Span for byte counts"""
+        path = _span_path.get() + (name,)
+        token = _span_path.set(path)
+        span = Span(name)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield span
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            _span_path.reset(token)
+            self.totals.add(path, wall, cpu, span.bytes_read, span.bytes_written)
+            for collector in _collectors.get():
+                collector.add(path, wall, cpu, span.bytes_read, span.bytes_written)
+
+    def timed(self, name):
+        """Decorator running a function inside a span"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def collect(self):
+        """Record the spans of the enclosed work (and threads submitted from it) into a new collector"""
+        collector = ProfileCollector()
+        token = _collectors.set(_collectors.get() + (collector,))
+        try:
+            yield collector
+        finally:
+            _collectors.reset(token)
+
+
+def submit(executor, func, *args, **kwargs):
+    """Submit work to an executor so its spans nest under the caller's span and collectors"""
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+def file_size(path):
+    """Size of a file in bytes, or 0 if it does not exist"""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def format_bytes(count):
+    """Human-readable byte count"""
+    if not count:
+        return '-'
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f"{count:.0f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+@contextmanager
+def cprofile_to(output_dir, label):
+    """
+    Run the enclosed block under cProfile and save the stats
+
+    cProfile only sees the thread that enters the block. The .prof file opens in snakeviz,
+    or converts to a flamegraph with flameprof.
+
+    Yields:
+        Dict that receives the 'stats_file' path and the 'top' functions by cumulative time
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    result = {}
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield result
+    finally:
+        profile.disable()
+        stats_file = os.path.join(output_dir, f"{label.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+        profile.dump_stats(stats_file)
+        stats = pstats.Stats(profile)
+        result['stats_file'] = stats_file
+        result['top'] = [
+            (f"{os.path.basename(filename)}:{line}({function})", cumulative)
+            for (filename, line, function), (_, _, _, cumulative, _) in
+            sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:15]
+        ]
+
+
+# Shared by every component in the process
+profiler = Profiler()
@@ -0,0 +1,140 @@
+import math
+import re
+from domain_extractor import domain_of
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to a character estimate
+    tiktoken = None
+
+
+class PromptSampleBuilder:
+    def __init__(self, token_budget=600, columns=('title', 'snippet', 'query'), max_rows=30,
+                 similarity_threshold=0.8, max_field_chars=200, model="gpt-3.5-turbo"):
+        """
+        Build a compact, representative sample of scan results for an LLM prompt
+
+        Args:
+            token_budget: Maximum number of tokens the rendered sample may use
+            columns: Result columns rendered for each sampled row
+            max_rows: Maximum number of rows considered for the sample
+            similarity_threshold: Jaccard similarity above which a row counts as a near-duplicate
+            max_field_chars: Maximum characters rendered per field
+            model: Model name used to pick the tokenizer
+        """
+        self.token_budget = token_budget
+        self.columns = list(columns)
+        self.max_rows = max_rows
+        self.similarity_threshold = similarity_threshold
+        self.max_field_chars = max_field_chars
+        self._encoding = None
+
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except Exception:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(self, text):
+        """Count tokens in text, estimating ~4 characters per token without tiktoken"""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return math.ceil(len(text) / 4)
+
+    def build(self, df):
+        """Render a token-budgeted sample of the results frame"""
+        if df is None or df.empty:
+            return "No sample content available"
+
+        lines = []
+        used_tokens = 0
+
+        for row in self.select_rows(df):
+            line = self._render_row(row)
+            line_tokens = self.count_tokens(line) + 1  # Newline separator
+
+            if used_tokens + line_tokens > self.token_budget:
+                break
+
+            lines.append(line)
+            used_tokens += line_tokens
+
+        return "\n".join(lines) if lines else "No sample content available"
+
+    def select_rows(self, df):
+        """Pick rows round-robin across (domain, query) strata, skipping near-duplicate snippets"""
+        columns = [c for c in self.columns + ['url'] if c in df.columns]
+        records = df[columns].to_dict('records')
+
+        # Group rows by stratum, keeping first-seen order
+        strata = {}
+        for record in records:
+            key = (self._domain(record.get('url')), str(record.get('query', '')))
+            strata.setdefault(key, []).append(record)
+
+        # Largest strata first so the most productive sources lead the sample
+        queues = sorted(strata.values(), key=len, reverse=True)
+
+        selected = []
+        selected_tokens = []
+        depth = 0
+
+        while len(selected) < self.max_rows:
+            picked_this_round = False
+
+            for queue in queues:
+                if depth >= len(queue):
+                    continue
+                picked_this_round = True
+
+                record = queue[depth]
+                tokens = self._token_set(record)
+                if self._is_near_duplicate(tokens, selected_tokens):
+                    continue
+
+                selected.append(record)
+                selected_tokens.append(tokens)
+                if len(selected) >= self.max_rows:
+                    break
+
+            if not picked_this_round:
+                break
+            depth += 1
+
+        return selected
+
+    def _render_row(self, record):
+        """Render only the configured columns of a row"""
+        parts = []
+        for column in self.columns:
+            value = record.get(column)
+            if not isinstance(value, str) or not value:
+                continue
+            value = " ".join(value.split())
+            if len(value) > self.max_field_chars:
+                value = value[:self.max_field_chars].rstrip() + "…"
+            parts.append(f"{column}: {value}")
+        return "- " + " | ".join(parts)
+
+    def _is_near_duplicate(self, tokens, selected_tokens):
+        """Check if a token set is too similar to any already selected row"""
+        if not tokens:
+            return False
+        for other in selected_tokens:
+            if not other:
+                continue
+            similarity = len(tokens & other) / len(tokens | other)
+            if similarity >= self.similarity_threshold:
+                return True
+        return False
+
+    @staticmethod
+    def _token_set(record):
+        """Normalized word set of a row's title and snippet"""
+        text = " ".join(v for v in (record.get('title'), record.get('snippet')) if isinstance(v, str))
+        return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+    @staticmethod
+    def _domain(url):
+        """Registrable domain of a URL, used only for stratification"""
+        return domain_of(url)
@@ -0,0 +1,165 @@
+import os
+import glob
+import numpy as np
+import pandas as pd
+from url_canonicalizer import canonical_url
+
+
+def _url_codes(previous, current):
+    """
+    Integer code per canonical URL across both snapshots
+
+    Uses the canonical_url column snapshots are saved with, and otherwise canonicalizes each
+    distinct URL once. Codes start at 1 so missing values, which factorize marks with -1,
+    share code 0 instead of corrupting the combined keys.
+
+    Returns:
+        Tuple of (codes array, number of distinct keys)
+    """
+    if 'canonical_url' in previous.columns and 'canonical_url' in current.columns:
+        keys = np.concatenate([previous['canonical_url'].to_numpy(dtype=object),
+                               current['canonical_url'].to_numpy(dtype=object)])
+        codes, uniques = pd.factorize(keys)
+        return codes + 1, len(uniques) + 1
+
+    urls = np.concatenate([previous['url'].to_numpy(dtype=object), current['url'].to_numpy(dtype=object)])
+    url_codes, unique_urls = pd.factorize(urls, use_na_sentinel=False)
+    key_codes, unique_keys = pd.factorize(np.array(
+        [canonical_url(url) for url in unique_urls], dtype=object))
+    return key_codes[url_codes], len(unique_keys)
+
+
+def load_snapshot(snapshot_file):
+    """Load a rank snapshot written by LeakScraper.save_rank_snapshot"""
+    return pd.read_csv(snapshot_file, usecols=lambda column: column != 'scanned_at',
+                       dtype={'query': 'category', 'region': 'category', 'rank': 'int32'},
+                       keep_default_na=False)
+
+
+def latest_snapshots(creator_name, base_dir=None, count=2):
+    """Paths of a creator's most recent rank snapshots, oldest first"""
+    base_dir = base_dir or os.path.join(os.getcwd(), "leak_detection_results", "rank_snapshots")
+    files = sorted(glob.glob(os.path.join(base_dir, f"{creator_name.replace(' ', '_')}_*.csv")))
+    return files[-count:]
+
+
+def _best_positions(keys, ranks):
+    """Row position holding the best (lowest) rank of every distinct key, plus the keys"""
+    # A single argsort of key * span + rank orders by key, then rank, faster than lexsort
+    span = int(ranks.max()) + 1 if len(ranks) else 1
+    order = np.argsort(keys * span + ranks)
+    sorted_keys = keys[order]
+    first = np.empty(len(order), dtype=bool)
+    first[:1] = True
+    first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    positions = order[first]
+    return positions, sorted_keys[first]
+
+
+def _group_codes(previous, current):
+    """
+    Integer code per value of a comparison column across both snapshots
+
+    Categorical columns (as load_snapshot reads them) are coded through their categories,
+    so only the distinct values are hashed.
+
+    Returns:
+        Tuple of (codes array, number of distinct values)
+    """
+    if isinstance(previous.dtype, pd.CategoricalDtype) and isinstance(current.dtype, pd.CategoricalDtype):
+        category_codes, uniques = pd.factorize(np.concatenate([
+            previous.cat.categories.to_numpy(dtype=object), current.cat.categories.to_numpy(dtype=object)]))
+        split = len(previous.cat.categories)
+        # Missing values (code -1) get their own code past the distinct values
+        previous_map = np.append(category_codes[:split], len(uniques))
+        current_map = np.append(category_codes[split:], len(uniques))
+        codes = np.concatenate([previous_map[previous.cat.codes.to_numpy()],
+                                current_map[current.cat.codes.to_numpy()]])
+        return codes, len(uniques) + 1
+
+    # Shifted past factorize's -1 so missing values share code 0
+    codes, uniques = pd.factorize(np.concatenate([previous.to_numpy(dtype=object), current.to_numpy(dtype=object)]))
+    return codes + 1, len(uniques) + 1
+
+
+def diff_snapshots(previous, current, by=('query',)):
+    """
+    Compare two rank snapshots
+
+    URLs and comparison groups are mapped to shared integer codes, so the join and the
+    delta computation run on numpy arrays rather than strings.
+
+    Args:
+        previous: Older snapshot DataFrame (query, region, url, rank)
+        current: Newer snapshot DataFrame
+        by: Columns ranks are compared within, besides the URL; () compares each URL's
+            best rank across all queries
+
+    Returns:
+        Dict of DataFrames 'new', 'dropped', 'improved', 'declined' and 'unchanged'. Rows carry
+        previous_rank, current_rank and delta (positive when the URL moved up).
+    """
+    by = list(by)
+    split = len(previous)
+
+    # One int64 key per row combining the comparison group and the URL key
+    url_codes, url_count = _url_codes(previous, current)
+    keys = np.zeros(len(url_codes), dtype='int64')
+    for column in by:
+        codes, count = _group_codes(previous[column], current[column])
+        keys = keys * (count + 1) + codes
+    keys = keys * (url_count + 1) + url_codes
+
+    ranks = np.concatenate([previous['rank'].to_numpy(dtype='int64'), current['rank'].to_numpy(dtype='int64')])
+    previous_positions, previous_keys = _best_positions(keys[:split], ranks[:split])
+    current_positions, current_keys = _best_positions(keys[split:], ranks[split:])
+    previous_ranks = ranks[:split][previous_positions]
+    current_ranks = ranks[split:][current_positions]
+
+    # Both key arrays come out sorted, so current keys are matched with a binary search; the
+    # appended -1 sentinel (keys are never negative) absorbs keys past the last previous one
+    matches = np.searchsorted(previous_keys, current_keys)
+    matched = np.append(previous_keys, -1)[matches] == current_keys
+    dropped = np.ones(len(previous_keys), dtype=bool)
+    dropped[matches[matched]] = False
+
+    matched_ranks = np.where(matched, np.append(previous_ranks, 0)[matches], 0)
+    delta = np.where(matched, matched_ranks - current_ranks, 0)
+
+    def ranks_array(values, order):
+        if values is None:
+            return pd.arrays.IntegerArray(np.zeros(len(order), dtype='int32'), np.ones(len(order), dtype=bool))
+        return pd.arrays.IntegerArray(values[order].astype('int32'), np.zeros(len(order), dtype=bool))
+
+    def rows(snapshot, positions, previous_rank, current_rank, order):
+        """Result rows in the given order; a rank of None is left missing"""
+        frame = snapshot[by + ['url']].take(positions[order]).reset_index(drop=True)
+        frame['previous_rank'] = ranks_array(previous_rank, order)
+        frame['current_rank'] = ranks_array(current_rank, order)
+        frame['delta'] = delta[order] if previous_rank is not None and current_rank is not None else 0
+        return frame
+
+    def where(mask, sort_by):
+        """Positions of the rows in mask, stably ordered by sort_by"""
+        selected = np.flatnonzero(mask)
+        return selected[np.argsort(sort_by[selected], kind='stable')]
+
+    return {
+        'new': rows(current, current_positions, None, current_ranks, where(~matched, current_ranks)),
+        'dropped': rows(previous, previous_positions, previous_ranks, None, where(dropped, previous_ranks)),
+        'improved': rows(current, current_positions, matched_ranks, current_ranks,
+                         where(matched & (delta > 0), -delta)),
+        'declined': rows(current, current_positions, matched_ranks, current_ranks,
+                         where(matched & (delta < 0), delta)),
+        'unchanged': rows(current, current_positions, matched_ranks, current_ranks,
+                          np.flatnonzero(matched & (delta == 0)))
+    }
+
+
+def summarize_diff(diff, limit=50):
+    """JSON-friendly summary of a snapshot diff with the top rows of each set"""
+    summary = {}
+    for name, frame in diff.items():
+        rows = frame.head(limit).astype(object).where(frame.head(limit).notna(), None)
+        summary[name] = {'count': len(frame), 'items': rows.to_dict('records')}
+    return summary
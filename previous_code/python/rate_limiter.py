@@ -0,0 +1,146 @@
+import asyncio
+import random
+import threading
+import time
+
+
+def retry_delay(attempt, retry_after=None, base_delay=1.0, max_delay=60.0):
+    """
+    Compute how long to wait before retrying a throttled request
+
+    Args:
+        attempt: Zero-based retry attempt number
+        retry_after: Value of a Retry-After header in seconds, if the server sent one
+        base_delay: Delay of the first retry in seconds
+        max_delay: Upper bound for the backoff delay
+
+    Returns:
+        Delay in seconds, using the server hint when present or exponential backoff with full jitter
+    """
+    if retry_after is not None:
+        try:
+            return min(max(float(retry_after), 0.0), max_delay)
+        except (TypeError, ValueError):
+            pass
+
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class AsyncTokenRateLimiter:
+    def __init__(self, tokens_per_minute):
+        """
+        Token bucket limiting how many LLM tokens are spent per minute
+
+        Args:
+            tokens_per_minute: Sustained token throughput, also used as the burst size
+        """
+        self.capacity = float(tokens_per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens):
+        """Wait until the requested number of tokens can be spent"""
+        tokens = min(float(tokens), self.capacity)
+
+        # Waiters are served in arrival order while holding the lock
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.available >= tokens:
+                    self.available -= tokens
+                    return
+                await asyncio.sleep((tokens - self.available) / self.rate)
+
+    def _refill(self):
+        """Add tokens earned since the last refill"""
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, initial_rate=0.5, min_rate=0.1, max_rate=5.0, burst=2, increase_step=0.05,
+                 decrease_factor=0.5):
+        """
+        Thread-safe token bucket for API requests whose rate adapts to throttling (AIMD)
+
+        Every successful request raises the rate by increase_step; a throttled one multiplies it
+        by decrease_factor and pauses the bucket for the server's Retry-After, so callers settle
+        near the highest rate the API sustains.
+
+        Args:
+            initial_rate: Requests per second to start at
+            min_rate: Lowest rate throttling can push the limiter down to
+            max_rate: Highest rate successes can raise the limiter to
+            burst: Requests that may be sent back to back after an idle period
+            increase_step: Requests per second added per successful request
+            decrease_factor: Rate multiplier applied when a request is throttled
+        """
+        self.rate = float(initial_rate)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.capacity = float(burst)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Wait for a request slot
+
+        Returns:
+            Seconds spent waiting
+        """
+        # Slots are reserved under the lock and waited for outside it, so threads queue in order
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.available -= 1
+            wait = max(-self.available / self.rate, self.paused_until - now, 0.0)
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def succeeded(self):
+        """Raise the rate after a request went through"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def throttled(self, retry_after=None):
+        """
+        Lower the rate after a 429 or 503 response
+
+        Args:
+            retry_after: Seconds the server asked to wait, if it sent a Retry-After header
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            # Concurrent requests throttled by the same burst lower the rate once
+            if now - self.last_decrease >= 1.0 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self.last_decrease = now
+
+            if retry_after is not None:
+                try:
+                    self.paused_until = max(self.paused_until, now + float(retry_after))
+                except (TypeError, ValueError):
+                    pass
+
+    def _refill(self, now):
+        """Add slots earned since the last refill"""
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+# Shared by every scan in the process, so concurrent scans and regions stay within one API rate
+search_rate_limiter = AdaptiveRateLimiter()
@@ -0,0 +1,85 @@
+import sys
+from operator import attrgetter
+import pandas as pd
+
+RECORD_FIELDS = ('title', 'url', 'canonical_url', 'snippet', 'query', 'page', 'rank', 'date', 'regions',
+                 'content_type', 'confidence', 'confidence_level')
+
+# Only present in a batch's frame when at least one record has a value
+OPTIONAL_FIELDS = ('regions',)
+
+
+class ResultRecord:
+    """One search result, stored in slots instead of a per-row dict"""
+
+    __slots__ = RECORD_FIELDS
+
+    def __init__(self, title, url, canonical_url, snippet, query, page, rank, date, regions=None):
+        self.title = title
+        self.url = url
+        self.canonical_url = canonical_url
+        self.snippet = snippet
+        self.query = query
+        self.page = page
+        self.rank = rank
+        self.date = date
+        self.regions = regions
+        self.content_type = None
+        self.confidence = None
+        self.confidence_level = None
+
+    # Mapping-style access, so code written against result dicts keeps working
+
+    def __getitem__(self, key):
+        if key not in RECORD_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in RECORD_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in RECORD_FIELDS and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in RECORD_FIELDS else None
+        return default if value is None else value
+
+    def to_dict(self):
+        """Plain dict of the fields that are set"""
+        return {field: getattr(self, field) for field in RECORD_FIELDS
+                if field not in OPTIONAL_FIELDS or getattr(self, field) is not None}
+
+    def __repr__(self):
+        return f"ResultRecord({self.to_dict()!r})"
+
+
+class ResultBatch(list):
+    """List of ResultRecords that converts to a DataFrame one column at a time"""
+
+    def to_frame(self, columns=None):
+        """
+        Build a DataFrame without creating a dict per row
+
+        Args:
+            columns: Fields to include (default: every field, optional fields only when set)
+
+        Returns:
+            DataFrame with one row per record
+        """
+        if columns is None:
+            columns = [field for field in RECORD_FIELDS
+                       if field not in OPTIONAL_FIELDS or any(getattr(r, field) is not None for r in self)]
+        return pd.DataFrame({column: list(map(attrgetter(column), self)) for column in columns},
+                            columns=list(columns))
+
+    def to_records(self):
+        """Plain dicts, e.g. for JSON responses"""
+        return [record.to_dict() for record in self]
+
+
+def intern_value(value):
+    """Share one string object between every record carrying the same query or date"""
+    return sys.intern(value) if isinstance(value, str) else value
@@ -0,0 +1,166 @@
+import os
+import time
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from profiling import profiler, submit
+
+
+class StageGraph:
+    def __init__(self, max_workers=4):
+        """
+        Run pipeline stages concurrently, each as soon as its dependencies finish
+
+        Args:
+            max_workers: Maximum number of stages running at the same time
+        """
+        self.max_workers = max_workers
+        self.stages = {}
+
+    def add_stage(self, name, func, depends_on=(), on_complete=None):
+        """
+        Register a stage
+
+        Args:
+            name: Unique stage name
+            func: Callable receiving the results of its dependencies as keyword arguments
+            depends_on: Names of stages that must finish first
+            on_complete: Optional callback receiving the stage result as soon as it finishes
+        """
+        for dependency in depends_on:
+            if dependency not in self.stages:
+                raise ValueError(f"Unknown dependency '{dependency}' for stage '{name}'")
+        self.stages[name] = (func, tuple(depends_on), on_complete)
+
+    def run(self):
+        """
+        Execute every stage
+
+        Returns:
+            Tuple of (results by stage name, wall-clock seconds by stage name). If a stage fails,
+            stages depending on it are skipped, the others still run, and the first error is raised.
+        """
+        results = {}
+        timings = {}
+        errors = {}
+        pending = dict(self.stages)
+        running = {}
+
+        def timed(name, func, kwargs):
+            start = time.perf_counter()
+            try:
+                with profiler.span(name):
+                    return func(**kwargs)
+            finally:
+                timings[name] = time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for name, (func, depends_on, on_complete) in list(pending.items()):
+                    if any(d in errors for d in depends_on):
+                        errors[name] = None  # Skipped because a dependency failed
+                        del pending[name]
+                    elif all(d in results for d in depends_on):
+                        kwargs = {d: results[d] for d in depends_on}
+                        running[submit(executor, timed, name, func, kwargs)] = name
+                        del pending[name]
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        errors[name] = e
+                        continue
+
+                    on_complete = self.stages[name][2]
+                    if on_complete is not None:
+                        on_complete(results[name])
+
+        for name in self.stages:
+            if errors.get(name) is not None:
+                raise errors[name]
+
+        return results, timings
+
+
+class ScanPipeline:
+    def __init__(self, keyword_learner, knowledge_manager, save_temp_results=False):
+        """
+        Post-scan pipeline passing scan results in memory to learning and merging
+
+        Args:
+            keyword_learner: KeywordLearner that learns from the results
+            knowledge_manager: KnowledgeManager that merges results into master content
+            save_temp_results: Also write the results to temp_results/ as an audit copy
+        """
+        self.keyword_learner = keyword_learner
+        self.knowledge_manager = knowledge_manager
+        self.save_temp_results = save_temp_results
+
+    def to_frame(self, results):
+        """Build the columnar batch shared by every stage"""
+        if isinstance(results, pd.DataFrame):
+            return results
+        if hasattr(results, 'to_frame'):
+            return results.to_frame()
+        return pd.DataFrame(results)
+
+    def process(self, results, creator_name, on_results_ready=None):
+        """
+        Learn from and merge scan results
+
+        Learning runs concurrently with the merge; stats only wait for the merge.
+
+        Args:
+            results: ResultBatch from LeakScraper.run_scan, a list of result dicts, or a DataFrame
+            creator_name: Creator the results belong to
+            on_results_ready: Optional callback receiving the content stats as soon as the
+                merge has committed, without waiting for keyword learning
+
+        Returns:
+            Dict with updated_keywords, new_count, stats, the audit file (if written) and
+            per-stage timings in seconds
+        """
+        df = self.to_frame(results)
+
+        audit_file = self.write_audit_file(df, creator_name) if self.save_temp_results else None
+
+        graph = StageGraph()
+
+        # Learn from results
+        graph.add_stage('learn', lambda: self.keyword_learner.learn_from_results(df, creator_name))
+
+        # Update master content repository
+        graph.add_stage('merge', lambda: self.knowledge_manager.update_master_content(df, creator_name))
+
+        # Get content stats once the merge has committed
+        graph.add_stage('stats', lambda merge: self.knowledge_manager.get_content_stats(creator_name),
+                        depends_on=['merge'], on_complete=on_results_ready)
+
+        print("\n🧠 Learning from search results and 📚 updating master content repository...")
+        stage_results, timings = graph.run()
+
+        print("⏱️ Post-scan stages: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+
+        return {
+            'updated_keywords': stage_results['learn'],
+            'new_count': stage_results['merge'],
+            'stats': stage_results['stats'],
+            'audit_file': audit_file,
+            'timings': timings
+        }
+
+    def write_audit_file(self, df, creator_name):
+        """Write results to temp_results/ as an audit copy"""
+        temp_dir = os.path.join(os.getcwd(), "temp_results")
+        os.makedirs(temp_dir, exist_ok=True)
+        temp_file = os.path.join(temp_dir,
+                                 f"{creator_name.replace(' ', '_')}_temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        df.to_csv(temp_file, index=False)
+        print(f"✅ Saved temp results to {temp_file}")
+        return temp_file
@@ -0,0 +1,69 @@
+import os
+import threading
+from datetime import datetime
+from serialization import load_file, dump_file
+
+
+class ScanStateStore:
+    def __init__(self, creator_name, base_dir=None):
+        """
+        Persist the last successful scan time per keyword and the new-URL yield per region of a creator
+
+        Args:
+            creator_name: Creator whose scan state is stored
+            base_dir: Directory of the state file (defaults to leak_detection_results/)
+        """
+        self.base_dir = base_dir or os.path.join(os.getcwd(), "leak_detection_results")
+        os.makedirs(self.base_dir, exist_ok=True)
+        self.state_file = os.path.join(self.base_dir, f"{creator_name.replace(' ', '_')}_scan_state.json")
+        self._lock = threading.Lock()
+        self._state = self._load()
+
+    def _load(self):
+        """Load the state file, starting empty if it is missing or unreadable"""
+        state = {'keywords': {}, 'regions': {}}
+        if not os.path.exists(self.state_file):
+            return state
+        try:
+            stored = load_file(self.state_file)
+        except Exception as e:
+            print(f"ℹ️ Could not read scan state: {e}")
+            return state
+
+        for key in state:
+            state[key].update(stored.get(key, {}))
+        return state
+
+    def last_scan(self, keyword):
+        """Datetime of the last successful scan of a keyword, or None"""
+        entry = self._state['keywords'].get(keyword.lower().strip())
+        if not entry:
+            return None
+        return datetime.fromisoformat(entry['last_success'])
+
+    def record_success(self, keywords, scanned_at):
+        """Record that keywords were fully scanned up to scanned_at"""
+        with self._lock:
+            for keyword in keywords:
+                self._state['keywords'][keyword.lower().strip()] = {
+                    'last_success': scanned_at.isoformat(timespec='seconds')
+                }
+            self._save()
+
+    def region_yield(self, region):
+        """Total (API calls, new URLs) observed for a region in previous scans"""
+        entry = self._state['regions'].get(region, {})
+        return entry.get('calls', 0), entry.get('new_urls', 0)
+
+    def record_region_yields(self, yields):
+        """Add a scan's {region: (calls, new URLs)} to the stored totals"""
+        with self._lock:
+            for region, (calls, new_urls) in yields.items():
+                entry = self._state['regions'].setdefault(region, {'calls': 0, 'new_urls': 0})
+                entry['calls'] += calls
+                entry['new_urls'] += new_urls
+            self._save()
+
+    def _save(self):
+        """Write the state file atomically; caller holds the lock"""
+        dump_file(self._state, self.state_file)
@@ -0,0 +1,180 @@
+import os
+import uuid
+import socket
+import argparse
+import threading
+import multiprocessing
+from leak_scraper import LeakScraper
+from work_queue import ScanWorkQueue
+
+
+class ScanWorker:
+    def __init__(self, queue, api_key, search_engine_id, worker_id=None, lease_seconds=120):
+        """
+        Worker that claims scan units from a ScanWorkQueue and commits their results
+
+        Args:
+            queue: Shared ScanWorkQueue
+            api_key: Google Custom Search API key
+            search_engine_id: Google Custom Search Engine ID
+            worker_id: Unique worker name (defaults to host, pid and a random suffix)
+            lease_seconds: Lease length; heartbeats renew it every third of this
+        """
+        self.queue = queue
+        self.api_key = api_key
+        self.search_engine_id = search_engine_id
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+
+    def run(self, max_units=None):
+        """Process units until the queue is empty (or max_units were processed)"""
+        processed = 0
+        while max_units is None or processed < max_units:
+            unit = self.queue.claim(self.worker_id, self.lease_seconds)
+            if unit is None:
+                break
+            processed += 1
+            if not self.process_unit(unit):
+                print(f"❌ Worker {self.worker_id} stopping: API quota exceeded")
+                break
+
+        print(f"✅ Worker {self.worker_id} processed {processed} units")
+        return processed
+
+    def process_unit(self, unit):
+        """
+        Scan one unit while heartbeating its lease
+
+        A unit with failed pages keeps the rows it found and goes back to the queue.
+
+        Returns:
+            False when the API quota is exhausted and the worker should stop, otherwise True
+        """
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(unit['id'], stop), daemon=True)
+        heartbeat.start()
+
+        try:
+            scraper = LeakScraper(
+                creator_name=unit['creator'],
+                api_key=self.api_key,
+                search_engine_id=self.search_engine_id,
+                max_searches=unit['end_page'] - unit['start_page'] + 1
+            )
+            # The queue's results table is the dedupe authority across workers
+            scraper.unique_urls = set()
+
+            rows = scraper.search_batch([unit['keyword']], unit['date_restrict'],
+                                        max_pages=unit['end_page'], start_page=unit['start_page'])
+
+            error = None
+            if scraper.quota_exceeded:
+                error = "API quota exceeded"
+            elif not scraper.last_batch_complete:
+                error = "Some pages failed"
+
+            added = self.queue.complete(unit['id'], self.worker_id, unit['creator'], rows,
+                                        api_calls=scraper.api_calls, error=error)
+            label = (f"Unit {unit['id']} ({unit['creator']} / {unit['keyword']} pages "
+                     f"{unit['start_page']}-{unit['end_page']}): {added} new URLs")
+            if error:
+                print(f"⚠️ {label}, requeued: {error}")
+            else:
+                print(f"✅ {label}")
+            return not scraper.quota_exceeded
+        except Exception as e:
+            print(f"❌ Unit {unit['id']} failed: {e}")
+            self.queue.release(unit['id'], self.worker_id, str(e))
+            return True
+        finally:
+            stop.set()
+            heartbeat.join()
+
+    def _heartbeat(self, unit_id, stop):
+        """Renew the lease until the unit finishes"""
+        while not stop.wait(self.lease_seconds / 3):
+            if not self.queue.heartbeat(unit_id, self.worker_id, self.lease_seconds):
+                print(f"⚠️ Worker {self.worker_id} lost its lease on unit {unit_id}")
+                return
+
+
+def export_results(queue, creator_name):
+    """Merge a creator's committed results into master content"""
+    from knowledge_manager import KnowledgeManager
+
+    rows = queue.pending_results(creator_name)
+    if not rows:
+        print("ℹ️ No new results to export")
+        return 0
+
+    added = KnowledgeManager().upsert_rows(rows, creator_name)
+    queue.mark_exported(creator_name, [r['canonical_url'] for r in rows])
+    print(f"✅ Exported {len(rows)} results, {added} new to master content")
+    return added
+
+
+def _run_worker_process(db_path, lease_seconds):
+    """Entry point of a local worker process"""
+    worker = ScanWorker(ScanWorkQueue(db_path), os.environ.get('GOOGLE_API_KEY', ''),
+                        os.environ.get('SEARCH_ENGINE_ID', ''), lease_seconds=lease_seconds)
+    worker.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distributed scan workers over a shared SQLite queue')
+    parser.add_argument('--db', type=str, help='Queue database path (default: work_queue/scan_queue.db)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = subparsers.add_parser('enqueue', help='Split a scan into work units')
+    enqueue.add_argument('--creator', type=str, required=True, help='Creator name to search for')
+    enqueue.add_argument('--keywords', type=str, required=True, help='Comma-separated keywords')
+    enqueue.add_argument('--timeframe', type=str, default='last 30 days', help='Timeframe (today, last X days/weeks/months)')
+    enqueue.add_argument('--pages', type=int, default=10, help='Pages per keyword')
+    enqueue.add_argument('--pages-per-unit', type=int, default=2, help='Pages in one work unit')
+
+    work = subparsers.add_parser('work', help='Run a worker until the queue is empty')
+    work.add_argument('--lease', type=int, default=120, help='Lease length in seconds')
+    work.add_argument('--max-units', type=int, help='Stop after this many units')
+
+    local = subparsers.add_parser('local', help='Run several worker processes on this host')
+    local.add_argument('--processes', type=int, default=4, help='Number of worker processes')
+    local.add_argument('--lease', type=int, default=120, help='Lease length in seconds')
+
+    export = subparsers.add_parser('export', help='Merge committed results into master content')
+    export.add_argument('--creator', type=str, required=True, help='Creator name to export')
+
+    subparsers.add_parser('status', help='Show unit counts per status')
+
+    args = parser.parse_args()
+    queue = ScanWorkQueue(args.db)
+
+    if args.command == 'enqueue':
+        date_restrict = LeakScraper.get_date_restrict(args.timeframe)
+        keywords = [k.strip() for k in args.keywords.split(',') if k.strip()]
+        keywords = [kw if args.creator.lower() in kw.lower() else f"{args.creator} {kw}" for kw in keywords]
+        added = queue.enqueue_scan(args.creator, keywords, date_restrict, args.pages, args.pages_per_unit)
+        print(f"✅ Queued {added} work units for {args.creator}")
+
+    elif args.command == 'work':
+        worker = ScanWorker(queue, os.environ.get('GOOGLE_API_KEY', ''),
+                            os.environ.get('SEARCH_ENGINE_ID', ''), lease_seconds=args.lease)
+        worker.run(args.max_units)
+
+    elif args.command == 'local':
+        processes = [multiprocessing.Process(target=_run_worker_process, args=(queue.db_path, args.lease))
+                     for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        print(f"📊 Queue status: {queue.counts()}")
+
+    elif args.command == 'export':
+        export_results(queue, args.creator)
+
+    elif args.command == 'status':
+        print(f"📊 Queue status: {queue.counts()}")
+
+
+if __name__ == "__main__":
+    main()
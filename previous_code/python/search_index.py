@@ -0,0 +1,281 @@
+import os
+import re
+import json
+import glob
+import base64
+import sqlite3
+import argparse
+from contextlib import contextmanager
+from data_access import iter_table
+
+# Relative weight of title and snippet matches in BM25 scores
+TITLE_WEIGHT = 2.0
+SNIPPET_WEIGHT = 1.0
+
+
+def encode_cursor(values):
+    """Opaque pagination cursor for the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """(score, id) encoded in a pagination cursor; raises ValueError for anything else"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+    # Well-formed JSON of the wrong shape must not reach the query as a TypeError
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("Invalid cursor")
+    score, last_id = values
+    if (score is not None and not isinstance(score, (int, float))) or isinstance(score, bool) \
+            or not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def match_expression(query):
+    """
+    FTS5 expression for a free-text query
+
+    Every word must match; "quoted phrases" must match as phrases. User input never reaches
+    FTS5 syntax unquoted.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\w+)', query):
+        words = re.findall(r'\w+', phrase) if phrase else [word]
+        if words:
+            terms.append('"' + ' '.join(words) + '"')
+    return ' '.join(terms)
+
+
+class ContentSearchIndex:
+    def __init__(self, db_path=None):
+        """
+        Inverted index over the master content of every creator
+
+        Titles and snippets are indexed with SQLite FTS5 (Porter-stemmed terms, BM25 ranking),
+        and a (domain, creator) index serves as the domain-to-URL posting list. Rows are added
+        incrementally as master content is merged, so queries never read the per-creator CSVs.
+
+        Args:
+            db_path: SQLite database file (default: master_data/search_index.db)
+        """
+        self.db_path = db_path or os.path.join(os.getcwd(), "master_data", "search_index.db")
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    creator TEXT NOT NULL,
+                    canonical_url TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    domain TEXT,
+                    title TEXT,
+                    snippet TEXT,
+                    content_type TEXT,
+                    confidence REAL,
+                    discovered_date TEXT,
+                    UNIQUE (creator, canonical_url)
+                );
+                CREATE INDEX IF NOT EXISTS idx_documents_domain ON documents (domain, creator, id);
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                    title, snippet, content='documents', content_rowid='id', tokenize='porter unicode61'
+                );
+            """)
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection for one transaction; connections are never shared across threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def add_rows(self, creator_name, rows):
+        """
+        Index master content rows of a creator; rows already indexed are skipped
+
+        Args:
+            creator_name: Creator the rows belong to
+            rows: DataFrame with url, canonical_url and optionally domain, title, snippet,
+                content_type, confidence and discovered_date columns
+
+        Returns:
+            Number of rows added
+        """
+        if rows.empty:
+            return 0
+
+        columns = ['canonical_url', 'url', 'domain', 'title', 'snippet', 'content_type', 'confidence',
+                   'discovered_date']
+        frame = rows.reindex(columns=columns)
+        frame['canonical_url'] = frame['canonical_url'].fillna(frame['url'])
+        frame = frame.astype(object).where(frame.notna(), None)
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM documents").fetchone()[0]
+                conn.executemany("""
+                    INSERT OR IGNORE INTO documents (creator, canonical_url, url, domain, title, snippet,
+                                                     content_type, confidence, discovered_date)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(creator_name,) + tuple(row) for row in frame.itertuples(index=False)])
+
+                # New documents got ids above the previous maximum; index only those
+                cursor = conn.execute("""
+                    INSERT INTO documents_fts (rowid, title, snippet)
+                    SELECT id, COALESCE(title, ''), COALESCE(snippet, '') FROM documents WHERE id > ?
+                """, (last_id,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        return cursor.rowcount
+
+    def search(self, query=None, creator_name=None, domain=None, limit=20, cursor=None):
+        """
+        BM25-ranked full-text search, or the domain posting list when no query is given
+
+        Args:
+            query: Free-text query over titles and snippets; words are ANDed, "quoted" phrases kept
+            creator_name: Only return rows of this creator
+            domain: Only return rows on this registrable domain
+            limit: Page size
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            Dict with 'results' (rows, best first) and 'next_cursor' (None on the last page)
+        """
+        limit = max(1, min(int(limit), 500))
+        filters, params = [], []
+        if creator_name:
+            filters.append("d.creator = ?")
+            params.append(creator_name)
+        if domain:
+            filters.append("d.domain = ?")
+            params.append(domain)
+
+        expression = match_expression(query) if query else ''
+        if query and not expression:
+            return {'results': [], 'next_cursor': None}
+
+        if expression:
+            # Keyset pagination on (score, id): BM25 scores are negative, lower is better
+            sql = f"""
+                SELECT * FROM (
+                    SELECT d.id, d.creator, d.url, d.domain, d.title, d.snippet, d.content_type, d.confidence,
+                           d.discovered_date, bm25(documents_fts, {TITLE_WEIGHT}, {SNIPPET_WEIGHT}) AS score
+                    FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+                    WHERE documents_fts MATCH ? {''.join(' AND ' + f for f in filters)}
+                )
+            """
+            params = [expression] + params
+            if cursor:
+                last_score, last_id = decode_cursor(cursor)
+                sql += " WHERE score > ? OR (score = ? AND id > ?)"
+                params += [last_score, last_score, last_id]
+            sql += " ORDER BY score, id LIMIT ?"
+        else:
+            # Posting list order: oldest indexed first
+            sql = """
+                SELECT d.id, d.creator, d.url, d.domain, d.title, d.snippet, d.content_type, d.confidence,
+                       d.discovered_date, NULL AS score
+                FROM documents d
+            """
+            if cursor:
+                filters.append("d.id > ?")
+                params.append(decode_cursor(cursor)[1])
+            if filters:
+                sql += " WHERE " + " AND ".join(filters)
+            sql += " ORDER BY d.id LIMIT ?"
+        params.append(limit + 1)
+
+        with self._connect() as conn:
+            rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1]['score'], rows[-1]['id']])
+
+        return {'results': rows, 'next_cursor': next_cursor}
+
+    def domain_creators(self, domain):
+        """Creators with content on a domain and their URL counts"""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT creator, COUNT(*) AS urls FROM documents WHERE domain = ?
+                GROUP BY creator ORDER BY urls DESC
+            """, (domain,)).fetchall()
+        return {r['creator']: r['urls'] for r in rows}
+
+    def optimize(self):
+        """Merge the FTS index segments, e.g. after a large rebuild"""
+        with self._connect() as conn:
+            conn.execute("INSERT INTO documents_fts (documents_fts) VALUES ('optimize')")
+
+
+def index_master_files(index, master_dir=None, chunksize=50000):
+    """Index every creator's master content file (rows already indexed are skipped)"""
+    from knowledge_manager import canonical_keys
+    from domain_extractor import domains_for
+
+    master_dir = master_dir or os.path.join(os.getcwd(), "master_data")
+    total = 0
+    for master_file in sorted(glob.glob(os.path.join(master_dir, "*_master.csv"))):
+        creator_name = os.path.basename(master_file)[:-len("_master.csv")].replace('_', ' ')
+        added = 0
+        columns = ('url', 'canonical_url', 'domain', 'title', 'snippet', 'content_type', 'confidence',
+                   'discovered_date')
+        for chunk in iter_table(master_file, columns, categorical=False, dtype=str, chunksize=chunksize):
+            chunk['canonical_url'] = canonical_keys(chunk)
+            if 'domain' not in chunk.columns or chunk['domain'].isna().any():
+                chunk['domain'] = domains_for(chunk['url'])
+            added += index.add_rows(creator_name, chunk)
+        print(f"✅ Indexed {added} rows of {creator_name}")
+        total += added
+
+    index.optimize()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full-text search over every creator\'s master content')
+    parser.add_argument('--db', type=str, help='Index database path (default: master_data/search_index.db)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('rebuild', help='Index every master content file')
+
+    search = subparsers.add_parser('search', help='Search the index')
+    search.add_argument('query', type=str, nargs='?', help='Free-text query')
+    search.add_argument('--creator', type=str, help='Only this creator')
+    search.add_argument('--domain', type=str, help='Only this domain')
+    search.add_argument('--limit', type=int, default=20, help='Results per page')
+
+    args = parser.parse_args()
+    index = ContentSearchIndex(args.db)
+
+    if args.command == 'rebuild':
+        print(f"✅ Indexed {index_master_files(index)} rows")
+
+    elif args.command == 'search':
+        page = index.search(args.query, args.creator, args.domain, args.limit)
+        for i, row in enumerate(page['results'], 1):
+            print(f"   {i}. [{row['creator']}] {row['title']} - {row['url']}")
+        if not page['results']:
+            print("ℹ️ No matches")
+
+
+if __name__ == "__main__":
+    main()
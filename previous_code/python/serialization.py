@@ -0,0 +1,110 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+try:
+    import orjson
+except ImportError:  # Falls back to the stdlib encoder
+    orjson = None
+
+# Name of the encoder in use, reported by the benchmark
+ENCODER = 'orjson' if orjson is not None else 'json'
+
+
+def _default(obj):
+    """Encode values neither encoder handles natively: records, sets, numpy and pandas scalars"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, 'item'):
+        return obj.item()  # numpy scalar
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj, indent=False):
+    """
+    Serialize to UTF-8 JSON bytes with the fastest available encoder
+
+    Args:
+        obj: Value to serialize
+        indent: Indent nested values by two spaces (default: compact)
+
+    Returns:
+        bytes
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    if indent:
+        return json.dumps(obj, default=_default, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(path):
+    """Parse a JSON file"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def dump_file(obj, path, indent=False):
+    """
+    Write a JSON file atomically, so readers never see a partial file
+
+    Returns:
+        Number of bytes written
+    """
+    data = dumps(obj, indent)
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, path)
+    return len(data)
+
+
+class SerializedCache:
+    def __init__(self, max_entries=256):
+        """
+        Serialized bytes of objects that no longer change, so they are encoded once
+
+        Args:
+            max_entries: Entries kept before the least recently used are dropped
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, obj):
+        """Serialized bytes of obj, encoding and caching them under key on first use"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+
+        # Encoded outside the lock; two threads racing here produce the same bytes
+        data = dumps(obj)
+        with self._lock:
+            self._entries[key] = data
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data
+
+    def discard(self, key):
+        """Drop a cached entry"""
+        with self._lock:
+            self._entries.pop(key, None)
@@ -0,0 +1,101 @@
+import re
+import urllib.parse
+from functools import lru_cache
+
+# Click IDs and campaign tags that only track the visitor and never change the page, on any site
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'twclid', 'ttclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok'
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'hsa_')
+
+# Generic names like "si" or "feature" identify content on some sites, so they are only dropped
+# on hosts where they are known to be share tracking (matched with subdomains)
+HOST_TRACKING_PARAMS = {
+    'youtube.com': {'feature', 'si', 'pp'},
+    'youtu.be': {'feature', 'si'},
+    'twitter.com': {'s', 't', 'ref_src', 'ref_url'},
+    'x.com': {'s', 't', 'ref_src', 'ref_url'},
+    'instagram.com': {'igsh'},
+    'reddit.com': {'share_id', 'ref', 'ref_source'},
+    'spotify.com': {'si'},
+    'tiktok.com': {'is_from_webapp', 'sender_device', '_r', '_t'},
+    'aliexpress.com': {'spm'},
+}
+
+# Host prefixes of mobile and AMP mirrors of the same site
+MIRROR_HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+
+# AMP caches that wrap the original URL: google.com/amp/s/<url> and <site>.cdn.ampproject.org/c/s/<url>
+AMP_CACHE_PATH = re.compile(r'^/(?:amp|c)/(s/)?(.+)$')
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+@lru_cache(maxsize=131072)
+def canonical_url(url):
+    """
+    Canonical form of a URL used as its identity by every dedupe path
+
+    Drops the scheme, userinfo, default ports, fragments, tracking parameters and trailing
+    slashes; strips www./mobile/AMP host prefixes and /amp path suffixes; unwraps AMP cache
+    URLs; and sorts the remaining query parameters.
+
+    Args:
+        url: URL as returned by the search API
+
+    Returns:
+        Canonical key like "example.com/path?a=1"; the lowercased input if it cannot be parsed
+    """
+    if not isinstance(url, str) or not url.strip():
+        return ''
+
+    text = url.strip()
+    if '://' not in text:
+        text = 'http://' + text
+
+    try:
+        parts = urllib.parse.urlsplit(text)
+        port = parts.port
+    except ValueError:
+        return url.strip().lower()
+
+    host = (parts.hostname or '').rstrip('.')
+    path = parts.path
+
+    # Unwrap AMP cache URLs to the page they serve
+    if host.endswith('cdn.ampproject.org') or (host.startswith(('www.google.', 'google.')) and path.startswith('/amp/')):
+        match = AMP_CACHE_PATH.match(path)
+        if match:
+            inner = match.group(2) + (f"?{parts.query}" if parts.query else '')
+            return canonical_url(inner)
+
+    for prefix in MIRROR_HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+
+    path = re.sub(r'/{2,}', '/', path)
+    path = re.sub(r'(?:/amp|\.amp)(?=/?$)', '', path, flags=re.IGNORECASE)
+    path = path.rstrip('/')
+
+    host_params = _host_tracking_params(host)
+    params = [(key, value) for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+              if key.lower() not in TRACKING_PARAMS and key.lower() not in host_params
+              and not key.lower().startswith(TRACKING_PREFIXES)]
+    query = urllib.parse.urlencode(sorted(params))
+
+    return host + path + (f"?{query}" if query else '')
+
+
+def _host_tracking_params(host):
+    """Site-specific tracking parameters of a host or any of its parent domains"""
+    labels = host.split(':')[0].split('.')
+    for i in range(len(labels) - 1):
+        params = HOST_TRACKING_PARAMS.get('.'.join(labels[i:]))
+        if params is not None:
+            return params
+    return ()
@@ -0,0 +1,279 @@
+import os
+import time
+import sqlite3
+from contextlib import contextmanager
+from url_canonicalizer import canonical_url
+
+
+class ScanWorkQueue:
+    def __init__(self, db_path=None, max_attempts=5):
+        """
+        Shared SQLite queue of scan work units with lease-based claiming
+
+        A unit is one (creator, keyword, date window, page range). Workers claim a unit with a
+        time-limited lease, renew it with heartbeats while they work, and complete it by committing
+        its result rows. Units whose lease expires (the worker died) are handed to the next claimer.
+
+        Args:
+            db_path: SQLite database file, shared by every worker process
+            max_attempts: Claims after which a unit that keeps failing is marked as failed
+        """
+        self.db_path = db_path or os.path.join(os.getcwd(), "work_queue", "scan_queue.db")
+        self.max_attempts = max_attempts
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS units (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    creator TEXT NOT NULL,
+                    keyword TEXT NOT NULL,
+                    date_restrict TEXT NOT NULL,
+                    start_page INTEGER NOT NULL,
+                    end_page INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    api_calls INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    updated REAL,
+                    UNIQUE (creator, keyword, date_restrict, start_page, end_page)
+                );
+                CREATE INDEX IF NOT EXISTS idx_units_status ON units (status, lease_expires);
+                CREATE TABLE IF NOT EXISTS results (
+                    creator TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    title TEXT,
+                    snippet TEXT,
+                    query TEXT,
+                    page INTEGER,
+                    date TEXT,
+                    unit_id INTEGER,
+                    exported INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (creator, url)
+                );
+                CREATE TABLE IF NOT EXISTS workers (
+                    worker_id TEXT PRIMARY KEY,
+                    busy INTEGER NOT NULL DEFAULT 0,
+                    last_seen REAL NOT NULL
+                );
+            """)
+
+            # Queues created before canonicalization lack the canonical_url column
+            columns = [row['name'] for row in conn.execute("PRAGMA table_info(results)")]
+            if 'canonical_url' not in columns:
+                conn.execute("ALTER TABLE results ADD COLUMN canonical_url TEXT")
+            self._backfill_canonical_urls(conn)
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_results_canonical ON results (creator, canonical_url)")
+
+    def _backfill_canonical_urls(self, conn):
+        """Key legacy result rows by canonical URL; rows that turn out to be variants of a stored URL are dropped"""
+        legacy = conn.execute("SELECT rowid, creator, url FROM results WHERE canonical_url IS NULL").fetchall()
+        if not legacy:
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            taken = {(r['creator'], r['canonical_url']) for r in
+                     conn.execute("SELECT creator, canonical_url FROM results WHERE canonical_url IS NOT NULL")}
+            updates, duplicates = [], []
+            for row in legacy:
+                key = (row['creator'], canonical_url(row['url']))
+                if key in taken:
+                    duplicates.append((row['rowid'],))
+                else:
+                    taken.add(key)
+                    updates.append((key[1], row['rowid']))
+
+            conn.executemany("UPDATE results SET canonical_url = ? WHERE rowid = ?", updates)
+            conn.executemany("DELETE FROM results WHERE rowid = ?", duplicates)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        print(f"ℹ️ Backfilled canonical URLs of {len(updates)} queue results, dropped {len(duplicates)} duplicates")
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection for one transaction; connections are never shared across threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue_scan(self, creator_name, keywords, date_restrict, max_pages=10, pages_per_unit=2):
+        """
+        Split a scan into work units and add the ones not queued yet
+
+        Returns:
+            Number of units added
+        """
+        units = []
+        for keyword in keywords:
+            for start_page in range(1, max_pages + 1, pages_per_unit):
+                end_page = min(start_page + pages_per_unit - 1, max_pages)
+                units.append((creator_name, keyword, date_restrict or "", start_page, end_page, time.time()))
+
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany("""
+                INSERT OR IGNORE INTO units (creator, keyword, date_restrict, start_page, end_page, updated)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, units)
+            return conn.total_changes - before
+
+    def claim(self, worker_id, lease_seconds=120):
+        """
+        Lease the next available unit
+
+        Returns:
+            Dict describing the unit, or None when nothing is claimable
+        """
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Units that exhausted their attempts stop being retried
+                conn.execute("""
+                    UPDATE units SET status = 'failed', lease_owner = NULL, updated = ?
+                    WHERE attempts >= ? AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?))
+                """, (now, self.max_attempts, now))
+
+                row = conn.execute("""
+                    SELECT * FROM units
+                    WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                    ORDER BY id LIMIT 1
+                """, (now,)).fetchone()
+
+                self._record_worker(conn, worker_id, busy=row is not None, now=now)
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                conn.execute("""
+                    UPDATE units SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                                     attempts = attempts + 1, updated = ?
+                    WHERE id = ?
+                """, (worker_id, now + lease_seconds, now, row['id']))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        unit = dict(row)
+        unit['attempts'] += 1
+        return unit
+
+    def heartbeat(self, unit_id, worker_id, lease_seconds=120):
+        """Extend a lease; returns False if the worker no longer holds it"""
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE units SET lease_expires = ?, updated = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'leased'
+            """, (time.time() + lease_seconds, time.time(), unit_id, worker_id))
+            self._record_worker(conn, worker_id, busy=cursor.rowcount == 1)
+            return cursor.rowcount == 1
+
+    def complete(self, unit_id, worker_id, creator_name, rows, api_calls=0, error=None):
+        """
+        Commit a unit's results and mark it done in one transaction
+
+        Rows are keyed by (creator, url) and (creator, canonical URL), so re-running a unit after a
+        lost lease, or finding a mirror variant of a stored URL, never duplicates results.
+
+        Args:
+            error: Set when some pages of the unit failed; the rows found are kept and the unit
+                goes back to the queue to be retried instead of being marked done
+
+        Returns:
+            Number of result rows that were new
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = conn.total_changes
+                conn.executemany("""
+                    INSERT OR IGNORE INTO results (creator, url, canonical_url, title, snippet, query, page, date, unit_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(creator_name, r['url'], r.get('canonical_url') or canonical_url(r['url']), r.get('title'),
+                       r.get('snippet'), r.get('query'), r.get('page'), r.get('date'), unit_id) for r in rows])
+                added = conn.total_changes - before
+
+                conn.execute("""
+                    UPDATE units SET status = ?, lease_owner = NULL, lease_expires = NULL,
+                                     api_calls = api_calls + ?, last_error = ?, updated = ?
+                    WHERE id = ? AND lease_owner = ?
+                """, ('pending' if error else 'done', api_calls, error, time.time(), unit_id, worker_id))
+                self._record_worker(conn, worker_id, busy=False)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        return added
+
+    def release(self, unit_id, worker_id, error=None):
+        """Give a unit back to the queue after a failure"""
+        with self._connect() as conn:
+            conn.execute("""
+                UPDATE units SET status = 'pending', lease_owner = NULL, lease_expires = NULL,
+                                 last_error = ?, updated = ?
+                WHERE id = ? AND lease_owner = ?
+            """, (error, time.time(), unit_id, worker_id))
+            self._record_worker(conn, worker_id, busy=False)
+
+    def pending_results(self, creator_name):
+        """Result rows of a creator not yet exported to master content"""
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT url, canonical_url, title, snippet, query, page, date FROM results
+                WHERE creator = ? AND exported = 0
+            """, (creator_name,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def mark_exported(self, creator_name, canonical_urls):
+        """Flag result rows as exported to master content, by canonical URL as rows are keyed"""
+        with self._connect() as conn:
+            conn.executemany("UPDATE results SET exported = 1 WHERE creator = ? AND canonical_url = ?",
+                             [(creator_name, key) for key in canonical_urls])
+
+    def _record_worker(self, conn, worker_id, busy, now=None):
+        """Note that a worker is alive and whether it is working on a unit"""
+        conn.execute("""
+            INSERT INTO workers (worker_id, busy, last_seen) VALUES (?, ?, ?)
+            ON CONFLICT (worker_id) DO UPDATE SET busy = excluded.busy, last_seen = excluded.last_seen
+        """, (worker_id, int(busy), now or time.time()))
+
+    def worker_counts(self, live_seconds=300):
+        """
+        Busy and idle workers seen within live_seconds
+
+        Workers are seen when they claim, heartbeat, complete or release, so one working on a
+        unit is seen at least once per heartbeat interval.
+
+        Returns:
+            Dict with 'busy' and 'idle' counts
+        """
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT busy, COUNT(*) AS n FROM workers WHERE last_seen >= ? GROUP BY busy
+            """, (time.time() - live_seconds,)).fetchall()
+        counts = {'busy': 0, 'idle': 0}
+        for row in rows:
+            counts['busy' if row['busy'] else 'idle'] = row['n']
+        return counts
+
+    def counts(self):
+        """Number of units per status"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM units GROUP BY status").fetchall()
+        return {r['status']: r['n'] for r in rows}
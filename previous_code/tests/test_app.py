@@ -0,0 +1,22 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app
+
+
+MATCHES = [
+    {'url': 'https://a.com/1', 'content_type': 'video'},
+    {'url': 'https://b.com/2', 'content_type': 'image'},
+    {'url': 'https://c.com/3', 'content_type': 'text'},
+]
+
+
+def test_filter_content_type_keeps_labelled_type():
+    assert app.filter_content_type(MATCHES, 'video') == MATCHES[:1]
+
+
+def test_filter_content_type_keeps_everything_for_all_and_unknown_types():
+    for content_type in ('all', 'news', 'documents', 'social'):
+        assert app.filter_content_type(MATCHES, content_type) == MATCHES
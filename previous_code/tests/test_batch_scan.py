@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import batch_scan
+from batch_scan import BatchScanner
+from result_records import ResultBatch, ResultRecord
+
+
+class FakeKeywordLearner:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def get_suggested_keywords(self, creator_name):
+        return ['leaks']
+
+    def learn_from_results_batch(self, jobs):
+        self.batches.append([creator_name for _, creator_name in jobs])
+        if self.fail:
+            raise RuntimeError('LLM unavailable')
+        return {}
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Run creator jobs in threads through a stub; maps creator to the API calls it will use"""
+    calls = {}
+    budgets = []
+
+    def fake_job(job, budget, google_api_key, search_engine_id):
+        budgets.append((job['creator'], budget))
+        used = min(budget, calls.get(job['creator'], budget))
+        results = ResultBatch([ResultRecord('t', 'https://a.com/1', 'a.com/1', 's', 'q', 1, 1, '2024-06-01')])
+        return {'creator': job['creator'], 'status': 'completed', 'error': None, 'budget': budget,
+                'api_calls': used, 'new_urls': len(results), 'duration_s': 0}, results
+
+    monkeypatch.setattr(batch_scan, 'run_creator_job', fake_job)
+    monkeypatch.setattr(batch_scan, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    return calls, budgets
+
+
+def entries(*creators, max_searches=50):
+    return [{'creator': creator, 'max_searches': max_searches} for creator in creators]
+
+
+def test_each_creator_gets_a_fair_share_of_the_quota(scans):
+    calls, budgets = scans
+    scanner = BatchScanner('key', 'cx', FakeKeywordLearner(), workers=1, global_quota=30)
+
+    summary = scanner.run(entries('A', 'B', 'C'))
+
+    assert budgets == [('A', 10), ('B', 10), ('C', 10)]
+    assert summary['totals']['api_calls'] == 30
+    assert summary['learning'] == {'status': 'completed', 'error': None}
+
+
+def test_unused_quota_is_handed_back(scans):
+    calls, budgets = scans
+    calls['A'] = 2
+    scanner = BatchScanner('key', 'cx', FakeKeywordLearner(), workers=1, global_quota=30)
+
+    scanner.run(entries('A', 'B', 'C'))
+
+    # A leaves 8 of its 10 calls, which B and C share
+    assert budgets == [('A', 10), ('B', 14), ('C', 14)]
+
+
+def test_creators_are_skipped_once_the_quota_is_exhausted(scans):
+    calls, budgets = scans
+    scanner = BatchScanner('key', 'cx', FakeKeywordLearner(), workers=1, global_quota=2)
+
+    summary = scanner.run(entries('A', 'B', 'C'))
+
+    assert budgets == [('A', 1), ('B', 1)]
+    skipped = [s for s in summary['creators'] if s['status'] == 'skipped']
+    assert [(s['creator'], s['error']) for s in skipped] == [('C', 'Global quota exhausted')]
+    assert summary['totals']['skipped'] == 1
+
+
+def test_duplicate_creators_are_scanned_once(scans):
+    calls, budgets = scans
+    learner = FakeKeywordLearner()
+    scanner = BatchScanner('key', 'cx', learner, workers=2)
+
+    summary = scanner.run(entries('Alice', 'Bob', ' alice ') + [{'creator': 'Bob', 'keywords': ['free']}])
+
+    assert sorted(creator for creator, _ in budgets) == ['Alice', 'Bob']
+    assert sorted(learner.batches[0]) == ['Alice', 'Bob']
+    assert summary['totals']['skipped'] == 2
+    assert summary['totals']['creators'] == 4
+
+
+def test_learning_failure_is_recorded_in_the_summary(scans):
+    scanner = BatchScanner('key', 'cx', FakeKeywordLearner(fail=True), workers=1)
+
+    summary = scanner.run(entries('A', 'B'))
+
+    assert summary['totals']['completed'] == 2
+    assert summary['learning'] == {'status': 'error', 'error': 'LLM unavailable'}
+
+
+def test_manifest_entries_with_unknown_regions_are_skipped(tmp_path):
+    manifest = tmp_path / 'manifest.json'
+    manifest.write_text('{"creators": ["Alice", {"creator": "Bob", "regions": ["us", "uk"]}, '
+                        '{"creator": "Carol", "regions": ["US", "XX"]}, {"keywords": ["x"]}]}')
+
+    jobs = batch_scan.load_manifest(str(manifest))
+
+    assert jobs == [{'creator': 'Alice'}, {'creator': 'Bob', 'regions': ['US', 'UK']}]
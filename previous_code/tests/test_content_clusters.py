@@ -0,0 +1,51 @@
+import random
+
+from content_clusters import SimHashIndex, simhash, simhash_many, content_text, hamming_distance
+
+
+def flip_bits(fingerprint, count, rng):
+    """Fingerprint with count distinct random bits flipped"""
+    for bit in rng.sample(range(64), count):
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def test_index_finds_every_fingerprint_within_max_distance():
+    rng = random.Random(5)
+    index = SimHashIndex(max_distance=4)
+    fingerprints = [rng.getrandbits(64) for _ in range(500)]
+    for i, fingerprint in enumerate(fingerprints):
+        index.add(fingerprint, f"cluster-{i}")
+
+    # Banding guarantees recall: any fingerprint at most max_distance bits away is found
+    for i, fingerprint in enumerate(fingerprints):
+        for distance in range(5):
+            assert index.find(flip_bits(fingerprint, distance, rng)) == f"cluster-{i}"
+
+
+def test_index_rejects_fingerprints_beyond_max_distance():
+    rng = random.Random(6)
+    index = SimHashIndex(max_distance=3)
+    fingerprint = rng.getrandbits(64)
+    index.add(fingerprint, 'a')
+
+    assert index.find(flip_bits(fingerprint, 4, rng)) is None
+    assert index.find(None) is None
+
+
+def test_assign_joins_nearest_cluster_or_starts_one():
+    index = SimHashIndex(max_distance=2)
+    assert index.assign(0b1111) == f"{0b1111:016x}"
+    assert index.assign(0b1110) == f"{0b1111:016x}"
+    assert index.assign(0b1111 << 40, new_cluster_id='other') == 'other'
+    assert len(index) == 3
+
+
+def test_simhash_of_near_duplicates_is_close():
+    first = content_text('Alice leaked photo set 2024 - LeakSite', 'Full gallery of the leaked photos')
+    mirror = content_text('Alice leaked photo set 2024 | Mirror', 'Full gallery of the leaked photos')
+    other = content_text('Cooking pasta at home', 'A simple recipe for tomato sauce')
+
+    assert simhash(first) == simhash(mirror)
+    assert hamming_distance(simhash(first), simhash(other)) > 10
+    assert simhash_many([first, '', other]) == [simhash(first), None, simhash(other)]
@@ -0,0 +1,79 @@
+import os
+
+from creator_cache import CreatorStateCache
+
+
+class CountingLoader:
+    """Loader that reads the file and counts how often it was called"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        with open(path) as f:
+            return f.read()
+
+
+def test_cached_value_is_reused_while_the_file_is_unchanged(tmp_path):
+    path = tmp_path / 'Alice_master.csv'
+    path.write_text('url\na\n')
+    cache, loader = CreatorStateCache(), CountingLoader()
+
+    assert cache.get('seen_urls', 'Alice', str(path), loader) == 'url\na\n'
+    assert cache.get('seen_urls', 'Alice', str(path), loader) == 'url\na\n'
+    assert loader.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_size_change_reloads(tmp_path):
+    path = tmp_path / 'Alice_master.csv'
+    path.write_text('url\na\n')
+    cache, loader = CreatorStateCache(), CountingLoader()
+    cache.get('seen_urls', 'Alice', str(path), loader)
+    stat = os.stat(path)
+
+    # Same mtime, different size
+    path.write_text('url\na\nb\n')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert cache.get('seen_urls', 'Alice', str(path), loader) == 'url\na\nb\n'
+    assert loader.calls == 2
+
+
+def test_mtime_change_reloads(tmp_path):
+    path = tmp_path / 'Alice_master.csv'
+    path.write_text('url\na\n')
+    cache, loader = CreatorStateCache(), CountingLoader()
+    cache.get('seen_urls', 'Alice', str(path), loader)
+    stat = os.stat(path)
+
+    # Same size, newer mtime
+    path.write_text('url\nb\n')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert cache.get('seen_urls', 'Alice', str(path), loader) == 'url\nb\n'
+    assert loader.calls == 2
+
+
+def test_invalidate_and_memory_bound(tmp_path):
+    paths = {}
+    for name in ('Alice', 'Bob'):
+        paths[name] = tmp_path / f"{name}.csv"
+        paths[name].write_text('x' * 1000)
+    cache, loader = CreatorStateCache(), CountingLoader()
+
+    cache.get('stats', 'Alice', str(paths['Alice']), loader)
+    cache.get('urls', 'Alice', str(paths['Alice']), loader)
+    cache.invalidate('Alice', 'stats')
+    cache.get('urls', 'Alice', str(paths['Alice']), loader)
+    assert loader.calls == 2
+    cache.get('stats', 'Alice', str(paths['Alice']), loader)
+    assert loader.calls == 3
+
+    # Only one 1 kB value fits, so the least recently used creator is evicted
+    small = CreatorStateCache(max_bytes=1500)
+    small.get('stats', 'Alice', str(paths['Alice']), loader)
+    small.get('stats', 'Bob', str(paths['Bob']), loader)
+    assert [key[1] for key in small._entries] == ['Bob']
+    assert small.current_bytes <= 1500
@@ -0,0 +1,52 @@
+import pytest
+
+import domain_extractor
+from domain_extractor import domain_of, domains_for, registrable_domain
+
+
+@pytest.fixture
+def fallback(monkeypatch):
+    """Resolve domains with the built-in suffix subset, as without tldextract"""
+    monkeypatch.setattr(domain_extractor, 'tldextract', None)
+    domain_extractor._extractor.cache_clear()
+    registrable_domain.cache_clear()
+    yield
+    domain_extractor._extractor.cache_clear()
+    registrable_domain.cache_clear()
+
+
+HOSTS = {
+    'cdn.example.co.uk': 'example.co.uk',
+    'news.bbc.co.uk': 'bbc.co.uk',
+    'shop.example.com.au': 'example.com.au',
+    'www.example.com': 'example.com',
+    'user.github.io': 'user.github.io',
+    'example.co.jp': 'example.co.jp',
+}
+
+
+def test_registrable_domain_uses_public_suffix_list():
+    registrable_domain.cache_clear()
+    for host, domain in HOSTS.items():
+        assert registrable_domain(host) == domain
+    # Suffixes only the full list knows about
+    assert registrable_domain('a.b.example.kawasaki.jp') == 'b.example.kawasaki.jp'
+    assert registrable_domain('www.example.pvt.k12.ma.us') == 'example.pvt.k12.ma.us'
+
+
+def test_registrable_domain_fallback_handles_common_multi_label_suffixes(fallback, caplog):
+    for host, domain in HOSTS.items():
+        assert registrable_domain(host) == domain
+    # The degradation is logged once
+    assert caplog.text.count('tldextract is not installed') == 1
+
+
+def test_registrable_domain_keeps_ips_and_single_labels():
+    assert registrable_domain('192.168.0.1') == '192.168.0.1'
+    assert registrable_domain('localhost') == 'localhost'
+
+
+def test_domains_for_parses_urls_and_missing_values():
+    urls = ['https://user:pw@Shop.Example.com.au:8443/a?b#c', None, 'http://cdn.example.co.uk./x']
+    assert list(domains_for(urls)) == ['example.com.au', '', 'example.co.uk']
+    assert domain_of('//m.example.co.uk/path') == 'example.co.uk'
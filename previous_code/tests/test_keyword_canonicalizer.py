@@ -0,0 +1,45 @@
+from keyword_canonicalizer import KeywordCanonicalizer
+
+
+def test_dedupe_keeps_first_keyword_of_each_intent():
+    canonicalizer = KeywordCanonicalizer()
+    keywords = ['Alice leaked videos', 'alice video leaks', 'the leaked videos of alice', 'alice onlyfans']
+
+    # Word order, inflections, stopwords and the creator name do not change the intent
+    assert canonicalizer.dedupe(keywords, ignore_terms='Alice') == ['Alice leaked videos', 'alice onlyfans']
+
+
+def test_dedupe_threshold():
+    keywords = ['leaked videos', 'free leaked videos']  # Jaccard 2/3
+
+    assert KeywordCanonicalizer(similarity_threshold=0.75).dedupe(keywords) == keywords
+    assert KeywordCanonicalizer(similarity_threshold=0.6).dedupe(keywords) == ['leaked videos']
+
+
+def test_canonicalize_database_merges_variants_into_most_frequent():
+    keyword_data = {
+        'video leaks': {'occurrence': 2, 'first_seen': '2024-02-01', 'last_seen': '2024-03-01',
+                        'aliases': ['vid leaks']},
+        'leaked videos': {'occurrence': 5, 'first_seen': '2024-01-15', 'last_seen': '2024-02-20'},
+        'leaked video': {'occurrence': 1, 'first_seen': '2024-04-01', 'last_seen': '2024-04-01'},
+        'onlyfans': {'occurrence': 3, 'first_seen': '2024-01-01', 'last_seen': '2024-01-01'},
+    }
+
+    merged = KeywordCanonicalizer().canonicalize_database(keyword_data)
+
+    assert sorted(merged) == ['leaked videos', 'onlyfans']
+    entry = merged['leaked videos']
+    assert entry['occurrence'] == 8
+    assert (entry['first_seen'], entry['last_seen']) == ('2024-01-15', '2024-04-01')
+    # Merged variants and their own aliases are retained, never the canonical keyword itself
+    assert entry['aliases'] == ['leaked video', 'vid leaks', 'video leaks']
+    assert merged['onlyfans']['aliases'] == []
+
+
+def test_canonicalize_database_respects_threshold():
+    keyword_data = {'leaked videos': {'occurrence': 2}, 'free leaked videos': {'occurrence': 1}}
+
+    assert len(KeywordCanonicalizer(similarity_threshold=0.75).canonicalize_database(keyword_data)) == 2
+    merged = KeywordCanonicalizer(similarity_threshold=0.6).canonicalize_database(keyword_data)
+    assert merged == {'leaked videos': {'occurrence': 3, 'first_seen': None, 'last_seen': None,
+                                        'aliases': ['free leaked videos']}}
@@ -0,0 +1,51 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from keyword_learner import KeywordLearner
+
+
+def results(*titles):
+    return pd.DataFrame({'title': list(titles), 'snippet': ['leaked gallery'] * len(titles),
+                         'query': ['q'] * len(titles), 'url': [f"https://a.com/{t}" for t in titles]})
+
+
+@pytest.fixture
+def learner(tmp_path, monkeypatch):
+    """Keyword learner writing to a temp dir, answering prompts without OpenAI"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('NLTK_AUTO_DOWNLOAD', '0')
+    learner = KeywordLearner('key')
+    learner.prompts = {}
+
+    async def generate(prompts, max_concurrency, tokens_per_minute, max_retries):
+        learner.prompts.update(prompts)
+        return {name: "['leaked gallery', 'private photos']" for name in prompts}
+
+    learner._generate_ai_keywords_batch = generate
+    return learner
+
+
+def test_batch_loads_each_result_set_once(learner, capsys):
+    learner.learn_from_results_batch([(results('alpha'), 'Alice'), (results('beta', 'gamma'), 'Bob')])
+
+    output = capsys.readouterr().out
+    assert output.count('Analyzing') == 2
+    assert output.count('Extracted') == 4  # Text elements and candidates, once per creator
+
+
+def test_batch_merges_results_of_the_same_creator(learner):
+    updated = learner.learn_from_results_batch([(results('alpha'), 'Alice'), (results('omega'), 'Alice')])
+
+    assert list(learner.prompts) == ['Alice']
+    assert 'alpha' in learner.prompts['Alice'] and 'omega' in learner.prompts['Alice']
+    assert set(updated) == {'Alice'}
+
+
+def test_batch_rejects_a_running_event_loop(learner):
+    async def call():
+        learner.learn_from_results_batch([(results('alpha'), 'Alice')])
+
+    with pytest.raises(RuntimeError, match='running event loop'):
+        asyncio.run(call())
@@ -0,0 +1,90 @@
+import pytest
+import requests
+
+import leak_scraper
+from leak_scraper import LeakScraper
+from rate_limiter import AdaptiveRateLimiter
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b'{}'
+        self._data = data
+
+    def json(self):
+        if self._data is None:
+            raise ValueError('Expecting value: line 1 column 1 (char 0)')
+        return self._data
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Fake search API answering with queued responses; returns (queue, calls, limiter)"""
+    monkeypatch.chdir(tmp_path)
+    responses, calls = [], []
+
+    def get(url, **kwargs):
+        calls.append(url)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    limiter = AdaptiveRateLimiter(initial_rate=1000, max_rate=1000, burst=1000)
+    monkeypatch.setattr(leak_scraper.http_transport, 'get', get)
+    monkeypatch.setattr(leak_scraper, 'search_rate_limiter', limiter)
+    monkeypatch.setattr(leak_scraper, 'retry_delay', lambda *args, **kwargs: 0)
+    return responses, calls, limiter
+
+
+def fetch():
+    return LeakScraper('Alice', 'key', 'cx')._fetch_page('https://api.example/search?q=x')
+
+
+OK = FakeResponse(200, {'items': []})
+
+
+def test_throttled_page_is_retried_and_slows_the_limiter(api):
+    responses, calls, limiter = api
+    responses += [FakeResponse(429, {'error': {'message': 'Rate limit exceeded'}}, {'Retry-After': '0'}), OK]
+
+    assert fetch() == ('ok', {'items': []})
+    assert len(calls) == 2
+    assert limiter.rate < 1000
+
+
+@pytest.mark.parametrize('failure', [
+    FakeResponse(500, {'error': {'message': 'Backend Error'}}),
+    FakeResponse(503, None),  # HTML error page
+    FakeResponse(429, {'error': {'message': 'Quota exceeded for quota metric per minute'}}),
+    requests.ConnectionError('connection reset'),
+])
+def test_transient_failures_are_retried_until_the_attempt_limit(api, failure):
+    responses, calls, _ = api
+    responses += [failure] * leak_scraper.MAX_PAGE_ATTEMPTS
+
+    assert fetch() == ('error', None)
+    assert len(calls) == leak_scraper.MAX_PAGE_ATTEMPTS
+
+
+@pytest.mark.parametrize('failure', [
+    FakeResponse(400, {'error': {'message': 'Invalid Value'}}),
+    FakeResponse(404, None),
+    FakeResponse(200, None),  # Not JSON, but the request itself succeeded
+])
+def test_client_errors_are_not_retried(api, failure):
+    responses, calls, _ = api
+    responses.append(failure)
+
+    assert fetch() == ('error', None)
+    assert len(calls) == 1
+
+
+def test_daily_quota_stops_without_retrying(api):
+    responses, calls, _ = api
+    responses.append(FakeResponse(429, {'error': {'message': 'Quota exceeded for quota metric per day'}}))
+
+    assert fetch() == ('quota', None)
+    assert len(calls) == 1
@@ -0,0 +1,115 @@
+import time
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from link_status import LinkStatusStore, LIVE, REMOVED, ERROR
+from link_verifier import LinkVerifier
+
+ETAG = '"v1"'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for leak hosts: a live page with an ETag, a removed page and a HEAD-less server"""
+    protocol_version = 'HTTP/1.1'
+    requests_seen = []
+
+    def do_HEAD(self):
+        self.requests_seen.append(('HEAD', self.path, self.headers.get('If-None-Match')))
+        if self.path == '/no-head':
+            self._reply(405)
+        elif self.path == '/gone':
+            self._reply(404)
+        elif self.headers.get('If-None-Match') == ETAG:
+            self._reply(304)
+        else:
+            self._reply(200, {'ETag': ETAG})
+
+    def do_GET(self):
+        self.requests_seen.append(('GET', self.path, None))
+        self._reply(200)
+
+    def _reply(self, code, headers=None):
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    StandInHandler.requests_seen = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def test_verify_against_local_stand_in(tmp_path, server):
+    store = LinkStatusStore(str(tmp_path / 'links.db'))
+    store.register('Alice', [(f"{server}/live", 'live'), (f"{server}/gone", 'gone'),
+                             (f"{server}/no-head", 'no-head'), ('http://bad\x01host/x', 'bad')])
+    verifier = LinkVerifier(store, politeness_delay=0, timeout=5)
+
+    results = {r['canonical_url']: r for r in verifier.verify_due('Alice')}
+    assert results['live']['status'] == LIVE
+    assert results['live']['etag'] == ETAG
+    assert results['gone']['status'] == REMOVED
+    assert results['no-head']['status'] == LIVE
+    assert ('GET', '/no-head', None) in StandInHandler.requests_seen
+
+    # An invalid URL fails only its own check and is still recorded
+    assert results['bad']['status'] == ERROR
+    assert store.summary('Alice') == {LIVE: 2, REMOVED: 1, ERROR: 1}
+
+    # A live link is revalidated with its ETag and the 304 keeps it live
+    results = {r['canonical_url']: r for r in verifier.verify_due('Alice', max_age_days=0)}
+    assert ('HEAD', '/live', ETAG) in StandInHandler.requests_seen
+    assert results['live']['http_status'] == 304
+    assert results['live']['status'] == LIVE
+    assert len(store.history('Alice', 'live')) == 2
+
+
+def test_politeness_delay_does_not_hold_a_global_slot(tmp_path, server):
+    port = server.rsplit(':', 1)[1]
+    store = LinkStatusStore(str(tmp_path / 'links.db'))
+    verifier = LinkVerifier(store, concurrency=1, per_host_limit=2, politeness_delay=1.0, timeout=5)
+    links = [{'creator': 'Alice', 'canonical_url': key, 'url': url} for key, url in (
+        ('a1', f"{server}/live?1"), ('a2', f"{server}/live?2"), ('b', f"http://localhost:{port}/live"))]
+
+    finished = {}
+    check = verifier.check
+
+    async def timed_check(client, link):
+        result = await check(client, link)
+        finished[link['canonical_url']] = time.monotonic()
+        return result
+
+    verifier.check = timed_check
+    started = time.monotonic()
+    asyncio.run(verifier.verify(links))
+
+    # The second request to 127.0.0.1 waits out the delay without blocking the other host
+    assert finished['b'] - started < 0.5
+    assert finished['a2'] - started >= 1.0
+
+
+def test_merged_rows_are_registered_for_verification(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from knowledge_manager import KnowledgeManager
+
+    manager = KnowledgeManager()
+    manager.upsert_rows([
+        {'title': 'Alice set', 'url': 'https://www.example.com/a?utm_source=x', 'snippet': 'leak', 'query': 'q',
+         'page': 1, 'date': '2024-06-01'},
+        {'title': 'Alice clip', 'url': 'https://example.com/b', 'snippet': 'leak', 'query': 'q',
+         'page': 1, 'date': '2024-06-01'},
+    ], 'Alice')
+
+    due = manager.link_status.due('Alice')
+    assert sorted(link['canonical_url'] for link in due) == ['example.com/a', 'example.com/b']
@@ -0,0 +1,105 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rank_diff import diff_snapshots
+
+SORT_COLUMNS = {'new': 'current_rank', 'dropped': 'previous_rank', 'improved': 'delta', 'declined': 'delta'}
+
+
+def _value(value):
+    """Missing values of any kind compare equal to each other, and only to each other"""
+    return None if pd.isna(value) else value
+
+
+def _canonical(url):
+    """The canonical_url test snapshots are built with: host and path, lowercased"""
+    return np.nan if pd.isna(url) else url.split('://', 1)[1].lower()
+
+
+def naive_diff(previous, current, by):
+    """Reference diff over plain dicts: best rank per (by..., canonical URL)"""
+    def best(snapshot):
+        ranks = {}
+        for row in snapshot.to_dict('records'):
+            key = tuple(_value(row[column]) for column in by) + (_value(row['canonical_url']),)
+            ranks[key] = min(ranks.get(key, row['rank']), row['rank'])
+        return ranks
+
+    before, after = best(previous), best(current)
+    diff = {name: set() for name in ('new', 'dropped', 'improved', 'declined', 'unchanged')}
+    for key, rank in after.items():
+        if key not in before:
+            diff['new'].add((key, None, rank, 0))
+        else:
+            delta = before[key] - rank
+            name = 'improved' if delta > 0 else 'declined' if delta < 0 else 'unchanged'
+            diff[name].add((key, before[key], rank, delta))
+    for key, rank in before.items():
+        if key not in after:
+            diff['dropped'].add((key, rank, None, 0))
+    return diff
+
+
+def as_rows(frame, by):
+    """Diff rows as (key, previous_rank, current_rank, delta) tuples"""
+    return {
+        (tuple(_value(row[column]) for column in by) + (_value(_canonical(row['url'])),),
+         _value(row['previous_rank']), _value(row['current_rank']), row['delta'])
+        for row in frame.to_dict('records')
+    }
+
+
+def make_snapshot(size, seed, categorical=False):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(size):
+        # Mixed-case URLs share a canonical form; some URLs and queries are missing
+        url = rng.choice([f"https://s{rng.randint(0, 15)}.com/{rng.choice('aAbB')}", np.nan, ''])
+        if url == '':
+            url = 'https://blank.com/'
+        rows.append({
+            'query': rng.choice(['alice leak', 'alice free', np.nan]),
+            'region': rng.choice(['', 'US', 'UK']),
+            'url': url,
+            'canonical_url': _canonical(url),
+            'rank': rng.randint(1, 30),
+        })
+    frame = pd.DataFrame(rows, columns=['query', 'region', 'url', 'canonical_url', 'rank'])
+    frame['rank'] = frame['rank'].astype('int32')
+    if categorical:
+        frame = frame.astype({'query': 'category', 'region': 'category'})
+    return frame
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+@pytest.mark.parametrize('by', [(), ('query',), ('query', 'region')])
+@pytest.mark.parametrize('sizes', [(400, 500), (0, 300), (300, 0), (0, 0), (1, 1)])
+def test_diff_matches_naive_diff(sizes, by, categorical):
+    previous = make_snapshot(sizes[0], seed=1, categorical=categorical)
+    current = make_snapshot(sizes[1], seed=2, categorical=categorical)
+
+    diff = diff_snapshots(previous, current, by)
+    expected = naive_diff(previous, current, by)
+
+    for name, frame in diff.items():
+        assert as_rows(frame, by) == expected[name], name
+        column = SORT_COLUMNS.get(name)
+        if column is not None:
+            values = frame[column].to_numpy(dtype='int64')
+            assert list(values) == sorted(values, reverse=(name == 'improved')), name
+
+
+def test_diff_of_disjoint_snapshots():
+    previous = pd.DataFrame({'query': ['q', 'q'], 'url': ['https://a.com/1', 'https://a.com/2'], 'rank': [1, 2]})
+    current = pd.DataFrame({'query': ['q'], 'url': ['https://b.com/1'], 'rank': [3]})
+
+    # Without a canonical_url column URLs are canonicalized on the fly
+    diff = diff_snapshots(previous, current)
+
+    assert diff['new']['url'].tolist() == ['https://b.com/1']
+    assert diff['dropped']['url'].tolist() == ['https://a.com/1', 'https://a.com/2']
+    assert diff['dropped']['current_rank'].isna().all()
+    assert all(len(diff[name]) == 0 for name in ('improved', 'declined', 'unchanged'))
@@ -0,0 +1,58 @@
+import time
+
+from rate_limiter import AdaptiveRateLimiter, retry_delay
+
+
+def test_successes_raise_the_rate_additively_up_to_the_maximum():
+    limiter = AdaptiveRateLimiter(initial_rate=1.0, max_rate=1.2, increase_step=0.1)
+
+    limiter.succeeded()
+    assert abs(limiter.rate - 1.1) < 1e-9
+    for _ in range(5):
+        limiter.succeeded()
+    assert limiter.rate == 1.2
+
+
+def test_throttling_halves_the_rate_down_to_the_minimum():
+    limiter = AdaptiveRateLimiter(initial_rate=100.0, min_rate=20.0)
+
+    limiter.throttled()
+    assert limiter.rate == 50.0
+    time.sleep(0.03)
+    limiter.throttled()
+    assert limiter.rate == 25.0
+    time.sleep(0.05)
+    limiter.throttled()
+    assert limiter.rate == 20.0
+
+
+def test_one_burst_of_throttled_requests_lowers_the_rate_once():
+    limiter = AdaptiveRateLimiter(initial_rate=1.0)
+
+    for _ in range(3):
+        limiter.throttled()
+    assert limiter.rate == 0.5
+
+
+def test_acquire_spends_the_burst_then_waits_for_the_rate():
+    limiter = AdaptiveRateLimiter(initial_rate=20.0, max_rate=20.0, burst=2)
+
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    # The third request waits about 1/20 s for a new slot
+    assert 0.03 < limiter.acquire() <= 0.06
+
+
+def test_retry_after_pauses_the_bucket():
+    limiter = AdaptiveRateLimiter(initial_rate=100.0, burst=10)
+
+    limiter.throttled(retry_after='0.1')
+    assert 0.05 < limiter.acquire() <= 0.1
+    # An unparseable Retry-After only lowers the rate
+    limiter.throttled(retry_after='soon')
+
+
+def test_retry_delay_prefers_the_server_hint():
+    assert retry_delay(3, retry_after='7') == 7.0
+    assert retry_delay(0, retry_after='120') == 60.0
+    assert 0 <= retry_delay(2, retry_after='x', base_delay=1.0) <= 4.0
@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from scan_pipeline import StageGraph
+
+
+def test_stages_run_after_their_dependencies():
+    order = []
+    lock = threading.Lock()
+
+    def stage(name, value):
+        def run(**inputs):
+            with lock:
+                order.append((name, sorted(inputs)))
+            return value + sum(inputs.values())
+        return run
+
+    graph = StageGraph(max_workers=4)
+    graph.add_stage('frame', stage('frame', 1))
+    graph.add_stage('merge', stage('merge', 10), depends_on=['frame'])
+    graph.add_stage('learn', stage('learn', 100), depends_on=['frame'])
+    graph.add_stage('stats', stage('stats', 1000), depends_on=['merge', 'learn'])
+
+    results, timings = graph.run()
+
+    assert results == {'frame': 1, 'merge': 11, 'learn': 101, 'stats': 1112}
+    assert set(timings) == set(results)
+    positions = {name: i for i, (name, _) in enumerate(order)}
+    assert positions['frame'] < positions['merge'] < positions['stats']
+    assert positions['learn'] < positions['stats']
+    assert dict(order)['stats'] == ['learn', 'merge']
+
+
+def test_failure_skips_dependents_but_not_independent_stages():
+    ran = []
+
+    def fail(frame):
+        raise RuntimeError('merge failed')
+
+    graph = StageGraph()
+    graph.add_stage('frame', lambda: 'df')
+    graph.add_stage('merge', fail, depends_on=['frame'])
+    graph.add_stage('stats', lambda merge: ran.append('stats'), depends_on=['merge'])
+    graph.add_stage('learn', lambda frame: ran.append('learn'), depends_on=['frame'])
+
+    with pytest.raises(RuntimeError, match='merge failed'):
+        graph.run()
+    assert ran == ['learn']
+
+
+def test_on_complete_receives_result_before_dependents_finish():
+    events = []
+    release = threading.Event()
+
+    def learn(merge):
+        # Blocks until on_complete of merge has run, so publishing never waits for learning
+        assert release.wait(5)
+        events.append('learn')
+        return 'keywords'
+
+    def published(result):
+        events.append(('published', result))
+        release.set()
+
+    graph = StageGraph()
+    graph.add_stage('merge', lambda: 'stats', on_complete=published)
+    graph.add_stage('learn', learn, depends_on=['merge'])
+
+    results, _ = graph.run()
+
+    assert events == [('published', 'stats'), 'learn']
+    assert results['learn'] == 'keywords'
+
+
+def test_unknown_dependency_is_rejected():
+    graph = StageGraph()
+    with pytest.raises(ValueError, match="Unknown dependency 'frame'"):
+        graph.add_stage('merge', lambda frame: None, depends_on=['frame'])
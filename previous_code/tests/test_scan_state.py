@@ -0,0 +1,30 @@
+import json
+from datetime import datetime
+
+from scan_state import ScanStateStore
+
+
+def test_state_round_trips_through_the_file(tmp_path):
+    store = ScanStateStore('Alice Smith', base_dir=str(tmp_path))
+    store.record_success([' Alice Leaks '], datetime(2024, 6, 1, 10, 0, 0))
+    store.record_region_yields({'US': (4, 10)})
+    store.record_region_yields({'US': (2, 1), 'UK': (1, 0)})
+
+    reloaded = ScanStateStore('Alice Smith', base_dir=str(tmp_path))
+    assert reloaded.last_scan('alice leaks') == datetime(2024, 6, 1, 10, 0, 0)
+    assert reloaded.last_scan('other') is None
+    assert reloaded.region_yield('US') == (6, 11)
+    assert reloaded.region_yield('UK') == (1, 0)
+    assert reloaded.region_yield('DE') == (0, 0)
+
+    with open(tmp_path / 'Alice_Smith_scan_state.json') as f:
+        assert set(json.load(f)) == {'keywords', 'regions'}
+
+
+def test_unreadable_state_starts_empty(tmp_path):
+    (tmp_path / 'Alice_scan_state.json').write_text('{not json')
+
+    store = ScanStateStore('Alice', base_dir=str(tmp_path))
+
+    assert store.last_scan('alice leaks') is None
+    assert store.region_yield('US') == (0, 0)
@@ -0,0 +1,132 @@
+import time
+import urllib.parse
+import multiprocessing
+import pytest
+import leak_scraper
+from rate_limiter import AdaptiveRateLimiter
+from scan_worker import ScanWorker, export_results
+from work_queue import ScanWorkQueue
+
+
+class FakeResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.headers = {}
+        self.content = b'{}'
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+def fake_search(failing_pages=()):
+    """Stand-in for the Custom Search API returning one distinct URL per keyword and page"""
+    def get(url, **kwargs):
+        params = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)
+        page = (int(params['start'][0]) - 1) // 10 + 1
+        if page in failing_pages:
+            return FakeResponse(500, {'error': {'message': 'Backend Error'}})
+        link = f"https://example.com/{urllib.parse.quote(params['q'][0])}/{page}"
+        return FakeResponse(200, {'items': [{'title': 'Alice leak', 'link': link, 'snippet': ''}]})
+    return get
+
+
+@pytest.fixture(autouse=True)
+def offline_scraper(tmp_path, monkeypatch):
+    """Run scans in a temp dir against the fake API without rate limiting or retries"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(leak_scraper.http_transport, 'get', fake_search())
+    monkeypatch.setattr(leak_scraper, 'search_rate_limiter', AdaptiveRateLimiter(initial_rate=1000, burst=1000))
+    monkeypatch.setattr(leak_scraper, 'MAX_PAGE_ATTEMPTS', 1)
+
+
+def run_worker(db_path, worker_id):
+    """Entry point of a forked worker process"""
+    ScanWorker(ScanWorkQueue(db_path), 'key', 'cx', worker_id=worker_id, lease_seconds=30).run()
+
+
+def test_expired_lease_is_claimed_by_another_worker(tmp_path):
+    queue = ScanWorkQueue(str(tmp_path / 'queue.db'))
+    queue.enqueue_scan('Alice', ['Alice leak'], 'd7', max_pages=2, pages_per_unit=2)
+
+    unit = queue.claim('worker-a', lease_seconds=0.2)
+    assert queue.claim('worker-b') is None
+
+    time.sleep(0.3)
+    reclaimed = queue.claim('worker-b')
+    assert reclaimed['id'] == unit['id']
+    assert reclaimed['attempts'] == 2
+
+    # The first worker lost its lease, so its heartbeat and late completion are rejected
+    assert not queue.heartbeat(unit['id'], 'worker-a')
+    queue.complete(unit['id'], 'worker-a', 'Alice', [])
+    assert queue.counts() == {'leased': 1}
+
+    queue.complete(unit['id'], 'worker-b', 'Alice', [{'url': 'https://example.com/a'}])
+    assert queue.counts() == {'done': 1}
+
+
+def test_unit_with_failed_pages_is_requeued(tmp_path, monkeypatch):
+    monkeypatch.setattr(leak_scraper.http_transport, 'get', fake_search(failing_pages={2}))
+    queue = ScanWorkQueue(str(tmp_path / 'queue.db'))
+    queue.enqueue_scan('Alice', ['Alice leak'], 'd7', max_pages=2, pages_per_unit=2)
+
+    worker = ScanWorker(queue, 'key', 'cx', worker_id='worker-a')
+    assert worker.process_unit(queue.claim('worker-a'))
+
+    # The page that worked is kept; the unit is retried for the failed one
+    assert queue.counts() == {'pending': 1}
+    assert len(queue.pending_results('Alice')) == 1
+
+    monkeypatch.setattr(leak_scraper.http_transport, 'get', fake_search())
+    worker.run()
+    assert queue.counts() == {'done': 1}
+    assert len(queue.pending_results('Alice')) == 2
+
+
+def test_exported_results_are_marked_by_canonical_url(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    queue = ScanWorkQueue(str(tmp_path / 'queue.db'))
+    queue.enqueue_scan('Alice', ['Alice leak'], 'd7', max_pages=1, pages_per_unit=1)
+    unit = queue.claim('worker-a')
+    queue.complete(unit['id'], 'worker-a', 'Alice', [
+        {'url': 'https://www.example.com/a?utm_source=x', 'title': 'Alice set', 'snippet': 'leak', 'page': 1},
+        {'url': 'https://example.com/a', 'title': 'Alice set', 'snippet': 'leak', 'page': 1},
+        {'url': 'https://example.com/b', 'title': 'Alice clip', 'snippet': 'leak', 'page': 1}])
+
+    assert sorted(r['canonical_url'] for r in queue.pending_results('Alice')) == ['example.com/a', 'example.com/b']
+    assert export_results(queue, 'Alice') == 2
+
+    # Nothing is left pending, so a second export merges no rows
+    assert queue.pending_results('Alice') == []
+    assert export_results(queue, 'Alice') == 0
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+def test_two_worker_processes_share_one_queue(tmp_path):
+    db_path = str(tmp_path / 'queue.db')
+    queue = ScanWorkQueue(db_path)
+    keywords = [f"Alice leak {i}" for i in range(4)]
+    queue.enqueue_scan('Alice', keywords, 'd7', max_pages=4, pages_per_unit=2)
+
+    # A unit leased by a worker that died is requeued once its lease expires
+    abandoned = queue.claim('dead-worker', lease_seconds=0.1)
+    time.sleep(0.2)
+
+    # Forked workers inherit the fake API from this process
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=run_worker, args=(db_path, f"worker-{n}")) for n in range(2)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    assert queue.counts() == {'done': 8}
+    assert len(queue.pending_results('Alice')) == 16
+
+    with queue._connect() as conn:
+        abandoned_unit = conn.execute("SELECT attempts FROM units WHERE id = ?", (abandoned['id'],)).fetchone()
+        claims = conn.execute("SELECT SUM(attempts) AS n FROM units").fetchone()
+    assert abandoned_unit['attempts'] == 2
+    assert claims['n'] == 9
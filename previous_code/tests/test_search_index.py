@@ -0,0 +1,86 @@
+import base64
+import json
+
+import pandas as pd
+import pytest
+
+from search_index import ContentSearchIndex, decode_cursor, encode_cursor, match_expression
+
+
+def rows(*items):
+    return pd.DataFrame([{'url': f"https://{domain}/{i}", 'canonical_url': f"{domain}/{i}", 'domain': domain,
+                          'title': title, 'snippet': snippet}
+                         for i, (domain, title, snippet) in enumerate(items)])
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ContentSearchIndex(str(tmp_path / 'search_index.db'))
+    index.add_rows('Alice', rows(
+        ('mega.nz', 'Alice leaked videos', 'full archive of leaked videos'),
+        ('forum.com', 'Alice photos', 'a thread mentioning leaked content once'),
+        ('mega.nz', 'Alice gallery', 'leaked'),
+        ('blog.com', 'Cooking tips', 'pasta recipes'),
+    ))
+    return index
+
+
+def test_add_rows_is_incremental(index):
+    # Already indexed rows are skipped, new rows are added to the full-text index
+    assert index.add_rows('Alice', rows(('mega.nz', 'Alice leaked videos', 'full archive of leaked videos'))) == 0
+    assert index.add_rows('Bob', rows(('mega.nz', 'Bob leaked videos', 'leaked'))) == 1
+
+    assert sorted(r['creator'] for r in index.search('leaked videos')['results']) == ['Alice', 'Bob']
+    assert index.domain_creators('mega.nz') == {'Alice': 2, 'Bob': 1}
+
+
+def test_bm25_ranks_title_and_frequent_matches_first(index):
+    results = index.search('leaked')['results']
+
+    assert [r['title'] for r in results] == ['Alice leaked videos', 'Alice gallery', 'Alice photos']
+    assert [r['score'] for r in results] == sorted(r['score'] for r in results)
+    assert index.search('"videos leaked"')['results'] == []
+    assert index.search('!!!') == {'results': [], 'next_cursor': None}
+
+
+@pytest.mark.parametrize('query', ['leaked', None])
+def test_cursor_pagination_visits_every_row_once(index, query):
+    expected = [r['id'] for r in index.search(query, limit=100)['results']]
+
+    seen, cursor = [], None
+    while True:
+        page = index.search(query, limit=1, cursor=cursor)
+        seen += [r['id'] for r in page['results']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert len(seen) == (3 if query else 4)
+
+
+def test_domain_filter_uses_posting_list(index):
+    results = index.search(domain='mega.nz')['results']
+    assert [r['title'] for r in results] == ['Alice leaked videos', 'Alice gallery']
+    assert all(r['score'] is None for r in results)
+
+
+@pytest.mark.parametrize('value', [5, 'abc', None, [1], [1, 2, 3], {'a': 1}, ['x', 1], [-1.5, 'id'], [0, True]])
+def test_wrong_shaped_cursor_is_invalid(index, value):
+    cursor = base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('ascii')
+
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        index.search('leaked', cursor=cursor)
+
+
+def test_cursor_round_trip_and_garbage():
+    assert decode_cursor(encode_cursor([-1.25, 7])) == [-1.25, 7]
+    assert decode_cursor(encode_cursor([None, 7])) == [None, 7]
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor('not base64!')
+
+
+def test_match_expression_quotes_user_input():
+    assert match_expression('leaked "full archive" OR x*') == '"leaked" "full archive" "OR" "x"'
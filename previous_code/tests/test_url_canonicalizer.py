@@ -0,0 +1,40 @@
+import pytest
+
+from url_canonicalizer import canonical_url
+
+
+@pytest.mark.parametrize('url, expected', [
+    # Scheme, userinfo, default ports, fragments and trailing slashes
+    ('https://example.com/a/', 'example.com/a'),
+    ('http://user:pw@example.com:80/a#top', 'example.com/a'),
+    ('https://example.com:443/a', 'example.com/a'),
+    ('https://example.com:8443/a', 'example.com:8443/a'),
+    ('example.com//a///b', 'example.com/a/b'),
+    # www., mobile and AMP host prefixes, and /amp path suffixes
+    ('https://www.example.com/a', 'example.com/a'),
+    ('https://m.example.com/a', 'example.com/a'),
+    ('https://amp.example.com/a/amp/', 'example.com/a'),
+    ('https://www.com/a', 'www.com/a'),
+    # AMP caches unwrap to the page they serve
+    ('https://www.google.com/amp/s/www.example.com/a/amp', 'example.com/a'),
+    ('https://example-com.cdn.ampproject.org/c/s/example.com/a?x=1', 'example.com/a?x=1'),
+    # Tracking parameters everywhere, remaining parameters sorted
+    ('https://example.com/a?utm_source=x&b=2&fbclid=1&a=1&gclid=2', 'example.com/a?a=1&b=2'),
+    ('https://example.com/a?pk_campaign=x&hsa_ad=1', 'example.com/a'),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_host_specific_tracking_params():
+    assert canonical_url('https://youtu.be/abc?si=xyz&t=10') == 'youtu.be/abc?t=10'
+    assert canonical_url('https://www.youtube.com/watch?v=abc&feature=share') == 'youtube.com/watch?v=abc'
+    assert canonical_url('https://mobile.twitter.com/a/status/1?s=20&t=x') == 'twitter.com/a/status/1'
+    # Generic names identify content on other hosts and are kept
+    assert canonical_url('https://example.com/page?si=2&ref=home') == 'example.com/page?ref=home&si=2'
+
+
+def test_invalid_and_missing_urls():
+    assert canonical_url(None) == ''
+    assert canonical_url('  ') == ''
+    assert canonical_url('http://example.com:99999/A') == 'http://example.com:99999/a'